@@ -18,7 +18,15 @@
         - os: Operating system module for interacting with the operating system.
         - socketio: Socket.IO library for real-time communication.
         - flasgger: Api documentation library provided by swagger.
+        - ProxyFix: Werkzeug middleware trusting the X-Forwarded-* headers of a reverse proxy.
         - stripe: A payment integration gateway.
+        
+    CLI Commands:
+        - users_cli: `flask users ...` maintenance commands.
+        - otp_cli: `flask otp ...` maintenance commands.
+        - mail_outbox_cli: `flask mail-outbox ...` email outbox commands.
+        - broadcasts_cli: `flask broadcasts ...` admin broadcast commands.
+        - chat_cli: `flask chat ...` chat maintenance commands.
 
     Functions:
         - create_app(): 
@@ -26,11 +34,12 @@
 """
 
 # Lib Imports:
-from flask import Flask
+from flask import Flask, jsonify
 from flask_migrate import Migrate
 from flask_cors import CORS
 from dotenv import load_dotenv
 from flask_jwt_extended import JWTManager
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flasgger import Swagger
 import stripe
 import os
@@ -53,6 +62,20 @@ from api.database import db
 from api.config.config import Config
 from api.extentions.socketio import init_app as init_socketio
 from api.extentions.mail import init_mail
+from api.extentions.geo_queue import init_geo_queue
+from api.extentions.mail_outbox import init_mail_outbox
+from api.extentions.broadcasts import init_broadcasts
+from api.extentions.message_writer import init_message_writer
+from api.utils.hasher import HasherBusy
+from api.utils.revocation import is_token_revoked
+from api.utils.status_codes import Status
+
+# Import CLI Commands:
+from api.commands.users import users_cli
+from api.commands.otp import otp_cli
+from api.commands.mail_outbox import mail_outbox_cli
+from api.commands.broadcasts import broadcasts_cli
+from api.commands.chat import chat_cli
 
 # ----------------------------------------------- #
 
@@ -75,14 +98,32 @@ def create_app():
 
     config = Config().dev_config
     app.config.from_object(config)
+    
+    # Behind a reverse proxy (e.g. deploy/sticky) => client IP & scheme from its X-Forwarded-* headers:
+    proxy_hops = app.config.get('TRUSTED_PROXY_HOPS', 0)
+    if proxy_hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops, x_proto=proxy_hops, x_host=proxy_hops)
     jwt = JWTManager(app)
     
+    # Revoked tokens & suspended/deleted accounts => checked from memory on every jwt_required route:
+    @jwt.token_in_blocklist_loader
+    def check_token_revoked(jwt_header, jwt_payload):
+        return is_token_revoked(jwt_payload)
+    
+    @jwt.revoked_token_loader
+    def revoked_token_response(jwt_header, jwt_payload):
+        return jsonify({'error': 'Token has been revoked or the account is no longer active'}), Status.HTTP_401_UNAUTHORIZED
+    
     cors_origin = os.environ.get('ALLOWED_ORIGIN')
     CORS(app)
 
-    # Initialize SocketIO, Flask-Mail
+    # Initialize SocketIO, Flask-Mail, background geocoding, email outbox, broadcasts & chat message batching
     init_socketio(app)
     init_mail(app)
+    init_geo_queue(app)
+    init_mail_outbox(app)
+    init_broadcasts(app)
+    init_message_writer(app)
     
     # Initialize Swagger
     swagger = Swagger(app)
@@ -109,6 +150,20 @@ def create_app():
     app.register_blueprint(skill_routes, url_prefix='/api/skill')
     app.register_blueprint(transaction_routes, url_prefix='/api/transaction')
     
+    # Password hashing pool saturated => ask the client to retry instead of queueing:
+    @app.errorhandler(HasherBusy)
+    def hasher_busy(e):
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '1'
+        return response, Status.HTTP_503_SERVICE_UNAVAILABLE
+    
+    # Register CLI commands:
+    app.cli.add_command(users_cli)
+    app.cli.add_command(otp_cli)
+    app.cli.add_command(mail_outbox_cli)
+    app.cli.add_command(broadcasts_cli)
+    app.cli.add_command(chat_cli)
+    
     # print(app.url_map)
     
     return app
@@ -1,5 +1,7 @@
 from api import create_app
 
+# WSGI entry point of gunicorn (api.app:app):
+app = create_app()
+
 if __name__ == '__main__':
-    app = create_app()
-    app.run()
\ No newline at end of file
+    app.run()
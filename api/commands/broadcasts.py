@@ -0,0 +1,33 @@
+"""
+    CLI (commands) file; Admin broadcast commands, run with `flask broadcasts <command>`.
+
+    External Libraries:
+        - click: A package for creating command line interfaces.
+        - flask: A micro web framework for Python.
+
+    Command Names:
+        - worker:   Run the broadcast fan-out worker in this process.
+"""
+
+# Lib Imports:
+import click
+from flask.cli import AppGroup
+
+# Module Imports:
+from api.extentions.broadcasts import broadcasts
+
+# ----------------------------------------------- #
+
+broadcasts_cli = AppGroup('broadcasts', help='Admin broadcast commands.')
+
+@broadcasts_cli.command('worker')
+def worker():
+    """
+    Fan out broadcasts until interrupted (set BROADCAST_QUEUE_IN_PROCESS = False on the app processes).
+    """
+    
+    click.echo('Broadcast worker started')
+    try:
+        broadcasts.run()
+    except KeyboardInterrupt:
+        click.echo('Broadcast worker stopped')
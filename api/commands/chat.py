@@ -0,0 +1,44 @@
+"""
+    CLI (commands) file; Chat maintenance commands, run with `flask chat <command>`.
+
+    External Libraries:
+        - click: A package for creating command line interfaces.
+        - flask: A micro web framework for Python.
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+
+    Command Names:
+        - backfill-members:   Fill chat_room_members from the user_ids arrays & creators of the existing rooms.
+"""
+
+# Lib Imports:
+import click
+from flask.cli import AppGroup
+from sqlalchemy import text
+
+# Module Imports:
+from api.database import db
+from api.models.chat import MEMBER, MEMBER_CREATOR
+
+# ----------------------------------------------- #
+
+chat_cli = AppGroup('chat', help='Chat maintenance commands.')
+
+@chat_cli.command('backfill-members')
+def backfill_members():
+    """
+    Insert a chat_room_members row for every (room, user) of the user_ids arrays & for the creator
+    of each room; run once after `flask db upgrade` creates the table. Existing members & deleted
+    users are skipped.
+    """
+    
+    inserted = db.session.execute(text("""
+        INSERT INTO chat_room_members (room_id, user_id, joined_at, role)
+        SELECT DISTINCT chat_rooms.id, users.id, now(),
+               CASE WHEN users.id = chat_rooms.creator_id THEN :creator ELSE :member END
+        FROM chat_rooms
+        CROSS JOIN LATERAL unnest(array_append(chat_rooms.user_ids, chat_rooms.creator_id)) AS member(user_id)
+        JOIN users ON users.id = member.user_id
+        ON CONFLICT (room_id, user_id) DO NOTHING
+    """), {'creator': MEMBER_CREATOR, 'member': MEMBER}).rowcount
+    db.session.commit()
+    click.echo(f'Added {inserted} chat room members')
@@ -0,0 +1,78 @@
+"""
+    CLI (commands) file; Email outbox commands, run with `flask mail-outbox <command>`.
+
+    External Libraries:
+        - click: A package for creating command line interfaces.
+        - flask: A micro web framework for Python.
+
+    Command Names:
+        - drain:    Send every due email, then exit.
+        - worker:   Run the outbox worker in this process.
+        - retry:    Move dead-lettered emails back to pending.
+        - purge:    Delete sent & dead emails older than the retention window.
+"""
+
+# Lib Imports:
+import click
+from datetime import datetime
+from flask.cli import AppGroup
+from sqlalchemy import update
+
+# Module Imports:
+from api.database import db
+from api.extentions.mail_outbox import outbox
+from api.models.outbox import OutboxEmail, OUTBOX_PENDING, OUTBOX_DEAD
+
+# ----------------------------------------------- #
+
+mail_outbox_cli = AppGroup('mail-outbox', help='Email outbox commands.')
+
+@mail_outbox_cli.command('drain')
+def drain():
+    """
+    Send every due email over one SMTP connection.
+    """
+    
+    total = 0
+    while True:
+        claimed = outbox.process_due()
+        if not claimed:
+            break
+        total += claimed
+    click.echo(f'Processed {total} emails')
+
+@mail_outbox_cli.command('worker')
+def worker():
+    """
+    Send queued emails until interrupted (set MAIL_OUTBOX_IN_PROCESS = False on the app processes).
+    """
+    
+    click.echo('Outbox worker started')
+    try:
+        outbox.run()
+    except KeyboardInterrupt:
+        click.echo('Outbox worker stopped')
+
+@mail_outbox_cli.command('retry')
+def retry():
+    """
+    Queue dead-lettered emails again, with fresh attempts.
+    """
+    
+    retried = db.session.execute(
+        update(OutboxEmail)
+        .where(OutboxEmail.status == OUTBOX_DEAD)
+        .values(status=OUTBOX_PENDING, attempts=0, next_attempt_at=datetime.now())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    click.echo(f'Queued {retried} emails again')
+
+@mail_outbox_cli.command('purge')
+@click.option('--days', type=int, default=None, help='Retention window, defaults to MAIL_OUTBOX_RETENTION_DAYS.')
+def purge(days):
+    """
+    Delete sent & dead emails older than the retention window (the worker also does it when idle).
+    """
+    
+    click.echo(f'Purged {outbox.purge(days)} emails')
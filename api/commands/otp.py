@@ -0,0 +1,29 @@
+"""
+    CLI (commands) file; Maintenance commands for OTPs, run with `flask otp <command>`.
+
+    External Libraries:
+        - click: A package for creating command line interfaces.
+        - flask: A micro web framework for Python.
+
+    Command Names:
+        - purge:    Delete expired OTPs (schedule it, e.g. hourly cron).
+"""
+
+# Lib Imports:
+import click
+from flask.cli import AppGroup
+
+# Module Imports:
+from api.utils.otp_generator import purge_expired_otps
+
+# ----------------------------------------------- #
+
+otp_cli = AppGroup('otp', help='OTP maintenance commands.')
+
+@otp_cli.command('purge')
+def purge():
+    """
+    Delete every expired OTP.
+    """
+    
+    click.echo(f'Purged {purge_expired_otps()} expired OTPs')
@@ -0,0 +1,128 @@
+"""
+    CLI (commands) file; Maintenance commands for users, run with `flask users <command>`.
+
+    External Libraries:
+        - click: A package for creating command line interfaces.
+        - flask: A micro web framework for Python.
+
+    Command Names:
+        - reindex-search:   Rebuild Lawyer.search_vector for every lawyer.
+        - backfill-geo:     Queue (and resolve) users with coordinates but no city/country.
+        - geocode-worker:   Run the background geocoding worker in this process.
+        - import-lawyers:   Bulk import lawyers from a CSV or JSONL roster.
+"""
+
+# Lib Imports:
+import os
+import csv
+import click
+from datetime import datetime
+from flask.cli import AppGroup
+from sqlalchemy import or_, update
+
+# Module Imports:
+from api.database import db
+from api.models.user import User, Lawyer, GEO_PENDING, GEO_FAILED
+from api.extentions.geo_queue import geo_queue
+from api.utils.lawyer_import import read_rows, import_lawyers, FORMATS, DEFAULT_BATCH_SIZE
+
+# ----------------------------------------------- #
+
+users_cli = AppGroup('users', help='User maintenance commands.')
+
+@users_cli.command('reindex-search')
+@click.option('--batch-size', default=500, show_default=True, help='Lawyers updated per commit.')
+def reindex_search(batch_size):
+    """
+    Rebuild the full text search document of every lawyer.
+    """
+    
+    last_id, total = 0, 0
+    while True:
+        lawyers = Lawyer.query.filter(Lawyer.id > last_id).order_by(Lawyer.id).limit(batch_size).all()
+        if not lawyers:
+            break
+        
+        for lawyer in lawyers:
+            lawyer.refresh_search_vector()
+        db.session.commit()
+        
+        last_id = lawyers[-1].id
+        total += len(lawyers)
+        click.echo(f'Re-indexed {total} lawyers')
+
+@users_cli.command('backfill-geo')
+@click.option('--include-failed', is_flag=True, help='Also retry users whose lookup failed for good.')
+@click.option('--queue-only', is_flag=True, help='Only mark users pending, leave them to the running workers.')
+def backfill_geo(include_failed, queue_only):
+    """
+    Queue the location of users with coordinates but an empty city or country.
+    """
+    
+    skipped = [GEO_PENDING] if include_failed else [GEO_PENDING, GEO_FAILED]
+    queued = db.session.execute(
+        update(User)
+        .where(
+            User.latitude.isnot(None), User.longitude.isnot(None),
+            or_(User.city.is_(None), User.city == '', User.country.is_(None), User.country == ''),
+            or_(User.geo_status.is_(None), User.geo_status.notin_(skipped)),
+        )
+        .values(geo_status=GEO_PENDING, geo_attempts=0, geo_retry_at=datetime.now())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    click.echo(f'Queued {queued} users')
+    
+    if queue_only:
+        return
+    
+    total = 0
+    while True:
+        claimed = geo_queue.process_due()
+        if not claimed:
+            break
+        total += claimed
+        click.echo(f'Processed {total} users')
+
+@users_cli.command('geocode-worker')
+def geocode_worker():
+    """
+    Resolve pending user locations until interrupted (set GEO_QUEUE_IN_PROCESS = False on the app processes).
+    """
+    
+    click.echo('Geocoding worker started')
+    try:
+        geo_queue.run()
+    except KeyboardInterrupt:
+        click.echo('Geocoding worker stopped')
+
+
+@users_cli.command('import-lawyers')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'format', type=click.Choice(FORMATS), help='File format. Defaults to the file extension.')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Lawyers hashed & inserted per commit.')
+@click.option('--workers', type=int, help='Password hashing processes. Defaults to the CPU count.')
+@click.option('--verified', is_flag=True, help='Import the accounts as verified.')
+@click.option('--report', type=click.Path(dir_okay=False, writable=True), help='Write the rejected rows (row, email, error) to this CSV file.')
+def import_lawyers_command(path, format, batch_size, workers, verified, report):
+    """
+    Bulk import lawyers from a CSV (with a header line) or JSONL file; locations are geocoded in the background.
+    """
+    
+    format = format or os.path.splitext(path)[1].lstrip('.').lower()
+    if format not in FORMATS:
+        raise click.BadParameter(f'Cannot guess the format of {path}, use --format', param_hint='--format')
+    
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        result = import_lawyers(read_rows(stream, format), batch_size=batch_size, workers=workers, verified=verified)
+    
+    click.echo(f"Imported {result['created']} lawyers, {result['failed']} rows rejected")
+    if report:
+        with open(report, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=['row', 'email', 'error'])
+            writer.writeheader()
+            writer.writerows(result['errors'])
+        click.echo(f'Rejected rows written to {report}')
+    else:
+        for error in result['errors']:
+            click.echo(f"Row {error['row']} ({error['email']}): {error['error']}", err=True)
@@ -10,6 +10,17 @@ class DevConfig:
         self.SQLALCHEMY_TRACK_MODIFICATIONS = False
         self.JWT_SECRET_KEY = os.getenv("JWT_SECRET")
         self.JWT_ACCESS_TOKEN_EXPIRES = 604800
+        self.ACCOUNT_STATE_TTL = 30              # Seconds a cached is_active/is_suspended state is trusted
+        self.REVOCATION_SYNC_SECONDS = 5         # Seconds between loads of tokens revoked by other workers
+        self.ROOM_CACHE_TTL = 60                 # Seconds a cached chat room membership is trusted (other workers' changes)
+        self.ROOM_CACHE_MISS_TTL = 1             # Seconds a missing room is remembered (rooms created by other workers)
+        self.ROOM_CACHE_MAX_ENTRIES = 10000
+        self.SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE") or None   # None => single process, or a redis://, postgresql:// or local:///<dir> URL shared by workers
+        if self.SOCKETIO_MESSAGE_QUEUE is None and int(os.getenv("GUNICORN_WORKERS", 1)) > 1 and (self.SQLALCHEMY_DATABASE_URI or '').startswith('postgres'):
+            # Several gunicorn workers (deploy/gevent) => Postgres LISTEN/NOTIFY on the app database:
+            self.SOCKETIO_MESSAGE_QUEUE = self.SQLALCHEMY_DATABASE_URI
+        self.SOCKETIO_CHANNEL = 'lawpeer-socketio'
+        self.SOCKETIO_ASYNC_MODE = None          # None => 'gevent' under the gevent worker (deploy/gevent), else 'threading'
         self.STRIPE_SEC_KEY = os.getenv("STRIPE_SEC_KEY")
         self.STRIPE_PUB_KEY = os.getenv("STRIPE_PUB_KEY")
         self.MAIL_USERNAME = 'info.lawpeer@gmail.com'
@@ -18,6 +29,38 @@ class DevConfig:
         self.MAIL_PORT = 587
         self.MAIL_USE_TLS = True
         self.MAIL_USE_SSL = False
+        self.MAIL_OUTBOX_IN_PROCESS = True       # Send queued emails from a thread of each app process
+        self.MAIL_OUTBOX_MAX_ATTEMPTS = 5        # Attempts before an email is dead-lettered
+        self.MAIL_OUTBOX_RETENTION_DAYS = 30     # Days sent & dead emails are kept (broadcast delivery counts, retry)
+        self.MAIL_OUTBOX_PURGE_INTERVAL = 3600   # Seconds between purges of the idle worker
+        self.BROADCAST_QUEUE_IN_PROCESS = True   # Fan out admin broadcasts from a thread of each app process
+        self.BROADCAST_QUEUE_CHUNK_SIZE = 500    # Recipients read, queued & notified per transaction
+        self.MESSAGE_WRITER_ENABLED = True       # Emit chat messages at once & insert them in batches (False => one commit per message)
+        self.MESSAGE_WRITER_BATCH_SIZE = 100     # Buffered messages that trigger a flush
+        self.MESSAGE_WRITER_POLL_INTERVAL = 0.2  # Seconds between flushes
+        self.MESSAGE_WRITER_MAX_ATTEMPTS = 5     # Failed flushes (database unreachable) before the buffer is spooled to disk
+        self.MESSAGE_WRITER_MAX_BUFFERED = 10000 # Buffered messages before the buffer is spooled to disk
+        self.MESSAGE_WRITER_SPOOL_DIR = None     # Spooled & dead-lettered messages, None => the app instance folder
+        self.GEO_BACKEND = os.getenv("GEO_BACKEND", "nominatim")  # 'nominatim' or 'gazetteer' (offline)
+        self.GEO_GAZETTEER_PATH = os.getenv("GEO_GAZETTEER_PATH")   # GeoNames dump, e.g. cities1000.zip
+        self.GEO_CACHE_PRECISION = 3             # Decimals of the rounded lat/long key (~110m)
+        self.GEO_CACHE_TTL_DAYS = 30
+        self.GEO_CACHE_MAX_ENTRIES = 4096        # In-process LRU size
+        self.GEO_QUEUE_IN_PROCESS = True         # Resolve locations in a thread of each app process
+        self.GEO_QUEUE_MIN_INTERVAL = 1.0        # Seconds between provider calls (Nominatim usage policy)
+        self.GEO_QUEUE_SHARED_LIMIT = True       # Space the calls of every process through the database, False => per process
+        self.GEO_QUEUE_MAX_ATTEMPTS = 5
+        self.BCRYPT_ROUNDS = 12                  # Cost of new password hashes
+        self.HASHER_POOL_SIZE = 2                # bcrypt processes per app process, 0 => hash inline
+        self.HASHER_MAX_PENDING = 16             # Queued/running hashes before answering 503
+        self.LAWYER_IMPORT_MAX_ROWS = 200        # Rows per POST /api/users/lawyer/import (~25s of bcrypt on 2 workers, gunicorn timeout 60s), larger files => `flask users import-lawyers`
+        self.LAWYER_IMPORT_WORKERS = 2           # Password hashing processes of an import request
+        self.EXPORT_BATCH_SIZE = 1000            # Rows per server-side cursor fetch of the admin exports
+        self.RATE_LIMIT_ENABLED = True
+        self.TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", 0))  # Reverse proxies in front of the app (client IP from X-Forwarded-For), 0 => none
+        self.RATE_LIMIT_STORAGE_URL = os.getenv("RATE_LIMIT_STORAGE_URL")   # None => per process memory, or a sqlite:// / postgresql:// URL shared by workers
+        self.OTP_BACKEND = 'database'            # 'database' or 'memory' (single process, lost on restart)
+        self.OTP_PURGE_INTERVAL = 3600           # Seconds between expired OTP purges on save
         self.ENV = "development"
         self.DEBUG = True
         self.PORT = 3000
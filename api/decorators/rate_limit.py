@@ -0,0 +1,85 @@
+"""
+    This file contains the decorator for rate limiting endpoints (sliding windows).
+
+    External Libraries:
+        - functools: Provides tools for working with functions and other callable objects.
+        - flask: A micro web framework for Python.
+        - flask_jwt_extended: An extension for Flask that adds JWT support.
+
+    Function Names:
+        - rate_limit
+        - get_backend
+
+    Usage (stack one decorator per limit, after @jwt_required() for key='user'):
+        @rate_limit(10, 60)                     # 10 requests per minute per IP
+        @rate_limit(5, 300, key='email')        # 5 requests per 5 minutes per email in the body
+"""
+
+# Lib Imports:
+from functools import wraps
+from flask import jsonify, request, current_app
+from flask_jwt_extended import get_jwt_identity
+
+# Module Imports:
+from api.utils.status_codes import Status
+from api.utils.rate_limiter import create_backend
+
+# ----------------------------------------------- #
+
+def get_backend():
+    """
+    Get the rate limit backend of the current app, created on first use from RATE_LIMIT_STORAGE_URL.
+    """
+
+    backend = current_app.extensions.get('rate_limit')
+    if backend is None:
+        backend = current_app.extensions['rate_limit'] = create_backend(current_app.config.get('RATE_LIMIT_STORAGE_URL'))
+    return backend
+
+def _identify(key):
+    """
+    Get the value a limit is counted by, None to skip the limit.
+    """
+
+    if key == 'ip':
+        return request.remote_addr
+    if key == 'email':
+        data = request.get_json(silent=True) if request.is_json else request.form
+        email = (data or {}).get('email')
+        return email.strip().lower() if isinstance(email, str) and email.strip() else None
+    if key == 'user':
+        identity = get_jwt_identity()
+        return f"{identity['role']}:{identity['id']}" if identity else None
+    raise ValueError(f'Unknown rate limit key: {key}')
+
+def rate_limit(limit, per, key='ip', scope=None):
+    """
+    A decorator function to limit how often a client may call an endpoint.
+
+    Args:
+        limit (int): Requests allowed in the window.
+        per (int): The sliding window, in seconds.
+        key (str): What the requests are counted by => 'ip', 'email' (request data) or 'user' (JWT).
+        scope (str, optional): Share a counter between endpoints. Defaults to the endpoint.
+
+    Returns:
+        function: A decorator function.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('RATE_LIMIT_ENABLED', True):
+                return func(*args, **kwargs)
+
+            value = _identify(key)
+            if value is not None:
+                counter = f'{scope or request.endpoint}:{key}:{value}:{limit}/{per}'
+                allowed, retry_after = get_backend().hit(counter, limit, per)
+                if not allowed:
+                    response = jsonify(error=f'Too many requests, try again in {retry_after} seconds')
+                    response.headers['Retry-After'] = str(retry_after)
+                    return response, Status.HTTP_429_TOO_MANY_REQUESTS
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
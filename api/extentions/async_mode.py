@@ -0,0 +1,61 @@
+"""
+    Extension file; Cooperative (gevent) server mode.
+
+    Under `gunicorn -c deploy/gevent/gunicorn.conf.py` the workers monkey-patch the standard library
+    before loading the app: each request & Socket.IO connection is a greenlet instead of a thread, so
+    thousands of idle websockets (or long-polling requests) cost a few KB each & never hold a thread
+    that REST requests need. Background queues (threads of the app process) become greenlets too.
+
+    get_async_mode picks the Socket.IO mode of the process (SOCKETIO_ASYNC_MODE overrides it), &
+    patch_database makes psycopg2 wait for Postgres on the gevent hub instead of blocking the worker.
+    CPU bound work must stay off the hub: keep HASHER_POOL_SIZE > 0 so bcrypt runs in processes.
+
+    External Libraries:
+        - gevent: Coroutine-based networking library (greenlets).
+        - psycogreen: Makes psycopg2 cooperative with gevent.
+
+    Function Names:
+        - is_gevent_patched
+        - get_async_mode
+        - patch_database
+"""
+
+# Lib Imports:
+import sys
+
+# ----------------------------------------------- #
+
+def is_gevent_patched():
+    """
+    Check if the process runs on gevent (standard library monkey-patched, e.g. by the gunicorn gevent worker).
+    """
+
+    if 'gevent' not in sys.modules:
+        return False
+    from gevent import monkey
+    return monkey.is_module_patched('socket')
+
+def get_async_mode(app):
+    """
+    The Socket.IO async mode of the process: SOCKETIO_ASYNC_MODE, else 'gevent' on a patched process, else 'threading'.
+
+    Raises:
+        - RuntimeError: If 'gevent' is configured but the process is not monkey-patched.
+    """
+
+    mode = app.config.get('SOCKETIO_ASYNC_MODE')
+    if mode == 'gevent' and not is_gevent_patched():
+        raise RuntimeError("SOCKETIO_ASYNC_MODE 'gevent' needs a gevent worker, e.g. gunicorn -c deploy/gevent/gunicorn.conf.py")
+    if mode:
+        return mode
+
+    # Never let Flask-SocketIO pick gevent just because it is installed (e.g. under `flask run`):
+    return 'gevent' if is_gevent_patched() else 'threading'
+
+def patch_database():
+    """
+    Make psycopg2 queries yield to other greenlets while waiting for Postgres.
+    """
+
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
@@ -0,0 +1,93 @@
+"""
+    Extension file; Base of the database backed background queues (geocoding, email outbox).
+
+    A queue keeps its jobs in a table; the worker loop processes due batches until none is left,
+    then sleeps until woken up by enqueue() or for <PREFIX>_POLL_INTERVAL seconds. It runs in a daemon
+    thread of the app process (started on the first enqueue, <PREFIX>_IN_PROCESS), or in a dedicated
+    process through a CLI command calling run().
+
+    External Libraries:
+        - threading: A module in Python for working with threads.
+
+    Class Names:
+        - BackgroundQueue
+"""
+
+# Lib Imports:
+import random
+import threading
+from datetime import timedelta
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+DEFAULT_POLL_INTERVAL = 60      # Seconds the worker sleeps when nothing is due
+DEFAULT_BACKOFF = 30            # Seconds before the first retry, doubled on each attempt
+DEFAULT_MAX_BACKOFF = 3600
+
+class BackgroundQueue:
+    # Config keys of a queue are prefixed, e.g. GEO_QUEUE_IN_PROCESS:
+    config_prefix = None
+    thread_name = 'background-queue'
+
+    def __init__(self, app=None):
+        self.app = None
+        self._thread = None
+        self._wakeup = threading.Event()
+        self._start_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+
+    def _config(self, key, default):
+        return self.app.config.get(f'{self.config_prefix}_{key}', default)
+
+    def wake_up(self):
+        """
+        Signal that a job was committed. Starts the in-process worker on first use.
+        """
+
+        if not self._config('IN_PROCESS', True):
+            return
+
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.run, name=self.thread_name, daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def backoff(self, attempts):
+        """
+        Delay before the next attempt, with jitter so failed batches do not retry in lockstep.
+        """
+
+        delay = min(self._config('BACKOFF', DEFAULT_BACKOFF) * 2 ** (attempts - 1), self._config('MAX_BACKOFF', DEFAULT_MAX_BACKOFF))
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    def process_due(self, batch_size=None):
+        """
+        Claim & process one batch of due jobs (in the current app context).
+
+        Returns:
+            - int: The number of claimed jobs, 0 when nothing is due.
+        """
+
+        raise NotImplementedError
+
+    def run(self, stop=None):
+        """
+        Worker loop: process batches until nothing is due, then sleep until woken up or the poll interval.
+        """
+
+        while stop is None or not stop.is_set():
+            self._wakeup.clear()
+            try:
+                with self.app.app_context():
+                    while self.process_due():
+                        pass
+            except Exception as e:
+                print(f"Error occurred in {self.thread_name} worker: {e}")
+            self._wakeup.wait(self._config('POLL_INTERVAL', DEFAULT_POLL_INTERVAL))
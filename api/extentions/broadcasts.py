@@ -0,0 +1,172 @@
+"""
+    Extension file; Fan-out of admin broadcasts (Socket.IO notifications & emails).
+
+    Creating a broadcast only saves it (status 'pending') and wakes the worker up. The worker walks
+    the recipients in chunks of BROADCAST_QUEUE_CHUNK_SIZE users (keyset on users.id, never the
+    whole table in memory); for each chunk, in one transaction:
+        - One bulk email is queued per recipient in the email outbox (bulk priority, so OTPs are
+          not delayed), sent by the outbox worker over a reused SMTP connection.
+        - Broadcast.last_user_id & processed are moved forward, so a restarted worker resumes
+          after the last committed chunk.
+    Connected users are then notified over Socket.IO: with one emit to a shared room when the broadcast
+    only targets a role, or one emit per recipient room ('user:<id>', see chats handle_connect) otherwise.
+
+    The worker runs in a daemon thread of the app process (BROADCAST_QUEUE_IN_PROCESS), or as a dedicated
+    process with `flask broadcasts worker` (its Socket.IO emits need a message queue to reach the app).
+
+    External Libraries:
+        - flask_socketio: Socket.IO integration for Flask applications.
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+
+    Class Names:
+        - BroadcastQueue
+"""
+
+# Lib Imports:
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, insert, func
+
+# Module Imports:
+from api.database import db
+from api.extentions.background import BackgroundQueue
+from api.extentions.mail_outbox import outbox
+from api.extentions.socketio import socketio
+from api.models.user import User
+from api.models.outbox import OutboxEmail, OUTBOX_PENDING, OUTBOX_SENT, OUTBOX_DEAD, PRIORITY_BULK
+from api.models.broadcast import Broadcast, BROADCAST_SENDING, BROADCAST_DONE
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+DEFAULT_CHUNK_SIZE = 500
+CLAIM_LEASE = 300               # Seconds a claimed broadcast is hidden from other workers
+NOTIFICATION_EVENT = 'notification'
+
+class BroadcastQueue(BackgroundQueue):
+    config_prefix = 'BROADCAST_QUEUE'
+    thread_name = 'broadcasts'
+
+    def enqueue(self, broadcast_id=None):
+        """
+        Signal that a broadcast was committed.
+        """
+
+        self.wake_up()
+
+    def claim(self):
+        """
+        Claim the id of one unfinished broadcast (in the current app context), None if there is none.
+        """
+
+        now = datetime.now()
+        due = (
+            select(Broadcast.id)
+            .where(Broadcast.status != BROADCAST_DONE, (Broadcast.lease_until.is_(None)) | (Broadcast.lease_until <= now))
+            .order_by(Broadcast.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        broadcast_id = db.session.execute(
+            update(Broadcast)
+            .where(Broadcast.id.in_(due.scalar_subquery()))
+            .values(lease_until=now + timedelta(seconds=CLAIM_LEASE))
+            .returning(Broadcast.id)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        db.session.commit()
+        return broadcast_id
+
+    def _sender(self):
+        return self.app.config.get('MAIL_DEFAULT_SENDER') or self.app.config.get('MAIL_USERNAME')
+
+    def _notification(self, broadcast):
+        return {'broadcast_id': broadcast.id, 'subject': broadcast.subject, 'body': broadcast.body, 'created': broadcast.created.isoformat()}
+
+    def fan_out(self, broadcast, chunk_size):
+        """
+        Queue & notify the next chunk of recipients of a claimed broadcast (in the current app context).
+
+        Returns:
+            - int: The number of recipients in the chunk, 0 once the broadcast is done.
+        """
+
+        recipients = db.session.execute(
+            select(User.id, User.email)
+            .where(User.id > broadcast.last_user_id, *broadcast.recipient_criteria())
+            .order_by(User.id)
+            .limit(chunk_size)
+        ).all()
+
+        if broadcast.send_email and recipients:
+            now = datetime.now()
+            db.session.execute(insert(OutboxEmail), [
+                {
+                    'subject': broadcast.subject, 'body': broadcast.body, 'sender': self._sender(), 'recipients': recipient.email,
+                    'status': OUTBOX_PENDING, 'attempts': 0, 'next_attempt_at': now, 'priority': PRIORITY_BULK, 'broadcast_id': broadcast.id,
+                }
+                for recipient in recipients
+            ])
+
+        first_chunk = broadcast.last_user_id == 0
+        broadcast.processed += len(recipients)
+        if recipients:
+            broadcast.status = BROADCAST_SENDING
+            broadcast.last_user_id = recipients[-1].id
+        if len(recipients) < chunk_size:
+            broadcast.status = BROADCAST_DONE
+            broadcast.completed_at = datetime.now(timezone.utc)
+        broadcast.lease_until = None
+        db.session.commit()
+
+        if broadcast.send_email and recipients:
+            outbox.wake_up()
+
+        if broadcast.send_socket:
+            room = broadcast.socket_room()
+            if room is None:
+                for recipient in recipients:
+                    socketio.emit(NOTIFICATION_EVENT, self._notification(broadcast), to=f'user:{recipient.id}')
+            elif first_chunk:
+                socketio.emit(NOTIFICATION_EVENT, self._notification(broadcast), to=room)
+
+        return len(recipients)
+
+    def process_due(self, batch_size=None):
+        """
+        Claim one broadcast & fan out its next chunk (in the current app context).
+
+        Returns:
+            - int: 1 if a broadcast was worked on, 0 when none is unfinished.
+        """
+
+        broadcast_id = self.claim()
+        if broadcast_id is None:
+            return 0
+
+        self.fan_out(db.session.get(Broadcast, broadcast_id), batch_size or self._config('CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+        return 1
+
+    def get_progress(self, broadcast):
+        """
+        The fan-out & email delivery progress of a broadcast (in the current app context).
+        """
+
+        emails = dict(db.session.execute(
+            select(OutboxEmail.status, func.count())
+            .where(OutboxEmail.broadcast_id == broadcast.id)
+            .group_by(OutboxEmail.status)
+        ).all())
+        return {
+            'id': broadcast.id,
+            'status': broadcast.status,
+            'total': broadcast.total,
+            'processed': broadcast.processed,
+            'emails': {status: emails.get(status, 0) for status in [OUTBOX_PENDING, OUTBOX_SENT, OUTBOX_DEAD]},
+            'completed_at': broadcast.completed_at.isoformat() if broadcast.completed_at else None,
+        }
+
+broadcasts = BroadcastQueue()
+
+def init_broadcasts(app):
+    broadcasts.init_app(app)
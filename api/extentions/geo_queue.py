@@ -0,0 +1,238 @@
+"""
+    Extension file; Background reverse geocoding of user locations.
+
+    Requests only save the coordinates with geo_status 'pending' (User.set_location) and call
+    geo_queue.enqueue(); the users table is the queue, so nothing is lost on restart and several
+    processes can work it (claims use FOR UPDATE SKIP LOCKED).
+
+    A worker:
+        - Claims due pending users (a lease pushes their geo_retry_at forward while they are processed).
+        - Calls a remote provider at most once every GEO_QUEUE_MIN_INTERVAL seconds (Nominatim allows 1/s).
+          With GEO_QUEUE_SHARED_LIMIT the spacing holds across every process (gunicorn workers, hosts):
+          the time of the last call is kept in the call_spacing table (created on first use).
+        - Retries failures with exponential backoff, and marks the user 'failed' after GEO_QUEUE_MAX_ATTEMPTS.
+        - Writes the outcome only if the coordinates did not change during the lookup (a user who moved
+          stays pending for the new location).
+
+    The worker runs in a daemon thread of the app process (started on the first enqueue, GEO_QUEUE_IN_PROCESS),
+    or as a dedicated process with `flask users geocode-worker` (see api.extentions.background).
+
+    External Libraries:
+        - flask: A micro web framework for Python.
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+        - threading: A module in Python for working with threads.
+
+    Class Names:
+        - RateLimiter
+        - DatabaseRateLimiter
+        - GeoQueue
+"""
+
+# Lib Imports:
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import MetaData, Table, Column, String, Float, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+# Module Imports:
+from api.database import db
+from api.extentions.background import BackgroundQueue
+from api.models.user import User, Lawyer, GEO_PENDING, GEO_RESOLVED, GEO_FAILED
+from api.utils.geo_locator import get_address, is_remote_backend
+from api.utils.geo_cache import get_cached_address
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+DEFAULT_MIN_INTERVAL = 1.0      # Seconds between provider calls
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BATCH_SIZE = 20
+CLAIM_LEASE = 300               # Seconds a claimed user is hidden from other workers
+
+# Last call of each shared limiter, outside the app models (like rate_limit_counters):
+call_spacing = Table(
+    'call_spacing', MetaData(),
+    Column('name', String(64), primary_key=True),
+    Column('last_call', Float, nullable=False),
+)
+
+class RateLimiter:
+    """
+        Spaces calls of a function by at least min_interval seconds (shared by all threads of the process).
+    """
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._last = 0.0
+
+    def wrap(self, function):
+        def limited(*args, **kwargs):
+            with self._lock:
+                wait = self._last + self.min_interval - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                self._last = time.monotonic()
+            return function(*args, **kwargs)
+        return limited
+
+class DatabaseRateLimiter(RateLimiter):
+    """
+        Spaces calls of a function by at least min_interval seconds across every process using the database:
+        a caller locks the row of the limiter, waits for its turn, stores its call time & commits.
+    """
+
+    def __init__(self, min_interval, name):
+        super().__init__(min_interval)
+        self.name = name
+        self._ready = False
+
+    def _setup(self):
+        # Table & row created on first use (in an app context):
+        try:
+            with db.engine.begin() as connection:
+                call_spacing.create(connection, checkfirst=True)
+        except SQLAlchemyError:
+            # Created meanwhile by another process, the insert fails otherwise:
+            pass
+
+        insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+        with db.engine.begin() as connection:
+            connection.execute(insert(call_spacing).values(name=self.name, last_call=0.0).on_conflict_do_nothing())
+        self._ready = True
+
+    def wrap(self, function):
+        def limited(*args, **kwargs):
+            # The threads of a process queue on the lock, only one of them holds a connection:
+            with self._lock:
+                if not self._ready:
+                    self._setup()
+
+                row = call_spacing.c.name == self.name
+                with db.engine.begin() as connection:
+                    # The no-op update locks the row: the other processes wait for it to commit
+                    last = connection.execute(
+                        update(call_spacing).where(row).values(last_call=call_spacing.c.last_call).returning(call_spacing.c.last_call)
+                    ).scalar()
+                    wait = last + self.min_interval - time.time()
+                    if wait > 0:
+                        time.sleep(wait)
+                    connection.execute(update(call_spacing).where(row).values(last_call=time.time()))
+            return function(*args, **kwargs)
+        return limited
+
+class GeoQueue(BackgroundQueue):
+    config_prefix = 'GEO_QUEUE'
+    thread_name = 'geo-queue'
+
+    def init_app(self, app):
+        super().init_app(app)
+        min_interval = app.config.get('GEO_QUEUE_MIN_INTERVAL', DEFAULT_MIN_INTERVAL)
+        if app.config.get('GEO_QUEUE_SHARED_LIMIT', True):
+            self.limiter = DatabaseRateLimiter(min_interval, name='geo-provider')
+        else:
+            self.limiter = RateLimiter(min_interval)
+        self.limited_get_address = self.limiter.wrap(get_address)
+
+    def fetch(self, latitude, longitude):
+        # Only remote providers are rate limited, the local gazetteer is not:
+        if is_remote_backend():
+            return self.limited_get_address(latitude, longitude)
+        return get_address(latitude, longitude)
+
+    def enqueue(self, user_id=None):
+        """
+        Signal that a user location is pending (User.set_location must have been committed).
+        """
+
+        self.wake_up()
+
+    def claim(self, batch_size):
+        """
+        Claim the ids of due pending users (in the current app context).
+        """
+
+        now = datetime.now()
+        due = (
+            select(User.id)
+            .where(User.geo_status == GEO_PENDING, User.geo_retry_at <= now)
+            .order_by(User.geo_retry_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        ids = db.session.execute(
+            update(User)
+            .where(User.id.in_(due.scalar_subquery()))
+            .values(geo_retry_at=now + timedelta(seconds=CLAIM_LEASE))
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.session.commit()
+        return ids
+
+    def resolve(self, user_id):
+        """
+        Resolve the location of one claimed user (in the current app context).
+
+        Returns:
+            - bool: True if the address was filled.
+        """
+
+        user = User.query.get(user_id)
+        if user is None or user.geo_status != GEO_PENDING:
+            return False
+
+        # Written only if the user did not move meanwhile (update_user => set_location), else left pending:
+        latitude, longitude = user.latitude, user.longitude
+        same_location = (
+            update(User)
+            .where(User.id == user_id, User.geo_status == GEO_PENDING, User.latitude == latitude, User.longitude == longitude)
+            .execution_options(synchronize_session=False)
+        )
+
+        try:
+            country, city, postal_code, full_address = get_cached_address(latitude, longitude, fetch=self.fetch)
+        except Exception as e:
+            print(f"Error occurred while fetching address of user {user_id}: {e}")
+            attempts = user.geo_attempts + 1
+            if attempts >= self._config('MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS):
+                db.session.execute(same_location.values(geo_attempts=attempts, geo_status=GEO_FAILED, geo_retry_at=None))
+            else:
+                db.session.execute(same_location.values(geo_attempts=attempts, geo_retry_at=datetime.now() + self.backoff(attempts)))
+            db.session.commit()
+            return False
+
+        resolved = db.session.execute(same_location.values(
+            country=country, city=city, postal_code=postal_code, geo_address=full_address, geo_status=GEO_RESOLVED, geo_retry_at=None,
+        )).rowcount
+        if not resolved:
+            db.session.rollback()
+            return False
+
+        # The city is part of the lawyer search document:
+        if isinstance(user, Lawyer):
+            db.session.refresh(user)
+            user.refresh_search_vector()
+        db.session.commit()
+        return True
+
+    def process_due(self, batch_size=None):
+        """
+        Claim & resolve one batch of due users (in the current app context).
+
+        Returns:
+            - int: The number of claimed users, 0 when nothing is due.
+        """
+
+        ids = self.claim(batch_size or self._config('BATCH_SIZE', DEFAULT_BATCH_SIZE))
+        for user_id in ids:
+            self.resolve(user_id)
+        return len(ids)
+
+geo_queue = GeoQueue()
+
+def init_geo_queue(app):
+    geo_queue.init_app(app)
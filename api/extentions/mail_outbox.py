@@ -0,0 +1,198 @@
+"""
+    Extension file; Asynchronous email outbox.
+
+    Requests only insert the email in the email_outbox table (outbox.enqueue) and return; a worker
+    drains the table in batches over one SMTP connection (mail.connect()), kept open until the
+    outbox is empty instead of a new TLS session per email.
+
+    A worker:
+        - Claims due pending emails, transactional ones first (a lease pushes their next_attempt_at
+          forward while they are sent), so an OTP never waits behind a broadcast.
+        - Retries failures with exponential backoff, and dead-letters the email ('dead', with last_error)
+          after MAIL_OUTBOX_MAX_ATTEMPTS.
+        - Re-opens the connection after a connection error.
+        - Clears the body of a sent email (OTP codes are not kept), and when idle deletes the sent & dead
+          emails older than MAIL_OUTBOX_RETENTION_DAYS, at most every MAIL_OUTBOX_PURGE_INTERVAL seconds
+          (or `flask mail-outbox purge`).
+
+    The worker runs in a daemon thread of the app process (MAIL_OUTBOX_IN_PROCESS), or as a dedicated
+    process with `flask mail-outbox worker` (see api.extentions.background).
+
+    External Libraries:
+        - flask_mail: An extension for Flask that adds email sending capabilities to your application.
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+
+    Class Names:
+        - MailOutbox
+"""
+
+# Lib Imports:
+import time
+import smtplib
+from datetime import datetime, timedelta, timezone
+from flask_mail import Message
+from sqlalchemy import select, update, delete
+
+# Module Imports:
+from api.database import db
+from api.extentions.background import BackgroundQueue
+from api.extentions.mail import mail
+from api.models.outbox import OutboxEmail, OUTBOX_PENDING, OUTBOX_SENT, OUTBOX_DEAD
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BATCH_SIZE = 50
+CLAIM_LEASE = 300               # Seconds a claimed email is hidden from other workers
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_PURGE_INTERVAL = 3600
+
+class MailOutbox(BackgroundQueue):
+    config_prefix = 'MAIL_OUTBOX'
+    thread_name = 'mail-outbox'
+
+    def __init__(self, app=None):
+        self._connection = None
+        self._next_purge = 0.0
+        super().__init__(app)
+
+    def enqueue(self, subject, recipients, body, sender):
+        """
+        Save an email to the outbox & wake the worker up.
+
+        Parameters:
+            - subject (str): The email subject.
+            - recipients (list): The recipient addresses.
+            - body (str): The plain text body.
+            - sender (str): The sender address.
+
+        Returns:
+            - OutboxEmail: The queued email.
+        """
+
+        email = OutboxEmail(subject=subject, recipients=','.join(recipients), body=body, sender=sender, next_attempt_at=datetime.now())
+        db.session.add(email)
+        db.session.commit()
+        self.wake_up()
+        return email
+
+    def claim(self, batch_size):
+        """
+        Claim the ids of due pending emails (in the current app context).
+        """
+
+        now = datetime.now()
+        due = (
+            select(OutboxEmail.id)
+            .where(OutboxEmail.status == OUTBOX_PENDING, OutboxEmail.next_attempt_at <= now)
+            .order_by(OutboxEmail.priority, OutboxEmail.next_attempt_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        ids = db.session.execute(
+            update(OutboxEmail)
+            .where(OutboxEmail.id.in_(due.scalar_subquery()))
+            .values(next_attempt_at=now + timedelta(seconds=CLAIM_LEASE))
+            .returning(OutboxEmail.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.session.commit()
+        return ids
+
+    def _get_connection(self):
+        if self._connection is None:
+            connection = mail.connect()
+            self._connection = connection.__enter__()
+        return self._connection
+
+    def close_connection(self):
+        """
+        Quit the SMTP session (once the outbox is drained, or after an error).
+        """
+
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            try:
+                connection.__exit__(None, None, None)
+            except Exception:
+                pass
+
+    def deliver(self, email):
+        """
+        Send one claimed email & record the outcome (in the current app context).
+
+        Returns:
+            - bool: True if sent.
+        """
+
+        message = Message(email.subject, sender=email.sender, recipients=email.recipients.split(','), body=email.body)
+        try:
+            self._get_connection().send(message)
+        except Exception as e:
+            # The session may be unusable after any SMTP error, start a new one for the next email:
+            if isinstance(e, (smtplib.SMTPException, OSError)):
+                self.close_connection()
+            email.attempts += 1
+            email.last_error = str(e)[:1000]
+            if email.attempts >= self._config('MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS):
+                email.status = OUTBOX_DEAD
+            else:
+                email.next_attempt_at = datetime.now() + self.backoff(email.attempts)
+            db.session.commit()
+            return False
+
+        email.status = OUTBOX_SENT
+        email.sent_at = datetime.now(timezone.utc)
+        email.last_error = None
+        email.body = None
+        db.session.commit()
+        return True
+
+    def process_due(self, batch_size=None):
+        """
+        Claim & send one batch of due emails (in the current app context).
+
+        Returns:
+            - int: The number of claimed emails, 0 when nothing is due.
+        """
+
+        ids = self.claim(batch_size or self._config('BATCH_SIZE', DEFAULT_BATCH_SIZE))
+        if not ids:
+            self.close_connection()
+            self._purge_due()
+            return 0
+
+        for email in OutboxEmail.query.filter(OutboxEmail.id.in_(ids)).order_by(OutboxEmail.id).all():
+            self.deliver(email)
+        return len(ids)
+
+    def _purge_due(self):
+        now = time.monotonic()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self._config('PURGE_INTERVAL', DEFAULT_PURGE_INTERVAL)
+        self.purge()
+
+    def purge(self, retention_days=None):
+        """
+        Delete the sent & dead emails older than MAIL_OUTBOX_RETENTION_DAYS (in the current app context).
+
+        Returns:
+            - int: The number of deleted emails.
+        """
+
+        retention_days = retention_days if retention_days is not None else self._config('RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+        deleted = db.session.execute(
+            delete(OutboxEmail)
+            .where(OutboxEmail.status.in_([OUTBOX_SENT, OUTBOX_DEAD]), OutboxEmail.updated < datetime.now() - timedelta(days=retention_days))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        return deleted
+
+outbox = MailOutbox()
+
+def init_mail_outbox(app):
+    outbox.init_app(app)
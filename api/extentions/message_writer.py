@@ -0,0 +1,369 @@
+"""
+    Extension file; Write-behind persistence of chat messages.
+
+    send_message events no longer wait for a commit per message: save_message builds the message
+    (id taken from the messages sequence, sender name & image from a short lived cache), it is
+    emitted to the room at once and buffered here. The writer flushes the buffer:
+        - every MESSAGE_WRITER_POLL_INTERVAL seconds, or as soon as MESSAGE_WRITER_BATCH_SIZE messages wait,
+        - in id order, as one multi-row INSERT, plus one executemany UPDATE of last_message (latest message per room),
+        - in one commit.
+    Ids are taken one per message (one nextval, still far cheaper than a commit), so ids stay in the
+    order messages were sent whatever the worker: the history endpoint pages on them.
+
+    A batch the database refuses is retried row by row (savepoints): rows that can never be saved
+    (e.g. their room was deleted by another worker) are dead-lettered to dead-messages-*.jsonl in
+    MESSAGE_WRITER_SPOOL_DIR & the others are saved. If the database is unreachable the batch stays
+    buffered; after MESSAGE_WRITER_MAX_ATTEMPTS failed flushes, or past MESSAGE_WRITER_MAX_BUFFERED
+    messages, the buffer is spooled to messages-*.jsonl, replayed every SPOOL_REPLAY_INTERVAL seconds
+    by a flushing process (& on shutdown the buffer is flushed or spooled). Messages are readable
+    through the history endpoint once flushed (at most a poll interval later).
+
+    Counters of batch sizes, flush latencies, dead-lettered & spooled messages: message_writer.get_stats().
+
+    External Libraries:
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+        - threading: A module in Python for working with threads.
+
+    Class Names:
+        - MessageWriter
+"""
+
+# Lib Imports:
+import os
+import glob
+import json
+import time
+import atexit
+import threading
+from datetime import datetime
+from sqlalchemy import select, update, insert, func, bindparam, text
+from sqlalchemy.exc import IntegrityError, DataError
+
+# Module Imports:
+from api.database import db
+from api.extentions.background import BackgroundQueue
+from api.models.chat import Message, ChatRoom
+from api.models.user import User
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_POLL_INTERVAL = 0.2     # Seconds between flushes (the write-behind delay)
+DEFAULT_MAX_ATTEMPTS = 5       # Failed flushes before the buffer is spooled
+DEFAULT_MAX_BUFFERED = 10000    # Buffered messages before the buffer is spooled
+SPOOL_REPLAY_INTERVAL = 30      # Seconds between replays of the spool dir
+SENDER_TTL = 60                 # Seconds a sender's name & profile image are cached
+STOCK_PROFILE_IMAGE = '/static/stock_user.jpg'
+
+class MessageWriter(BackgroundQueue):
+    config_prefix = 'MESSAGE_WRITER'
+    thread_name = 'message-writer'
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_id = 0               # Without a sequence (sqlite): the last id given
+        self._senders = {}              # user id => ((sender name, profile image) or None, expires)
+        self._attempts = 0              # Consecutive failed flushes
+        self._next_replay = 0
+        self._stats = {'flushes': 0, 'messages': 0, 'failures': 0, 'dead_lettered': 0, 'spooled': 0, 'last_batch_size': 0,
+                       'max_batch_size': 0, 'last_flush_ms': 0.0, 'max_flush_ms': 0.0, 'total_flush_ms': 0.0}
+        super().__init__(app)
+
+    def init_app(self, app):
+        super().init_app(app)
+        atexit.register(self.shutdown)
+
+    def _config(self, key, default):
+        # The poll interval is the flush interval => write-behind default, not the queues' one:
+        if key == 'POLL_INTERVAL':
+            default = DEFAULT_POLL_INTERVAL
+        return super()._config(key, default)
+
+    def is_enabled(self):
+        return self.app is not None and self._config('ENABLED', True)
+
+    ## --- Building messages (request threads) --- ##
+
+    def _next_id(self):
+        """
+        Take the id of a new message from the messages sequence (not rolled back with the caller's transaction).
+        """
+
+        if db.engine.dialect.name == 'postgresql':
+            return db.session.execute(text("SELECT nextval(pg_get_serial_sequence('messages', 'id'))")).scalar()
+
+        # No sequence (single process, e.g. sqlite) => continue after the largest saved or given id:
+        last_id = db.session.execute(select(func.max(Message.id))).scalar() or 0
+        with self._lock:
+            self._last_id = max(self._last_id, last_id) + 1
+            return self._last_id
+
+    def _sender(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._senders.get(user_id)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        user = db.session.execute(select(User.first_name, User.last_name, User.profile_image).where(User.id == user_id)).first()
+        sender = (f'{user.first_name} {user.last_name}', user.profile_image or STOCK_PROFILE_IMAGE) if user else None
+        with self._lock:
+            self._senders[user_id] = (sender, now + SENDER_TTL)
+        return sender
+
+    def add(self, room_id, user_id, content):
+        """
+        Build a message & buffer it for the next flush (in the current app context).
+
+        Returns:
+            - Message: The message (not attached to the session, its id is final), None if the sender does not exist.
+        """
+
+        sender = self._sender(user_id)
+        if sender is None:
+            return None
+
+        row = {
+            'id': self._next_id(), 'chat_room_id': room_id, 'sender_id': user_id, 'sender_name': sender[0],
+            'sender_profile_image': sender[1], 'content': content, 'created': datetime.now(),
+        }
+        with self._lock:
+            self._buffer.append(row)
+            buffered = len(self._buffer)
+
+        # The database is unreachable for long => keep memory bounded:
+        if buffered >= self._config('MAX_BUFFERED', DEFAULT_MAX_BUFFERED):
+            self.spool()
+        elif buffered >= self._config('BATCH_SIZE', DEFAULT_BATCH_SIZE):
+            self.wake_up()
+        else:
+            self._start()
+        return Message(**row)
+
+    def _start(self):
+        # The flush loop must run even if the batch size is never reached:
+        if self._thread is None or not self._thread.is_alive():
+            self.wake_up()
+
+    ## --- Flushing (writer thread / shutdown) --- ##
+
+    def _update_rooms(self, rows):
+        # Latest message per room => one row per room:
+        last = {}
+        for row in rows:
+            if row['chat_room_id'] not in last or row['id'] > last[row['chat_room_id']]['id']:
+                last[row['chat_room_id']] = row
+        if not last:
+            return
+
+        rooms = ChatRoom.__table__
+        db.session.execute(
+            update(rooms)
+            .where(rooms.c.id == bindparam('room_id'))
+            .values(last_message=bindparam('message'), last_message_sender_name=bindparam('sender'))
+            .execution_options(synchronize_session=False),
+            [{'room_id': room_id, 'message': row['content'], 'sender': row['sender_name']} for room_id, row in last.items()],
+        )
+
+    def _write(self, rows):
+        """
+        Insert messages & set the last message of their rooms, in one transaction.
+        A batch the database refuses is retried row by row: the refused rows are dead-lettered.
+
+        Returns:
+            - int: The number of inserted messages.
+        """
+
+        try:
+            db.session.execute(insert(Message), rows)
+            self._update_rooms(rows)
+            db.session.commit()
+            return len(rows)
+        except (IntegrityError, DataError):
+            db.session.rollback()
+
+        saved, refused = [], []
+        for row in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(Message), [row])
+                saved.append(row)
+            except (IntegrityError, DataError):
+                refused.append(row)
+        self._update_rooms(saved)
+        db.session.commit()
+
+        self._dead_letter(refused)
+        return len(saved)
+
+    def flush(self):
+        """
+        Write the buffered messages (in the current app context).
+
+        Returns:
+            - int: The number of flushed messages (saved or dead-lettered).
+        """
+
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        rows.sort(key=lambda row: row['id'])
+
+        started = time.perf_counter()
+        try:
+            saved = self._write(rows)
+        except Exception:
+            db.session.rollback()
+            with self._lock:
+                self._buffer[:0] = rows
+                self._stats['failures'] += 1
+                self._attempts += 1
+                give_up = self._attempts >= self._config('MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+            # Unreachable database => the spool is replayed once it is back:
+            if give_up:
+                self.spool()
+            raise
+
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._attempts = 0
+            stats = self._stats
+            stats['flushes'] += 1
+            stats['messages'] += saved
+            stats['last_batch_size'] = len(rows)
+            stats['max_batch_size'] = max(stats['max_batch_size'], len(rows))
+            stats['last_flush_ms'] = round(elapsed, 3)
+            stats['max_flush_ms'] = round(max(stats['max_flush_ms'], elapsed), 3)
+            stats['total_flush_ms'] += elapsed
+        return len(rows)
+
+    def process_due(self, batch_size=None):
+        """
+        Replay spooled messages (every SPOOL_REPLAY_INTERVAL seconds), then flush the buffer (in the current app context).
+
+        Returns:
+            - int: The number of flushed messages, 0 when the buffer is empty.
+        """
+
+        if time.monotonic() >= self._next_replay:
+            self._next_replay = time.monotonic() + SPOOL_REPLAY_INTERVAL
+            self.replay_spool()
+        return self.flush()
+
+    ## --- Durability --- ##
+
+    def _spool_dir(self):
+        return self._config('SPOOL_DIR', None) or self.app.instance_path
+
+    def _save_rows(self, prefix, rows):
+        os.makedirs(self._spool_dir(), exist_ok=True)
+        path = os.path.join(self._spool_dir(), f'{prefix}-{os.getpid()}-{time.time_ns()}.jsonl')
+        with open(path, 'w') as file:
+            for row in rows:
+                file.write(json.dumps(dict(row, created=row['created'].isoformat())) + '\n')
+        return path
+
+    def _dead_letter(self, rows):
+        if not rows:
+            return
+        path = self._save_rows('dead-messages', rows)
+        with self._lock:
+            self._stats['dead_lettered'] += len(rows)
+        self.app.logger.warning(f"{len(rows)} chat messages refused by the database, saved to {path}")
+
+    def spool(self):
+        """
+        Save the buffered messages to a file of the spool dir (replayed once the database accepts them).
+        """
+
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            self._attempts = 0
+            self._stats['spooled'] += len(rows)
+        if not rows:
+            return None
+        return self._save_rows('messages', rows)
+
+    def _claimable(self):
+        # Spool files, & the ones a stopped process was replaying:
+        paths = glob.glob(os.path.join(self._spool_dir(), 'messages-*.jsonl'))
+        for path in glob.glob(os.path.join(self._spool_dir(), 'messages-*.jsonl.replaying-*')):
+            pid = int(path.rsplit('-', 1)[1])
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                paths.append(path)
+            except OSError:
+                pass
+        return paths
+
+    def replay_spool(self):
+        """
+        Write the spooled messages (in the current app context), skipping saved ones.
+        A file that cannot be written is put back for the next replay.
+
+        Returns:
+            - int: The number of written messages.
+        """
+
+        written = 0
+        for path in self._claimable():
+            # Rename first => a file is replayed by one process only:
+            original = path.split('.replaying-')[0]
+            claimed = f'{original}.replaying-{os.getpid()}'
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue
+
+            try:
+                with open(claimed) as file:
+                    rows = [json.loads(line) for line in file if line.strip()]
+                for row in rows:
+                    row['created'] = datetime.fromisoformat(row['created'])
+
+                saved = set(db.session.execute(select(Message.id).where(Message.id.in_([row['id'] for row in rows]))).scalars())
+                rows = sorted((row for row in rows if row['id'] not in saved), key=lambda row: row['id'])
+                if rows:
+                    written += self._write(rows)
+            except Exception:
+                db.session.rollback()
+                os.rename(claimed, original)
+                raise
+            os.remove(claimed)
+        return written
+
+    def shutdown(self):
+        """
+        Flush the buffer on exit, or spool it if the database is unreachable.
+        """
+
+        if self.app is None:
+            return
+        try:
+            with self.app.app_context():
+                self.flush()
+        except Exception:
+            path = self.spool()
+            if path:
+                self.app.logger.warning(f"Chat messages could not be saved on shutdown, spooled to {path}")
+
+    def get_stats(self):
+        """
+        The counters of this process: flushes, messages, failures, batch sizes & flush latencies (ms).
+        """
+
+        with self._lock:
+            stats = dict(self._stats, buffered=len(self._buffer))
+        stats['avg_batch_size'] = round(stats['messages'] / stats['flushes'], 2) if stats['flushes'] else 0
+        stats['avg_flush_ms'] = round(stats.pop('total_flush_ms') / stats['flushes'], 3) if stats['flushes'] else 0
+        return stats
+
+message_writer = MessageWriter()
+
+def init_message_writer(app):
+    message_writer.init_app(app)
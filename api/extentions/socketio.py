@@ -1,6 +1,19 @@
 from flask_socketio import SocketIO
 
+from api.extentions.async_mode import get_async_mode, patch_database
+from api.extentions.socketio_queue import get_client_manager, DEFAULT_CHANNEL
+
 socketio = SocketIO()
 
 def init_app(app):
-    socketio.init_app(app)
+    # Greenlets under the gevent worker, threads otherwise (see async_mode):
+    async_mode = get_async_mode(app)
+    if async_mode == 'gevent':
+        patch_database()
+
+    # Emits reach the sockets of every app process through the message queue (see socketio_queue):
+    client_manager = get_client_manager(app.config.get('SOCKETIO_MESSAGE_QUEUE'), app.config.get('SOCKETIO_CHANNEL', DEFAULT_CHANNEL))
+    if client_manager is not None:
+        socketio.init_app(app, async_mode=async_mode, client_manager=client_manager)
+    else:
+        socketio.init_app(app, async_mode=async_mode)
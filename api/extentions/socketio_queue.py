@@ -0,0 +1,262 @@
+"""
+    Extension file; Message queues sharing Socket.IO emits between app processes.
+
+    Each gunicorn worker (or container) holds its own sockets: an emit to a room only reaches the
+    members connected to the emitting process, unless the processes share a message queue. The
+    queue is picked by the scheme of SOCKETIO_MESSAGE_QUEUE:
+        - redis:// or rediss://:   Redis pub/sub (needs the redis package & a Redis server).
+        - postgresql://:           Postgres LISTEN/NOTIFY on the app database, no extra service.
+                                   Payloads above the 8000 bytes NOTIFY limit are split in chunks
+                                   sent in one transaction (delivered together & in order).
+        - local:///<directory>:    Unix datagram sockets in a shared directory, no broker, for the
+                                   workers of a single host (e.g. gunicorn -w 4 in one container).
+                                   Best effort: sends never wait, so an emit to a worker whose
+                                   socket queue is full (busy or stalled, at most
+                                   net.unix.max_dgram_qlen emits) is dropped & logged for that
+                                   worker. For development; use Redis or Postgres when every emit
+                                   must arrive (the gevent profile defaults to Postgres).
+        - None:                    No queue, single process.
+    Socket.IO sessions still live in the process that accepted them: polling clients need sticky
+    sessions (see deploy/), websocket-only clients do not.
+
+    External Libraries:
+        - psycopg2: PostgreSQL database adapter for Python.
+        - socketio: Socket.IO server, its pub/sub client managers.
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+
+    Class Names:
+        - PostgresManager
+        - LocalSocketManager
+
+    Function Names:
+        - get_client_manager
+"""
+
+# Lib Imports:
+import os
+import glob
+import time
+import uuid
+import base64
+import pickle
+import select
+import socket
+import atexit
+import threading
+from urllib.parse import urlparse
+from socketio import PubSubManager, RedisManager
+from sqlalchemy.engine import make_url
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+DEFAULT_CHANNEL = 'lawpeer-socketio'
+NOTIFY_CHUNK_SIZE = 7000        # Characters of a NOTIFY payload (Postgres limit: 8000 bytes)
+LISTEN_TIMEOUT = 5              # Seconds between checks of the Postgres listener connection
+MAX_RETRY_SLEEP = 60
+MAX_DATAGRAM = 256 * 1024       # Largest local emit, in bytes (within the default socket buffers)
+SOCKET_BUFFER = 4 * 1024 * 1024 # Bytes of emits queued for a busy worker (capped by net.core.[rw]mem_max)
+
+class PostgresManager(PubSubManager):
+    """
+        Socket.IO client manager over Postgres LISTEN/NOTIFY.
+    """
+
+    name = 'postgresql'
+
+    def __init__(self, url, channel=DEFAULT_CHANNEL, write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.dsn = make_url(url).set(drivername='postgresql').render_as_string(hide_password=False)
+        self._publisher = None
+        self._publish_lock = threading.Lock()
+        self._listener = None
+        self._chunks = {}           # message id => received chunks
+
+    def initialize(self):
+        # LISTEN before the first emit can be published:
+        if not self.write_only:
+            self._listener = self._listen_connection()
+        super().initialize()
+
+    def _connect(self):
+        import psycopg2
+        return psycopg2.connect(self.dsn)
+
+    def _listen_connection(self):
+        from psycopg2 import sql
+        connection = self._connect()
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(sql.SQL('LISTEN {}').format(sql.Identifier(self.channel)))
+        return connection
+
+    def _publish(self, data):
+        import psycopg2
+        payload = base64.b64encode(pickle.dumps(data)).decode()
+        message_id = uuid.uuid4().hex[:12]
+        chunks = [payload[i:i + NOTIFY_CHUNK_SIZE] for i in range(0, len(payload), NOTIFY_CHUNK_SIZE)]
+
+        with self._publish_lock:
+            for retry in [True, False]:
+                try:
+                    if self._publisher is None or self._publisher.closed:
+                        self._publisher = self._connect()
+                    with self._publisher.cursor() as cursor:
+                        for index, chunk in enumerate(chunks):
+                            cursor.execute('SELECT pg_notify(%s, %s)', (self.channel, f'{message_id}:{index}:{len(chunks)}:{chunk}'))
+                    self._publisher.commit()
+                    return
+                except psycopg2.Error:
+                    self._get_logger().error('Cannot publish to postgres...' + (' retrying' if retry else ' giving up'))
+                    self._close(self._publisher)
+                    self._publisher = None
+
+    def _assemble(self, payload):
+        message_id, index, count, chunk = payload.split(':', 3)
+        if count == '1':
+            return base64.b64decode(chunk)
+
+        chunks = self._chunks.setdefault(message_id, {})
+        chunks[int(index)] = chunk
+        if len(chunks) < int(count):
+            return None
+        del self._chunks[message_id]
+        return base64.b64decode(''.join(chunks[i] for i in range(int(count))))
+
+    def _close(self, connection):
+        try:
+            if connection is not None:
+                connection.close()
+        except Exception:
+            pass
+
+    def _listen(self):
+        import psycopg2
+        retry_sleep = 1
+        while True:
+            try:
+                if self._listener is None or self._listener.closed:
+                    self._listener = self._listen_connection()
+                    self._chunks.clear()
+                    retry_sleep = 1
+                if select.select([self._listener], [], [], LISTEN_TIMEOUT) == ([], [], []):
+                    continue
+                self._listener.poll()
+                while self._listener.notifies:
+                    notify = self._listener.notifies.pop(0)
+                    if notify.channel != self.channel:
+                        continue
+                    message = self._assemble(notify.payload)
+                    if message is not None:
+                        yield message
+            except (psycopg2.Error, OSError, ValueError):
+                self._get_logger().error(f'Cannot receive from postgres... retrying in {retry_sleep} secs')
+                self._close(self._listener)
+                self._listener = None
+                time.sleep(retry_sleep)
+                retry_sleep = min(retry_sleep * 2, MAX_RETRY_SLEEP)
+
+class LocalSocketManager(PubSubManager):
+    """
+        Socket.IO client manager over Unix datagram sockets: every listening process binds
+        <directory>/<channel>.<host id>.sock & an emit is sent to every socket of the directory.
+        Sends are non-blocking: a full socket loses the emit instead of delaying the sender.
+    """
+
+    name = 'local'
+
+    def __init__(self, url, channel=DEFAULT_CHANNEL, write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.directory = urlparse(url).path
+        self.path = os.path.join(self.directory, f'{channel}.{self.host_id}.sock')
+        self._receiver = None
+        self._senders = {}          # destination path => socket
+        self._senders_lock = threading.Lock()
+
+    def initialize(self):
+        # Bind before the first emit can be published:
+        if not self.write_only:
+            os.makedirs(self.directory, exist_ok=True)
+            self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER)
+            self._receiver.bind(self.path)
+            atexit.register(self._unlink, self.path)
+        super().initialize()
+
+    def _unlink(self, path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _publish(self, data):
+        message = pickle.dumps(data)
+        if len(message) > MAX_DATAGRAM:
+            self._get_logger().error(f'Cannot publish to local sockets... {len(message)} bytes emit is too large')
+            return
+
+        for path in glob.glob(os.path.join(glob.escape(self.directory), f'{glob.escape(self.channel)}.*.sock')):
+            try:
+                self._get_sender(path).sendto(message, path)
+            except BlockingIOError:
+                # Queue of a busy worker is full, the other workers still get the emit:
+                self._get_logger().warning(f'Dropped an emit to {path}: its queue is full')
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Socket of a stopped process:
+                self._unlink(path)
+                self._close_sender(path)
+            except OSError as e:
+                self._get_logger().error(f'Cannot publish to {path}: {e}')
+
+    def _get_sender(self, path):
+        # One non-blocking socket per destination: the emits a busy worker has not read yet are
+        # charged to its own sender's buffer, never to the sends to the other workers
+        with self._senders_lock:
+            sender = self._senders.get(path)
+            if sender is None:
+                sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                sender.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER)
+                sender.setblocking(False)
+                self._senders[path] = sender
+            return sender
+
+    def _close_sender(self, path):
+        with self._senders_lock:
+            sender = self._senders.pop(path, None)
+        if sender is not None:
+            sender.close()
+
+    def _listen(self):
+        while True:
+            yield self._receiver.recv(MAX_DATAGRAM)
+
+## --- METHODS --- ##
+
+def get_client_manager(url, channel=DEFAULT_CHANNEL, write_only=False):
+    """
+    Function to build the Socket.IO client manager of a message queue URL.
+
+    Parameters:
+        - url (str): redis://, rediss://, postgresql:// or local:///<directory>, None for no queue.
+        - channel (str): The channel / socket prefix shared by the app processes.
+        - write_only (bool): Only emit (e.g. from a CLI worker), never receive.
+
+    Returns:
+        - PubSubManager or None: None when no queue is configured.
+
+    Raises:
+        - ValueError: If the URL scheme is not supported.
+    """
+
+    if not url:
+        return None
+
+    scheme = urlparse(url).scheme.split('+')[0]
+    if scheme in ['redis', 'rediss']:
+        return RedisManager(url, channel=channel, write_only=write_only)
+    if scheme in ['postgresql', 'postgres']:
+        return PostgresManager(url, channel=channel, write_only=write_only)
+    if scheme == 'local':
+        return LocalSocketManager(url, channel=channel, write_only=write_only)
+    raise ValueError(f"Unsupported SOCKETIO_MESSAGE_QUEUE '{url}', expected redis://, postgresql:// or local:///<directory>")
@@ -25,8 +25,8 @@ class Admin(db.Model):
     role = db.Column(db.String(50))  # Role is 'Admin'
 
     # How to serialize SqlAlchemy PostgreSQL Query to JSON => https://stackoverflow.com/a/46180522
-    def to_dict(self):
-        return to_dict(self)
+    def to_dict(self, fields=None):
+        return to_dict(self, fields)
 
     def __repr__(self):
         return f"<Admin {self.email}>"
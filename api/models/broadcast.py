@@ -0,0 +1,101 @@
+# Lib Imports:
+from datetime import datetime
+from sqlalchemy import text, and_, not_, func
+
+# Module Imports:
+from api.database import db
+from api.utils.helper import to_dict
+from .user import User
+
+# ----------------------------------------------- #
+
+# Broadcast.status values:
+BROADCAST_PENDING = 'pending'
+BROADCAST_SENDING = 'sending'
+BROADCAST_DONE = 'done'
+
+# Broadcast.account_status targets => User predicate:
+ACCOUNT_STATUSES = {
+    'active': and_(User.is_active, not_(User.is_suspended)),
+    'inactive': not_(User.is_active),
+    'suspended': User.is_suspended,
+    'verified': User.is_verified,
+    'unverified': not_(User.is_verified),
+    'public': User.is_public,
+}
+ROLES = ['lawyer', 'client']
+
+# Socket.IO notification rooms, in the namespace of the chat rooms (no chat room may take these names):
+USERS_ROOM = 'users'
+NOTIFICATION_ROOM_PREFIXES = ('role:', 'user:')
+
+def is_notification_room(name):
+    return name == USERS_ROOM or name.startswith(NOTIFICATION_ROOM_PREFIXES)
+
+class Broadcast(db.Model):
+    """
+        A notification sent by an admin to every user matching role / account status / city.
+        Recipients are fanned out in chunks by the broadcast worker (see api.extentions.broadcasts).
+    """
+
+    __tablename__ = 'broadcasts'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    created = db.Column(db.DateTime(timezone=True), default=datetime.now)
+    updated = db.Column(db.DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
+    admin_id = db.Column(db.Integer)
+
+    # Message:
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+
+    # Targets (None => every user):
+    role = db.Column(db.String(50))
+    account_status = db.Column(db.String(20))
+    city = db.Column(db.String(50))
+
+    # Channels:
+    send_email = db.Column(db.Boolean, default=True, nullable=False)
+    send_socket = db.Column(db.Boolean, default=True, nullable=False)
+
+    # Fan-out progress => recipients are walked by id, so a restarted worker resumes after last_user_id:
+    status = db.Column(db.String(10), default=BROADCAST_PENDING, nullable=False)
+    total = db.Column(db.Integer, default=0, nullable=False)           # Matching users when created
+    processed = db.Column(db.Integer, default=0, nullable=False)
+    last_user_id = db.Column(db.Integer, default=0, nullable=False)
+    lease_until = db.Column(db.DateTime)                                # Claimed by a worker until
+    completed_at = db.Column(db.DateTime(timezone=True))
+
+    __table_args__ = (
+        # Polling of unfinished broadcasts:
+        db.Index('ix_broadcasts_unfinished', 'id', postgresql_where=text(f"status <> '{BROADCAST_DONE}'")),
+    )
+
+    def recipient_criteria(self):
+        """
+            The User predicates of the targeted recipients.
+        """
+
+        criteria = []
+        if self.role:
+            criteria.append(User.role == self.role)
+        if self.account_status:
+            criteria.append(ACCOUNT_STATUSES[self.account_status])
+        if self.city:
+            criteria.append(func.lower(User.city) == self.city.lower())
+        return criteria
+
+    def socket_room(self):
+        """
+            The Socket.IO room reaching every recipient at once, None if recipients must be notified one by one.
+        """
+
+        if self.account_status or self.city:
+            return None
+        return f'role:{self.role}' if self.role else USERS_ROOM
+
+    def to_dict(self, fields=None):
+        return to_dict(self, fields)
+
+    def __repr__(self):
+        return f"<Broadcast {self.id} {self.status}>"
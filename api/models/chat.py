@@ -22,6 +22,11 @@ class Message(db.Model):
     chat_room_id = db.Column(db.Integer, db.ForeignKey('chat_rooms.id'))
     # chat_room = db.relationship('ChatRoom', backref='messages_recieved')  # Define the relationship
     
+    __table_args__ = (
+        # Pages of a room history, newest first (before_id / after_id cursors):
+        db.Index('ix_messages_chat_room_id_id', 'chat_room_id', 'id'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -33,19 +38,50 @@ class Message(db.Model):
             # Add other attributes as needed
         }
 
+# ChatRoomMember.role values:
+MEMBER_CREATOR = 'creator'
+MEMBER = 'member'
+
+class ChatRoomMember(db.Model):
+    """
+        Membership of a user in a chat room; the source of truth of who may read & post in a room.
+    """
+    
+    __tablename__ = 'chat_room_members'
+    
+    # Primary key (room_id, user_id) => members of a room & membership checks:
+    room_id = db.Column(db.Integer, db.ForeignKey('chat_rooms.id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    joined_at = db.Column(db.DateTime(timezone=True), default=datetime.now)
+    role = db.Column(db.String(20), default=MEMBER, nullable=False)
+    
+    __table_args__ = (
+        # Rooms of a user ("my rooms"):
+        db.Index('ix_chat_room_members_user_id_room_id', 'user_id', 'room_id'),
+    )
+
 class ChatRoom(db.Model):
     __tablename__ = 'chat_rooms'
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     creator_id = db.Column(db.Integer, nullable=False)
+    
+    # Denormalized copies of the members (ids & display names) returned with the room, kept in sync
+    # by the room controllers; membership is read from chat_room_members:
     user_ids = db.Column(ARRAY(db.Integer), nullable=False, default=[])  # Initialize as an empty list
     user_names = db.Column(ARRAY(db.String(80)), nullable=False, default=[])
+    members = db.relationship('ChatRoomMember', backref='chat_room', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    
+    __table_args__ = (
+        # Rooms are looked up by name on every socket event:
+        db.Index('uq_chat_rooms_name', 'name', unique=True),
+    )
 
     last_message = db.Column(db.Text)
     last_message_sender_name = db.Column(db.Text)
     messages = db.relationship('Message', backref='chat_room', lazy=True)
     
-    def to_dict(self):
-        return to_dict(self)
+    def to_dict(self, fields=None):
+        return to_dict(self, fields)
         
\ No newline at end of file
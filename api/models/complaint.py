@@ -38,8 +38,8 @@ class Complaint(db.Model):
     admin_id = db.Column(db.Integer, db.ForeignKey('admins.id'))
     admin = db.relationship('Admin', backref='complaints')
 
-    def to_dict(self):
-        return to_dict(self)
+    def to_dict(self, fields=None):
+        return to_dict(self, fields)
 
     def __repr__(self):
         return f"<Complaint {self.id}>"
@@ -41,8 +41,8 @@ class Contract(db.Model):
     review = db.relationship('Review', backref='contract', uselist=False)
 
 
-    def to_dict(self):
-        return to_dict(self)
+    def to_dict(self, fields=None):
+        return to_dict(self, fields)
 
     def __repr__(self):
         return f"<Contract {self.id}>"
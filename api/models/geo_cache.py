@@ -0,0 +1,40 @@
+# Lib Imports:
+from datetime import datetime
+
+# Module Imports:
+from api.database import db
+
+# ----------------------------------------------- #
+
+class GeoCache(db.Model):
+    """
+        Reverse geocoding results keyed by rounded coordinates (see api.utils.geo_cache).
+    """
+    
+    __tablename__ = 'geo_cache'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    created = db.Column(db.DateTime(timezone=True), default=datetime.now)
+    updated = db.Column(db.DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    
+    # Coordinates rounded to GEO_CACHE_PRECISION decimals, stored scaled as integers (exact match):
+    lat_key = db.Column(db.Integer, nullable=False)
+    long_key = db.Column(db.Integer, nullable=False)
+    
+    # Address:
+    country = db.Column(db.String(50))
+    city = db.Column(db.String(50))
+    postal_code = db.Column(db.String(20))
+    geo_address = db.Column(db.Text)
+    
+    # Counters:
+    hits = db.Column(db.Integer, default=0, nullable=False)      # Served from this row
+    misses = db.Column(db.Integer, default=0, nullable=False)    # Fetched from the provider (first time & after expiry)
+    
+    __table_args__ = (
+        db.UniqueConstraint('lat_key', 'long_key', name='uq_geo_cache_lat_long'),
+    )
+
+    def __repr__(self):
+        return f"<GeoCache {self.lat_key},{self.long_key}>"
@@ -6,8 +6,13 @@ class OTP(db.Model):
     email = db.Column(db.String(120), nullable=False)
     otp = db.Column(db.String(6), nullable=False)
     otp_for = db.Column(db.String(50), nullable=False)
-    expiry_time = db.Column(db.DateTime, nullable=False)
+    expiry_time = db.Column(db.DateTime, nullable=False, index=True)     # Indexed for the expiry purge
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Latest OTP of an email for a purpose (verify_otp) & bulk deletes by email:
+        db.Index('ix_otp_email_otp_for_created_at', 'email', 'otp_for', 'created_at'),
+    )
+
     def __repr__(self):
         return f"<OTP {self.id}>"
@@ -0,0 +1,53 @@
+# Lib Imports:
+from datetime import datetime
+from sqlalchemy import text
+
+# Module Imports:
+from api.database import db
+
+# ----------------------------------------------- #
+
+# OutboxEmail.status values:
+OUTBOX_PENDING = 'pending'
+OUTBOX_SENT = 'sent'
+OUTBOX_DEAD = 'dead'            # Gave up after MAIL_OUTBOX_MAX_ATTEMPTS, kept for inspection
+
+# OutboxEmail.priority values => transactional emails (OTPs) are sent before bulk ones:
+PRIORITY_TRANSACTIONAL = 0
+PRIORITY_BULK = 1
+
+class OutboxEmail(db.Model):
+    """
+        Emails waiting to be sent by the outbox worker (see api.extentions.mail_outbox).
+    """
+    
+    __tablename__ = 'email_outbox'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    created = db.Column(db.DateTime(timezone=True), default=datetime.now)
+    updated = db.Column(db.DateTime(timezone=True), default=datetime.now, onupdate=datetime.now)
+    
+    # Message:
+    subject = db.Column(db.String(255), nullable=False)
+    sender = db.Column(db.String(120), nullable=False)
+    recipients = db.Column(db.Text, nullable=False)     # Comma separated
+    body = db.Column(db.Text)
+    
+    # Delivery:
+    status = db.Column(db.String(10), default=OUTBOX_PENDING, nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.now)
+    last_error = db.Column(db.Text)
+    sent_at = db.Column(db.DateTime(timezone=True))
+    priority = db.Column(db.SmallInteger, default=PRIORITY_TRANSACTIONAL, nullable=False)
+    
+    # Admin broadcast the email belongs to (delivery progress):
+    broadcast_id = db.Column(db.Integer, index=True)
+    
+    __table_args__ = (
+        # Polling of due emails, by priority:
+        db.Index('ix_email_outbox_pending', 'priority', 'next_attempt_at', postgresql_where=text(f"status = '{OUTBOX_PENDING}'")),
+    )
+
+    def __repr__(self):
+        return f"<OutboxEmail {self.id} {self.status}>"
@@ -30,8 +30,8 @@ class Review(db.Model):
         ForeignKeyConstraint(['lawyer_id'], ['lawyers.id']),
     )
     
-    def to_dict(self):
-        return to_dict(self)
+    def to_dict(self, fields=None):
+        return to_dict(self, fields)
 
     def __repr__(self):
         return f"<Review {self.id}>"
@@ -0,0 +1,22 @@
+# Lib Imports:
+from datetime import datetime
+
+# Module Imports:
+from api.database import db
+
+# ----------------------------------------------- #
+
+class RevokedToken(db.Model):
+    """
+        JWTs revoked before their expiry (logout), checked through api.utils.revocation.
+    """
+    
+    __tablename__ = 'revoked_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)    # Increasing => workers sync new rows by id
+    created = db.Column(db.DateTime(timezone=True), default=datetime.now)
+    jti = db.Column(db.String(36), nullable=False, unique=True)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False, index=True)  # Purge after the token expires
+    
+    def __repr__(self):
+        return f"<RevokedToken {self.jti}>"
@@ -15,8 +15,8 @@ class Transaction(db.Model):
     contract_id = db.Column(db.Integer, db.ForeignKey('contracts.id'))
     contract = db.relationship('Contract', backref='transactions')
 
-    def to_dict(self):
-        return to_dict(self)
+    def to_dict(self, fields=None):
+        return to_dict(self, fields)
 
     def __repr__(self):
         return f"<Transaction {self.id}>"
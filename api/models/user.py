@@ -7,14 +7,16 @@
 
 # Lib Imports
 from datetime import datetime
-from sqlalchemy import inspect
-from sqlalchemy.orm import relationship
-from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy import inspect, and_, not_, text, func
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.hybrid import hybrid_property, hybrid_method
 
 # Module Imports:
 from api.database import db
 from api.utils.helper import to_dict
-from api.utils.geo_locator import get_address
+from api.utils.geo_locator import haversine, EARTH_RADIUS_KM
+from api.utils.geo_cache import get_cached_address
 
 # Models Imports:
 from .review import Review
@@ -22,6 +24,14 @@ from .skill import lawyer_skills
 
 # ----------------------------------------------- #
 
+# Text search configuration of Lawyer.search_vector (queries must use the same one):
+SEARCH_CONFIG = 'english'
+
+# User.geo_status values:
+GEO_PENDING = 'pending'
+GEO_RESOLVED = 'resolved'
+GEO_FAILED = 'failed'
+
 # SQL Datatype Objects => https://docs.sqlalchemy.org/en/14/core/types.html
 class User(db.Model):
     __tablename__ = 'users'
@@ -61,11 +71,32 @@ class User(db.Model):
     def role_type(cls):
         return cls.role
 
+    # Publicly visible account => shown to non-admin users in listings & profiles:
+    @hybrid_property
+    def is_public(self):
+        return self.is_verified and self.is_active and not self.is_suspended
+
+    @is_public.expression
+    def is_public(cls):
+        # Must match the predicate of ix_users_public_role for the partial index to be used.
+        return and_(cls.is_verified, cls.is_active, not_(cls.is_suspended))
+
     __mapper_args__ = {
         'polymorphic_identity': 'user',
         'polymorphic_on': role,
     }
     
+    __table_args__ = (
+        # Keyset pagination of the lawyer/client directories sorted by rating (NULL ranked as 0):
+        db.Index('ix_users_average_rating_id', text('coalesce(average_rating, 0)'), 'id'),
+        # Non-admin listings only ever read publicly visible accounts:
+        db.Index('ix_users_public_role', 'role', postgresql_where=text('is_verified AND is_active AND NOT is_suspended')),
+        # Bounding box prefilter of radius searches:
+        db.Index('ix_users_latitude_longitude', 'latitude', 'longitude'),
+        # Polling of the background geocoding queue:
+        db.Index('ix_users_geo_pending', 'geo_retry_at', postgresql_where=text("geo_status = 'pending'")),
+    )
+    
     # Location address:
     longitude = db.Column(db.Float)
     latitude = db.Column(db.Float)
@@ -74,18 +105,50 @@ class User(db.Model):
     postal_code = db.Column(db.Integer)
     geo_address = db.Column(db.Text)
     
-    def fill_location_address(self, lat, long):
-        try:
-            country, city, postal_code, full_address = get_address(lat, long)
-            self.latitude = lat
-            self.longitude = long
-            self.country = country
-            self.city = city
-            self.geo_address = full_address
-            self.postal_code = postal_code
-        except Exception as e:
-            # Log the error or handle it appropriately
-            print(f"Error occurred while fetching address: {e}")
+    # Reverse geocoding state => address fields are filled in the background (see api.extentions.geo_queue):
+    geo_status = db.Column(db.String(10))                   # None (no location), 'pending', 'resolved' or 'failed'
+    geo_attempts = deferred(db.Column(db.Integer, default=0, nullable=False))
+    geo_retry_at = deferred(db.Column(db.DateTime))         # Next attempt of a pending location
+    
+    def set_location(self, lat, long):
+        """
+            Save the coordinates & queue their address lookup; the address fields are left
+            as they are until the background worker resolves the new location.
+        """
+        
+        self.latitude = float(lat)
+        self.longitude = float(long)
+        self.geo_status = GEO_PENDING
+        self.geo_attempts = 0
+        self.geo_retry_at = datetime.now()
+    
+    def fill_location_address(self, fetch=None):
+        """
+            Resolve the address of the saved coordinates (through the geo cache).
+            Raises on provider errors, the caller decides whether to retry.
+        """
+        
+        country, city, postal_code, full_address = get_cached_address(self.latitude, self.longitude, fetch=fetch)
+        self.country = country
+        self.city = city
+        self.geo_address = full_address
+        self.postal_code = postal_code
+        self.geo_status = GEO_RESOLVED
+        self.geo_retry_at = None
+    
+    # Great-circle distance (km) from a point => usable on instances & in queries:
+    @hybrid_method
+    def distance_to(self, lat, long):
+        if self.latitude is None or self.longitude is None:
+            return None
+        return haversine(self.latitude, self.longitude, lat, long)
+
+    @distance_to.expression
+    def distance_to(cls, lat, long):
+        half_d_lat = func.radians(cls.latitude - lat) * 0.5
+        half_d_long = func.radians(cls.longitude - long) * 0.5
+        a = func.power(func.sin(half_d_lat), 2) + func.cos(func.radians(cls.latitude)) * func.cos(func.radians(lat)) * func.power(func.sin(half_d_long), 2)
+        return 2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(a)))
     
     # Additional fields for average rating & total rating
     total_ratings = db.Column(db.Float, default=0)
@@ -108,8 +171,8 @@ class User(db.Model):
         self.num_reviews -= 1
         self.update_average_rating()
     
-    def to_dict(self):
-        return to_dict(self)
+    def to_dict(self, fields=None):
+        return to_dict(self, fields)
 
     def __repr__(self):
         return f"<User {self.email}>"
@@ -127,12 +190,44 @@ class Lawyer(User):
     # Relationship with skills
     skills = db.relationship('Skill', secondary=lawyer_skills, backref=db.backref('lawyers', lazy='dynamic'))
     
+    # Full text search document (names, skills, city, about) => deferred, never serialized:
+    search_vector = deferred(db.Column(TSVECTOR))
+    
     __mapper_args__ = {
         'polymorphic_identity': 'lawyer',
         
         # BUG Fixed: https://stackoverflow.com/questions/2863336/creating-self-referential-tables-with-polymorphism-in-sqlalchemy/2863398#2863398
         'inherit_condition': (id == User.id),
     }
+    
+    __table_args__ = (
+        db.Index('ix_lawyers_search_vector', 'search_vector', postgresql_using='gin'),
+    )
+    
+    def refresh_search_vector(self):
+        """
+            Rebuild search_vector from the current names, skills, city & about.
+            Must be called whenever one of them changes, before the commit.
+        """
+        
+        names = f"{self.first_name or ''} {self.last_name or ''}"
+        skills = ' '.join(skill.name for skill in self.skills)
+        
+        self.search_vector = Lawyer.search_document(names, skills, self.city or '', self.about or '')
+    
+    @staticmethod
+    def search_document(names, skills, city, about):
+        """
+            The search_vector expression of the given texts (values or SQL expressions,
+            e.g. to rebuild many rows in one UPDATE).
+        """
+        
+        return (
+            func.setweight(func.to_tsvector(SEARCH_CONFIG, names), 'A')
+            .op('||')(func.setweight(func.to_tsvector(SEARCH_CONFIG, skills), 'A'))
+            .op('||')(func.setweight(func.to_tsvector(SEARCH_CONFIG, city), 'B'))
+            .op('||')(func.setweight(func.to_tsvector(SEARCH_CONFIG, about), 'C'))
+        )
 
     def __repr__(self):
         return f"<Lawyer {self.email}>"
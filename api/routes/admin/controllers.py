@@ -9,6 +9,8 @@
         - db: Database instance for SQLAlchemy
         - Admin: Admin model representing the administrator entity
         - hash_password: Function for hashing passwords
+        - invalidate_account: Function for dropping the cached account state of an admin
+        - filter_date_range: Function for restricting an export to a created/updated range
 
     Functions:
         - create_admin()
@@ -18,15 +20,34 @@
         - get_admin_by_email()
         - get_all_admin()
         - create_super_admin()
+        - get_export_statement()
+        - create_broadcast()
 """
 
+# Lib Imports
+from sqlalchemy import select, func
+
 # Module Imports
 from api.database import db
 from api.models.admin import Admin
+from api.models.user import User, Lawyer, Client
+from api.models.contract import Contract
+from api.models.transaction import Transaction
+from api.models.broadcast import Broadcast, ACCOUNT_STATUSES, ROLES
+from api.extentions.broadcasts import broadcasts
+from api.utils.exporter import filter_date_range
 from api.utils.hasher import hash_password
+from api.utils.revocation import invalidate_account
 
 # ----------------------------------------------- #
 
+## --- CONTS --- ##
+
+EXPORT_RESOURCES = ['users', 'contracts', 'transactions']
+
+# Never exported:
+EXPORT_EXCLUDED_COLUMNS = {'password', 'search_vector'}
+
 def create_admin(email, password, phone_number, id=None, role=None, **kwargs):
     """
         Creates a new admin with the provided details.
@@ -83,6 +104,7 @@ def update_admin(id, email=None, password=None, phone_number=None, **kwargs):
         for key, value in kwargs.items():
             setattr(admin, key, value)
         db.session.commit()
+        invalidate_account('admin', admin.id)
         return admin
     return None
 
@@ -101,6 +123,7 @@ def delete_admin(id):
     if admin:
         db.session.delete(admin)
         db.session.commit()
+        invalidate_account('admin', id)
         return admin
     return None
 
@@ -169,4 +192,75 @@ def reset_password(email, new_password):
         admin.password = hashed_password
         db.session.commit()
         return admin
-    return None
\ No newline at end of file
+    return None
+
+def get_export_statement(resource, **date_range):
+    """
+        Builds the select of a full (or incremental) extract, ordered by id.
+        Users are exported with their lawyer & client columns (empty for the other role).
+
+        Args:
+            resource (str): 'users', 'contracts' or 'transactions'.
+            date_range: created_from, created_to, updated_from, updated_to (see api.utils.exporter).
+
+        Returns:
+            Select: The statement to stream, None if the resource is unknown.
+    """
+    
+    def columns(table, excluded=()):
+        return [column for column in table.c if column.name not in EXPORT_EXCLUDED_COLUMNS and column.name not in excluded]
+    
+    if resource == 'users':
+        users, lawyers, clients = User.__table__, Lawyer.__table__, Client.__table__
+        table = users
+        statement = (
+            select(*columns(users), *columns(lawyers, ['id']), *columns(clients, ['id']))
+            .select_from(users.outerjoin(lawyers, lawyers.c.id == users.c.id).outerjoin(clients, clients.c.id == users.c.id))
+        )
+    elif resource == 'contracts':
+        table = Contract.__table__
+        statement = select(*columns(table))
+    elif resource == 'transactions':
+        table = Transaction.__table__
+        statement = select(*columns(table))
+    else:
+        return None
+    
+    return filter_date_range(statement, table, **date_range).order_by(table.c.id)
+
+def create_broadcast(admin_id, subject, body, role=None, account_status=None, city=None, channels=None):
+    """
+        Saves a broadcast & wakes the broadcast worker up; recipients are counted now & notified in the background.
+
+        Args:
+            admin_id (int): The sending admin.
+            subject (str): The notification / email subject.
+            body (str): The notification / email body.
+            role (str, optional): 'lawyer' or 'client', every user if None.
+            account_status (str, optional): One of ACCOUNT_STATUSES (e.g. 'active', 'verified').
+            city (str, optional): Recipients' city (case insensitive).
+            channels (list, optional): 'email' and/or 'socket', both if None.
+
+        Returns:
+            Broadcast: The saved broadcast.
+
+        Raises:
+            ValueError: If a target or channel is unknown.
+    """
+    
+    channels = ['email', 'socket'] if channels is None else channels
+    if role and role not in ROLES:
+        raise ValueError(f'Unknown role, expected one of: {", ".join(ROLES)}')
+    if account_status and account_status not in ACCOUNT_STATUSES:
+        raise ValueError(f'Unknown status, expected one of: {", ".join(ACCOUNT_STATUSES)}')
+    if not isinstance(channels, list) or not channels or set(channels) - {'email', 'socket'}:
+        raise ValueError("Invalid channels, expected a list of 'email' and/or 'socket'")
+    
+    broadcast = Broadcast(admin_id=admin_id, subject=subject, body=body, role=role or None, account_status=account_status or None, city=city or None,
+                          send_email='email' in channels, send_socket='socket' in channels)
+    broadcast.total = db.session.execute(select(func.count(User.id)).where(*broadcast.recipient_criteria())).scalar()
+    db.session.add(broadcast)
+    db.session.commit()
+    
+    broadcasts.enqueue(broadcast.id)
+    return broadcast
@@ -4,7 +4,6 @@
   External Libraries:
     - flask: A micro web framework for Python.
     - flask_jwt_extended: An extension for Flask that adds JWT support to your application.
-    - flask_mail: An extension for Flask that adds email sending capabilities to your application.
     - flasgger: An extension for Flask that provides Swagger documentation and UI integration.
 
   Function Names:
@@ -14,8 +13,12 @@
     - update_existing_admin:  Update admin by ID, AC: super_or_current_admin_required.
     - delete_existing_admin:  Update admin by ID, AC: super_or_current_admin_required. 
     - login:                  Generate access_token for admin, MANDATORY: email, password.
+    - logout:                 Revoke the access_token of the request, AC: jwt_required.
     - forgot_pass:            Generate otp for forget password, MANDATORY: email.
     - password_reset:         Reset admin password: MANDATORY: email, new_password, otp.
+    - export:                 Stream users, contracts or transactions as CSV/NDJSON (created/updated range), AC: admin_required.
+    - create_new_broadcast:   Notify users by role/status/city over Socket.IO & email, AC: admin_required, MANDATORY: subject, body.
+    - broadcast_progress:     Get the fan-out & email delivery progress of a broadcast, AC: admin_required.
       
   TODO: 1 - Add JWT logic secure on all routes (Only admins can access these routes).   - [DONE]
         2 - Add DOC strings on each func.                                               - [DONE]
@@ -27,18 +30,22 @@
 """
 
 # Lib Imports
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required
-from flask_mail import Message
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from flasgger import swag_from
 
 # Module Imports
-from api.extentions.mail import mail
+from api.extentions.mail_outbox import outbox
 from api.utils.otp_generator import generate_otp, save_otp, verify_otp, delete_all_otps
-from api.routes.admin.controllers import create_admin, update_admin, delete_admin, get_admin_by_id, get_all_admin, reset_password
+from api.routes.admin.controllers import create_admin, update_admin, delete_admin, get_admin_by_id, get_all_admin, reset_password, get_export_statement, EXPORT_RESOURCES, create_broadcast
 from api.utils.token_generator import generate_admin_access_token
 from api.utils.status_codes import Status
+from api.utils.revocation import revoke_token
+from api.extentions.broadcasts import broadcasts
+from api.models.broadcast import Broadcast
+from api.utils.exporter import export_rows, parse_date_range, EXPORT_FORMATS, DEFAULT_BATCH_SIZE
 from api.decorators.mandatory_keys import check_mandatory
+from api.decorators.rate_limit import rate_limit
 from api.decorators.access_control_decorators import admin_required, super_admin_required, super_or_current_admin_required
 
 # ----------------------------------------------- #
@@ -242,6 +249,8 @@ def delete_existing_admin(id):
 # Admin Login Endpoint
 @admin_routes.route('/login', methods=['POST'])
 @swag_from(methods=['POST'])
+@rate_limit(20, 60)
+@rate_limit(5, 300, key='email')
 @check_mandatory(['email', 'password'])
 def login():
     """
@@ -271,6 +280,10 @@ def login():
         description: Invalid credentials.
       422:
         description: Missing mandatory key(s) in request.
+      429:
+        description: Too many login attempts from this IP or for this email.
+      503:
+        description: Password checks are saturated, retry later.
     """
     
     data = request.get_json()
@@ -285,37 +298,233 @@ def login():
     
     return jsonify({'error': 'Invalid credentials'}), Status.HTTP_401_UNAUTHORIZED
 
+@admin_routes.route('/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    """
+    Endpoint to revoke the access token of the request.
+
+    ---
+    tags:
+      - Auth
+    description: Revoke the current access token until it expires.
+    responses:
+      200:
+        description: Successful operation. Token revoked.
+      401:
+        description: Missing, invalid or already revoked token.
+    """
+    
+    token = get_jwt()
+    revoke_token(token['jti'], token['exp'])
+    return jsonify({'message': 'Logged out successfully'}), Status.HTTP_200_OK
+
 @admin_routes.route('/forgot-password-otp', methods=['POST'])
+@rate_limit(10, 3600)
+@rate_limit(3, 600, key='email')
 @check_mandatory(['email'])
 def forgot_pass():
     email = request.json.get('email')
     
     otp = generate_otp()
-    save_otp(email, otp)
+    save_otp(email, otp, otp_for='admin_password_reset')
 
-    msg = Message('Forgot Password - OTP', sender='info.lawpeer@gmail.com', recipients=[email])
-    msg.body = f'Your OTP for resetting the password is: {otp}'
-    
     try:
-        mail.send(msg)
+        # Sent in the background by the outbox worker:
+        outbox.enqueue(subject='Forgot Password - OTP', recipients=[email], body=f'Your OTP for resetting the password is: {otp}', sender='info.lawpeer@gmail.com')
         return jsonify({'message': 'OTP sent successfully'}), Status.HTTP_200_OK
     except Exception as e:
-        delete_all_otps(email)
+        delete_all_otps(email, otp_for='admin_password_reset')
         return jsonify({'error': str(e)}), Status.HTTP_500_INTERNAL_SERVER_ERROR
   
 @admin_routes.route('/reset-password', methods=['POST'])
+@rate_limit(20, 600)
+@rate_limit(10, 600, key='email')
 @check_mandatory(['email', 'new_password', 'otp'])
 def password_reset():
     email = request.json.get('email')
     otp = request.json.get('otp')
     new_password = request.json.get('new_password')
     
-    if verify_otp(email, otp):
+    if verify_otp(email, otp, otp_for='admin_password_reset'):
         resetted_pass = reset_password(email, new_password)
         if resetted_pass:
-          delete_all_otps(email)
+          delete_all_otps(email, otp_for='admin_password_reset')
           return jsonify({'message': 'Password reset successfully'}), Status.HTTP_200_OK
         else:
          return jsonify({'error': f'Admin with email: {email} not found'}), Status.HTTP_404_NOT_FOUND 
     else:
         return jsonify({'error': 'Invalid OTP or OTP expired'}), Status.HTTP_400_BAD_REQUEST
+
+@admin_routes.route('/export/<resource>', methods=['GET'])
+@jwt_required()
+@swag_from(methods=['GET'])
+@admin_required
+def export(resource):
+    """
+    Endpoint to stream a full or incremental extract of a table.
+
+    ---
+    tags:
+      - Admin
+    description: Stream users, contracts or transactions as CSV or NDJSON, ordered by id, with bounded memory.
+    security:
+      - JWT: []
+    parameters:
+      - name: resource
+        in: path
+        type: string
+        enum: [users, contracts, transactions]
+        required: true
+      - name: format
+        in: query
+        type: string
+        enum: [csv, ndjson]
+        required: false
+        description: Defaults to csv.
+      - name: created_from
+        in: query
+        type: string
+        required: false
+        description: ISO 8601 date, inclusive.
+      - name: created_to
+        in: query
+        type: string
+        required: false
+        description: ISO 8601 date, exclusive.
+      - name: updated_from
+        in: query
+        type: string
+        required: false
+        description: ISO 8601 date, inclusive (incremental extracts).
+      - name: updated_to
+        in: query
+        type: string
+        required: false
+        description: ISO 8601 date, exclusive.
+    responses:
+      200:
+        description: Successful operation. Streams the extract as an attachment.
+      400:
+        description: Unknown format or invalid date.
+      401:
+        description: Unauthorized access.
+      404:
+        description: Unknown resource.
+    """
+    
+    if resource not in EXPORT_RESOURCES:
+        return jsonify({'error': f'Unknown export, expected one of: {", ".join(EXPORT_RESOURCES)}'}), Status.HTTP_404_NOT_FOUND
+    
+    format = request.args.get('format', 'csv')
+    if format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unknown format, expected one of: {", ".join(EXPORT_FORMATS)}'}), Status.HTTP_400_BAD_REQUEST
+    
+    try:
+        date_range = parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
+    statement = get_export_statement(resource, **date_range)
+    rows = export_rows(statement, format, batch_size=current_app.config.get('EXPORT_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+    return Response(
+        stream_with_context(rows),
+        mimetype=EXPORT_FORMATS[format],
+        headers={'Content-Disposition': f'attachment; filename={resource}.{format}'},
+    )
+
+@admin_routes.route('/broadcasts', methods=['POST'])
+@jwt_required()
+@swag_from(methods=['POST'])
+@check_mandatory(['subject', 'body'])
+@admin_required
+def create_new_broadcast():
+    """
+    Endpoint to notify many users at once.
+
+    ---
+    tags:
+      - Admin
+    description: Notify every user matching role / status / city over Socket.IO ('notification' event) and email. Recipients are fanned out in the background.
+    security:
+      - JWT: []
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            properties:
+              subject:
+                type: string
+              body:
+                type: string
+              role:
+                type: string
+                enum: [lawyer, client]
+                description: Every user if omitted.
+              status:
+                type: string
+                enum: [active, inactive, suspended, verified, unverified, public]
+              city:
+                type: string
+              channels:
+                type: array
+                items:
+                  type: string
+                  enum: [email, socket]
+                description: Both if omitted.
+    responses:
+      202:
+        description: Broadcast queued. Returns its progress (see GET /broadcasts/<id>).
+      400:
+        description: Unknown role, status or channel.
+      401:
+        description: Unauthorized access.
+      422:
+        description: Missing mandatory key(s).
+    """
+    
+    data = request.get_json()
+    
+    try:
+        broadcast = create_broadcast(get_jwt_identity().get('id'), subject=data.get('subject'), body=data.get('body'), role=data.get('role'),
+                                     account_status=data.get('status'), city=data.get('city'), channels=data.get('channels'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
+    return jsonify(broadcasts.get_progress(broadcast)), Status.HTTP_202_ACCEPTED
+
+@admin_routes.route('/broadcasts/<int:id>', methods=['GET'])
+@jwt_required()
+@swag_from(methods=['GET'])
+@admin_required
+def broadcast_progress(id):
+    """
+    Endpoint to follow the delivery of a broadcast.
+
+    ---
+    tags:
+      - Admin
+    description: Get the status, recipients processed out of total & email counts (pending, sent, dead) of a broadcast.
+    security:
+      - JWT: []
+    parameters:
+      - name: id
+        in: path
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Successful operation. Returns the progress.
+      401:
+        description: Unauthorized access.
+      404:
+        description: Broadcast not found.
+    """
+    
+    broadcast = Broadcast.query.get(id)
+    if broadcast is None:
+        return jsonify({'error': 'Broadcast not found'}), Status.HTTP_404_NOT_FOUND
+    
+    return jsonify(broadcasts.get_progress(broadcast)), Status.HTTP_200_OK
@@ -1,33 +1,37 @@
 from werkzeug.utils import secure_filename
+from sqlalchemy import select, update
 import os
 # Module Imports:
 from api.models.chat import ChatRoom, Message
 from api.models.user import User
 from api.database import db
 from api.utils.helper import allowed_documents, get_upload_folder, rename_document
+from api.utils.room_cache import get_room
+from api.extentions.message_writer import message_writer
+from api.utils.paginator import parse_limit
 
 def save_message(room_name, message_content, user_id):
     """
     Send a message to a chat room.
 
     Args:
-        room_id (int): ID of the chat room.
+        room_name (str): Name of the chat room (id resolved from the room membership cache).
         message_content (str): Content of the message.
         user_id (int): ID of the user sending the message.
     """
     
-    room = ChatRoom.query.filter_by(name=room_name).first()
+    room = get_room(room_name)
     if room:
-        room_id = room.id
+        room_id = room[0]
+        
+        # Emitted at once, written with the next batch:
+        if message_writer.is_enabled():
+            return message_writer.add(room_id, user_id, message_content)
     
-        user = User.query.get(user_id)
+        user = db.session.execute(select(User.first_name, User.last_name, User.profile_image).where(User.id == user_id)).first()
         if user:
             sender_name = user.first_name + " " + user.last_name
             
-            # Set room related fields:
-            room.last_message = message_content
-            room.last_message_sender_name = sender_name
-            
             if user.profile_image:
                 sender_profile_image = user.profile_image
             else:
@@ -35,13 +39,53 @@ def save_message(room_name, message_content, user_id):
         else:
             return None
         
+        # Set room related fields, without loading the room:
+        db.session.execute(update(ChatRoom).where(ChatRoom.id == room_id).values(last_message=message_content, last_message_sender_name=sender_name))
+        
         message = Message(sender_id=user_id, sender_name=sender_name, sender_profile_image=sender_profile_image, content=message_content, chat_room_id=room_id)
         db.session.add(message)
         db.session.commit()
         return message
     
-def get_room_messages_by_id(id):
-    return Message.query.filter_by(chat_room_id=id).all()
+def get_room_messages_by_id(id, before_id=None, after_id=None, limit=None):
+    """
+    Get one page of the messages of a chat room, newest first (index ix_messages_chat_room_id_id).
+
+    Args:
+        id (int): ID of the chat room.
+        before_id (int, optional): Only messages older than this message (scrolling back).
+        after_id (int, optional): Only messages newer than this message (catching up); the page
+            holds the `limit` messages right after it, so repeating with the newest id never skips one.
+        limit (int, optional): Page size (default 20, max 100).
+
+    Returns:
+        tuple: (list of messages, has_more) => has_more tells if older (or, with after_id, newer) messages are left.
+
+    Raises:
+        ValueError: If before_id or after_id is not an integer.
+    """
+    
+    try:
+        before_id = int(before_id) if before_id not in (None, '') else None
+        after_id = int(after_id) if after_id not in (None, '') else None
+    except (TypeError, ValueError):
+        raise ValueError('Invalid before_id or after_id, expected a message id')
+    limit = parse_limit(limit)
+    
+    query = Message.query.filter(Message.chat_room_id == id)
+    if before_id is not None:
+        query = query.filter(Message.id < before_id)
+    if after_id is not None:
+        query = query.filter(Message.id > after_id)
+    
+    # One extra row tells if there is more:
+    if after_id is not None and before_id is None:
+        messages = query.order_by(Message.id.asc()).limit(limit + 1).all()
+        has_more = len(messages) > limit
+        return messages[:limit][::-1], has_more
+    
+    messages = query.order_by(Message.id.desc()).limit(limit + 1).all()
+    return messages[:limit], len(messages) > limit
 
 def save_document(file):
     UPLOAD_FOLDER = get_upload_folder()
@@ -3,17 +3,23 @@
             1 - create a function for: ChatRoom.query.filter_by(name=name).first()
 """
 
+# Lib Imports:
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
 # Module Imports:
-from api.models.chat import ChatRoom
+from api.models.chat import ChatRoom, ChatRoomMember, MEMBER, MEMBER_CREATOR
 from api.models.user import User
+from api.models.broadcast import is_notification_room
 from api.database import db
+from api.utils.room_cache import is_member, invalidate_room
 
 def get_all_rooms():
     return ChatRoom.query.all()
 
 def get_user_rooms(id):
-    # Query rooms where the user_ids array contains the specified id
-    return ChatRoom.query.filter(ChatRoom.user_ids.contains([id])).all()
+    # Rooms of the user, through the (user_id, room_id) index of chat_room_members:
+    return ChatRoom.query.join(ChatRoomMember, ChatRoomMember.room_id == ChatRoom.id).filter(ChatRoomMember.user_id == id).all()
 
 def get_room_by_name(name):
     return ChatRoom.query.filter_by(name=name).first()
@@ -42,9 +48,48 @@ def delete_room_by_name_or_id(identifier):
     if room:
         db.session.delete(room)
         db.session.commit()
+        invalidate_room(name=room.name, room_id=room.id)
     
     return room
 
+def is_room_creator(chat_room_id, user_id):
+    """
+    Check if a user created a chat room (may add members to it).
+    """
+    
+    return db.session.execute(
+        select(ChatRoom.id).where(ChatRoom.id == chat_room_id, ChatRoom.creator_id == user_id)
+    ).first() is not None
+
+def parse_user_ids(user_ids):
+    """
+    Check the user IDs of a request: one ID or a list of IDs.
+
+    Returns:
+        list: The user IDs.
+
+    Raises:
+        ValueError: If user_ids is neither an int nor a list of ints.
+    """
+    
+    # bool is an int subclass, True is not a user ID:
+    def is_id(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+    
+    if is_id(user_ids):
+        return [user_ids]
+    if isinstance(user_ids, list) and all(is_id(id) for id in user_ids):
+        return user_ids
+    raise ValueError('Invalid user_ids, expected a user ID or a list of user IDs')
+
+def _load_users(user_ids):
+    """
+    Load the users of a list of IDs in one query, in the order of the list (duplicates & unknown IDs dropped).
+    """
+    
+    users = {user.id: user for user in User.query.filter(User.id.in_(user_ids)).all()} if user_ids else {}
+    return [users[id] for id in dict.fromkeys(user_ids) if id in users]
+
 def create_chat_room(name, creator_id, user_ids):
     """
     Create a new chat room.
@@ -56,90 +101,93 @@ def create_chat_room(name, creator_id, user_ids):
 
     Returns:
         ChatRoom: Created chat room instance.
+
+    Raises:
+        ValueError: If the name is empty or reserved for the notification rooms, or user_ids is malformed.
     """
     
+    # Members of a chat room named e.g. 'users' would message every connected user:
+    if not isinstance(name, str) or not name.strip() or is_notification_room(name):
+        raise ValueError('Invalid chat room name, it is empty or reserved')
+    
     # Check if a chat room with the same name already exists
     existing_chat_room = ChatRoom.query.filter_by(name=name).first()
     if existing_chat_room:
         # Return None if a chat room with the same name already exists
         return None
     
-    # Create a new chat room
-    chat_room = ChatRoom(name=name, creator_id=creator_id)
-
-    # Add user IDs to the chat room
-    for user_id in user_ids:
-        user = User.query.get(user_id)
-        if user:
-            existing_user_ids = chat_room.user_ids or []  # Handle case when user_ids is None (Initially)
-            new_user_ids = [user_id for user_id in user_ids if user_id not in existing_user_ids]
-            chat_room.user_ids = existing_user_ids + new_user_ids
-    
-    # Iterate through new_user_ids to avoid duplicate names
-    for id in chat_room.user_ids:
-        user = User.query.get(id)
-        if user:
-            # Combine first_name and last_name with a space
-            user_name = f"{user.first_name} {user.last_name}"
-            existing_user_names = chat_room.user_names or []
-            existing_user_names.append(user_name)
-            chat_room.user_names = existing_user_names  # Add the combined name to the list
+    # Existing users only, loaded in one query; the creator is always a member:
+    users = _load_users([creator_id] + parse_user_ids(user_ids))
+    
+    chat_room = ChatRoom(name=name, creator_id=creator_id,
+                         user_ids=[user.id for user in users],
+                         user_names=[f"{user.first_name} {user.last_name}" for user in users])
+    chat_room.members = [ChatRoomMember(user_id=user.id, role=MEMBER_CREATOR if user.id == creator_id else MEMBER) for user in users]
     
     # Commit the chat room creation
     try:
         db.session.add(chat_room)
         db.session.commit()
+    except IntegrityError:
+        # Same name created concurrently (unique uq_chat_rooms_name):
+        db.session.rollback()
+        return None
     except Exception as e:
         # Rollback the session if an exception occurs
         db.session.rollback()
         raise e  # Re-raise the exception for handling at a higher level
     
+    # The name may be cached as missing:
+    invalidate_room(name=name)
     return chat_room
 
 def check_room(room, user_id):
     """
-    Check if a user is added to a (existing) chat room.
+    Check if a user is added to a (existing) chat room, from the room membership cache.
 
     Args:
-        room_id (int): ID of the chat room.
+        room (str): Name of the chat room.
         user_id (int): ID of the user.
 
     Returns:
         bool: True if the user is added to the chat room, False otherwise.
     """
     
-    chat_room = ChatRoom.query.filter_by(name=room).first()
-    if chat_room:
-        return user_id in chat_room.user_ids
-    return False
+    # Notification rooms are joined on connect only (rooms named so before names were checked):
+    if not isinstance(room, str) or is_notification_room(room):
+        return False
+    return is_member(room, user_id)
 
-    
 def add_users_to_chat_room(chat_room_id, user_ids):
     """
     Add users to a chat room.
 
     Args:
         chat_room_id (int): ID of the chat room.
-        user_ids (list): List of user IDs to add.
+        user_ids (list): User IDs to add (see parse_user_ids).
 
     Returns:
         ChatRoom or str: Updated chat room instance with added users, or error message.
     """
     
     chat_room = ChatRoom.query.get(chat_room_id)
-    if chat_room:
-        # try:
-            for user_id in user_ids:
-                user = User.query.get(user_id)
-                if not user:
-                    print("no user")
-                    return f"User with ID {user_id} not found"
-                if user_id not in chat_room.user_ids:  # Avoid duplicates
-                    print("this works?")
-                    chat_room.user_ids.append(user_id)
-            db.session.commit()
-            return chat_room
-        # except Exception as e:
-        #     db.session.rollback()
-        #     return str(e)  # Return the error message as a string
-    return "Chat room not found"
\ No newline at end of file
+    if not chat_room:
+        return "Chat room not found"
+    
+    users = _load_users(user_ids)
+    missing_ids = set(user_ids) - {user.id for user in users}
+    if missing_ids:
+        return f"User with ID {min(missing_ids)} not found"
+    
+    # Avoid duplicates:
+    member_ids = set(db.session.execute(select(ChatRoomMember.user_id).where(ChatRoomMember.room_id == chat_room.id)).scalars())
+    new_users = [user for user in users if user.id not in member_ids]
+    for user in new_users:
+        db.session.add(ChatRoomMember(room_id=chat_room.id, user_id=user.id))
+    
+    # Arrays are re-assigned, in place changes are not detected by SQLAlchemy:
+    chat_room.user_ids = list(chat_room.user_ids or []) + [user.id for user in new_users]
+    chat_room.user_names = list(chat_room.user_names or []) + [f"{user.first_name} {user.last_name}" for user in new_users]
+    db.session.commit()
+    invalidate_room(name=chat_room.name, room_id=chat_room.id)
+    return chat_room
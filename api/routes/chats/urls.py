@@ -13,19 +13,21 @@
         - room_by_name: (JWT)             Retrieve a chat room by its name.
         - user_rooms: (JWT)               Retrieve chat rooms of a user.
         - my_rooms: (JWT)                 Retrieve chat rooms of the logged-in user.
+        - handle_connect:                 Join the notification rooms of the connecting user (admin broadcasts).
         - handle_join_room: (JWT)         Handle joining a chat room through WebSocket.
         - handle_send_message: (JWT)      Handle sending a message in a chat room through WebSocket.
         - handle_leave_room:              Handle leaving a chat room through WebSocket.
-        - add_user: (JWT)                 Add a user to a chat room.
-        - room_messages: (JWT)            Retrieve messages of a chat room.
+        - add_user: (JWT)                 Add users to a chat room, MANDATORY: user_id or user_ids, AC: room creator or admin.
+        - room_messages: (JWT)            Retrieve a page of messages of a chat room, newest first (before_id, after_id, limit) & has_more.
         - save_doc: (JWT)                 Save a document.
+        - message_writer_stats: (JWT)     Batch size & flush latency counters of the chat message writer, AC: admin_required.
         
     TODO:
             1 - Merge create_new_chat_room() and add_user().                    - [DONE]
             2 - Complete send_message                                           - [DONE] -- Test it now somehow.
             3 - Add check before letting a user join a room                     - [DONE]
             4 - Split check_room_exists and check_user_in_room (or modify)      - []
-            5 - Implement adding user to chat room after creation               - []
+            5 - Implement adding user to chat room after creation               - [DONE]
             6 - Implement Access control.                                       - [DONE]
             7 - Implement ONLY Admin can create chat rooms for other people.
                 User can not create chat rooms for other people.
@@ -48,20 +50,23 @@
 
 # Lib Imports:
 from flask import request, jsonify, Blueprint
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
 from flask_socketio import join_room, leave_room, emit
 
 # Module Imports:
 from api.extentions.socketio import socketio
+from api.extentions.message_writer import message_writer
 from api.utils.status_codes import Status
+from api.models.broadcast import USERS_ROOM
 
 # Controller Imports:
-from .room_controllers import create_chat_room, add_users_to_chat_room, check_room, get_all_rooms, get_user_rooms, get_room_by_name, get_room_by_id, delete_room_by_name_or_id
+from .room_controllers import create_chat_room, add_users_to_chat_room, is_room_creator, parse_user_ids, check_room, get_all_rooms, get_user_rooms, get_room_by_name, get_room_by_id, delete_room_by_name_or_id
 from .message_controllers import save_message, get_room_messages_by_id, save_document
 
 # Decorators import:
 from api.decorators.access_control_decorators import admin_required, user_or_admin_required
-from api.decorators.mandatory_keys import check_mandatory
+from api.decorators.mandatory_keys import check_mandatory, check_at_least_one_key
+from api.decorators.rate_limit import rate_limit
 
 # ----------------------------------------------- #
 
@@ -77,7 +82,10 @@ def create_new_chat_room():
     name = data.get('name')
     user_ids = data.get('user_ids')
     creator_id = get_jwt_identity().get('id')
-    chat_room = create_chat_room(name=name, creator_id=creator_id, user_ids=user_ids)
+    try:
+        chat_room = create_chat_room(name=name, creator_id=creator_id, user_ids=user_ids)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
     if chat_room is not None:
         return jsonify(chat_room.to_dict()), Status.HTTP_201_CREATED
     else:
@@ -135,6 +143,20 @@ def my_rooms():
 
 ## --  SOCKET.io Events  --  ##
 
+@socketio.on('connect')
+def handle_connect(auth=None):
+    # Anonymous connections are allowed, they only miss the broadcast notifications:
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        identity = None
+    
+    if identity and identity.get('role') in ('lawyer', 'client'):
+        join_room(USERS_ROOM)
+        join_room(f"role:{identity['role']}")
+        join_room(f"user:{identity['id']}")
+
 @socketio.on('join')
 @jwt_required()
 def handle_join_room(data):
@@ -180,14 +202,24 @@ def handle_leave_room(data):
     
 ## --  SOCKET.io Events  --  # END #
 
-# FIXME:
-## - Complete the following
 @chat_routes.route('/chat-rooms/<int:chat_room_id>/users', methods=['POST'])
 @jwt_required()
+@check_at_least_one_key(['user_id', 'user_ids'])
 def add_user(chat_room_id):
+    # Members are added by the room creator (or an admin) only:
+    identity = get_jwt_identity()
+    if identity.get('role') not in ['admin', 'super-admin'] and not is_room_creator(chat_room_id, identity.get('id')):
+        return jsonify({'error': 'Only the creator of the chat room can add users to it'}), Status.HTTP_403_FORBIDDEN
+    
     data = request.get_json()
-    user_id = data.get('user_id')
-    chat_room = add_users_to_chat_room(chat_room_id, user_id)
+    try:
+        user_ids = parse_user_ids(data.get('user_ids') or data.get('user_id'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
+    chat_room = add_users_to_chat_room(chat_room_id, user_ids)
+    if isinstance(chat_room, str):
+        return jsonify({'error': chat_room}), Status.HTTP_404_NOT_FOUND
     if chat_room:
         return jsonify(chat_room.to_dict()), Status.HTTP_200_OK
     else:
@@ -198,14 +230,16 @@ def add_user(chat_room_id):
 @chat_routes.route('/room-messages/<int:room_id>', methods=['GET'])
 @jwt_required()
 def room_messages(room_id):
-    msgs = get_room_messages_by_id(room_id)
-    if msgs:
-        return jsonify([msg.to_dict() for msg in msgs]), Status.HTTP_200_OK
+    try:
+        msgs, has_more = get_room_messages_by_id(room_id, before_id=request.args.get('before_id'), after_id=request.args.get('after_id'), limit=request.args.get('limit'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
     
-    return jsonify({'error': 'No Chat rooms found'}), Status.HTTP_404_NOT_FOUND
+    return jsonify({'results': [msg.to_dict() for msg in msgs], 'has_more': has_more}), Status.HTTP_200_OK
 
 @chat_routes.route('/save-document', methods=['POST'])
 @jwt_required()
+@rate_limit(30, 3600, key='user')
 def save_doc():
     doc = request.files.get('document')
     document_saved = save_document(doc)
@@ -214,4 +248,11 @@ def save_doc():
     
     return jsonify({'error': 'Server error while saving document'}), Status.HTTP_500_INTERNAL_SERVER_ERROR
 
+@chat_routes.route('/message-writer/stats', methods=['GET'])
+@jwt_required()
+@admin_required
+def message_writer_stats():
+    # Counters of this worker process only:
+    return jsonify(message_writer.get_stats()), Status.HTTP_200_OK
+
 ## --  Messages Routes  --  # END #
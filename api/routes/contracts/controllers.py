@@ -9,6 +9,7 @@ from api.database import db
 from api.models.contract import Contract
 from api.models.transaction import Transaction
 from api.utils.status_codes import Status
+from api.utils.fieldsets import load_fields
 
 # ----------------------------------------------- #
 
@@ -18,20 +19,21 @@ def create_contract(title, description, lawyer_id, client_id, price, **kwargs):
     db.session.commit()
     return new_contract
 
-def get_all_contracts():
+def get_all_contracts(fields=None):
     
-    return Contract.query.all()
+    return load_fields(Contract.query, Contract, fields).all()
 
 def get_all_contract_by_id(id):
     
     return Contract.query.get(id)
 
-def get_all_user_contracts(id):
+def get_all_user_contracts(id, fields=None):
     
-    contracts = Contract.query.filter(
+    query = Contract.query.filter(
             (Contract.lawyer_id == id) |
             (Contract.client_id == id)
-        ).all()
+        )
+    contracts = load_fields(query, Contract, fields).all()
     
     return contracts
 
@@ -8,11 +8,11 @@
 
     Function Names:
         - create_new_contract: (JWT)    Create a new contract, AC: lawyer_required, MANDATORY: title, description, client_id, price.
-        - all_contracts: (JWT)          Get all contracts from the database, AC: admin_required.
+        - all_contracts: (JWT)          Get all contracts from the database (fields), AC: admin_required.
         - get_contract: (JWT)           Get single contract by ID.
-        - get_user_contracts: (JWT)     Get all contracts of the current user.
+        - get_user_contracts: (JWT)     Get all contracts of the current user (fields).
         - delete_contract: (JWT)        Delete contract by ID.
-        - get_user_contracts_id:        Get all contracts of a user by ID, AC: user_or_admin_required.
+        - get_user_contracts_id:        Get all contracts of a user by ID (fields), AC: user_or_admin_required.
         - end_contract: (JWT)           End contract by ID, AC: client_required, MANDATORY: ended_reason.
         - checkout_session:             Create a checkout session for payment, MANDATORY: contract_id, success_url, cancel_url.
         - pay_contract: (JWT)           Initiate payment for a contract, AC: client_required, MANDATORY: contract_id.
@@ -33,6 +33,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 # Module Imports:
 from .controllers import create_contract, get_all_contracts, get_all_contract_by_id, get_all_user_contracts, end_user_contract, create_checkout_session, delete_contract_by_id, stripe_payment_intent, webhook
 from api.utils.status_codes import Status
+from api.utils.fieldsets import parse_fields
 from api.decorators.mandatory_keys import check_mandatory
 from api.decorators.access_control_decorators import admin_required, user_or_admin_required, lawyer_required, client_required
 
@@ -64,9 +65,14 @@ def create_new_contract():
 @admin_required
 def all_contracts():
     
-    contracts = get_all_contracts()
+    fields = parse_fields(request.args.get('fields'))
+    try:
+        contracts = get_all_contracts(fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
     if contracts:
-        return jsonify([contract.to_dict() for contract in contracts]), Status.HTTP_200_OK
+        return jsonify([contract.to_dict(fields) for contract in contracts]), Status.HTTP_200_OK
     
     return jsonify({'error': 'No contract found'}), Status.HTTP_404_NOT_FOUND
 
@@ -85,9 +91,14 @@ def get_contract(id):
 def get_user_contracts():
     
     id = get_jwt_identity().get('id')
-    contracts = get_all_user_contracts(id)
+    fields = parse_fields(request.args.get('fields'))
+    try:
+        contracts = get_all_user_contracts(id, fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
     if contracts:
-        return jsonify([contract.to_dict() for contract in contracts]), Status.HTTP_200_OK
+        return jsonify([contract.to_dict(fields) for contract in contracts]), Status.HTTP_200_OK
     
     return jsonify({'error': 'No contracts found'}), Status.HTTP_404_NOT_FOUND
 
@@ -103,9 +114,14 @@ def delete_contract(id):
 @user_or_admin_required
 def get_user_contracts_id(id):
     
-    contracts = get_all_user_contracts(id)
+    fields = parse_fields(request.args.get('fields'))
+    try:
+        contracts = get_all_user_contracts(id, fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
     if contracts:
-        return jsonify([contract.to_dict() for contract in contracts]), Status.HTTP_200_OK
+        return jsonify([contract.to_dict(fields) for contract in contracts]), Status.HTTP_200_OK
     
     return jsonify({'error': 'No contracts found'}), Status.HTTP_404_NOT_FOUND
 
@@ -15,6 +15,7 @@ from api.models.user import Client, Lawyer
 
 # Utils:
 from api.utils.status_codes import Status
+from api.utils.fieldsets import load_fields
 
 # ----------------------------------------------- #
 
@@ -55,8 +56,8 @@ def update_user_average_rating_add(user_id, rating):
         user.add_review(rating)
         db.session.commit()
 
-def get_all_reviews():
-    return Review.query.all()
+def get_all_reviews(fields=None):
+    return load_fields(Review.query, Review, fields).all()
 
 def get_review_by_id(id):
     return Review.query.get(id)
@@ -86,10 +87,10 @@ def update_user_average_rating_sub(user_id, rating):
         user.subtract_review(rating)
         db.session.commit()
 
-def get_client_reviews(id):
-    reviews = Review.query.filter_by(client_id=id).all()
+def get_client_reviews(id, fields=None):
+    reviews = load_fields(Review.query.filter_by(client_id=id), Review, fields).all()
     return reviews
 
-def get_lawyer_reviews(id):
-    reviews = Review.query.filter_by(lawyer_id=id).all()
+def get_lawyer_reviews(id, fields=None):
+    reviews = load_fields(Review.query.filter_by(lawyer_id=id), Review, fields).all()
     return reviews
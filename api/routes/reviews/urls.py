@@ -7,10 +7,10 @@
 
     Function Names:
         - create_review: (JWT)     Create a new review, AC: client_required, MANDATORY: contract_id, rating, review_text, lawyer_id.
-        - get_all:                 Retrieve all reviews.
+        - get_all:                 Retrieve all reviews (fields).
         - get_review:              Retrieve a specific review by its ID.
-        - get_all_client:          Retrieve all reviews of a specific client by ID.
-        - get_all_lawyer:          Retrieve all reviews of a specific lawyer by ID.
+        - get_all_client:          Retrieve all reviews of a specific client by ID (fields).
+        - get_all_lawyer:          Retrieve all reviews of a specific lawyer by ID (fields).
         - delete_review: (JWT)     Delete review by ID.
 
     TODO:   1 - Implement JWT access control                                                - [DONE]
@@ -35,6 +35,7 @@ from api.decorators.access_control_decorators import client_required
 
 # Module Imports:
 from api.utils.status_codes import Status
+from api.utils.fieldsets import parse_fields
 
 # ----------------------------------------------- #
 
@@ -61,9 +62,14 @@ def create_review():
 @review_routes.route('/', methods=['GET'])
 def get_all():
     
-    reviews = get_all_reviews()
+    fields = parse_fields(request.args.get('fields'))
+    try:
+        reviews = get_all_reviews(fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
     if reviews:
-        return jsonify([review.to_dict() for review in reviews]), Status.HTTP_200_OK
+        return jsonify([review.to_dict(fields) for review in reviews]), Status.HTTP_200_OK
     
     return jsonify({'error': 'No reviews found'}), Status.HTTP_404_NOT_FOUND
 
@@ -80,18 +86,28 @@ def get_review(review_id):
 # READ-3: Client specific Reviews
 @review_routes.route('/client/<int:id>', methods=['GET'])
 def get_all_client(id):
-    reviews = get_client_reviews(id)
+    fields = parse_fields(request.args.get('fields'))
+    try:
+        reviews = get_client_reviews(id, fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
     if reviews:
-        return jsonify([review.to_dict() for review in reviews]), Status.HTTP_200_OK
+        return jsonify([review.to_dict(fields) for review in reviews]), Status.HTTP_200_OK
     
     return jsonify({'error': 'No reviews found!'}), Status.HTTP_404_NOT_FOUND
 
 # READ-4: Lawyer specific Reviews
 @review_routes.route('/lawyer/<int:id>', methods=['GET'])
 def get_all_lawyer(id):
-    reviews = get_lawyer_reviews(id)
+    fields = parse_fields(request.args.get('fields'))
+    try:
+        reviews = get_lawyer_reviews(id, fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
     if reviews:
-        return jsonify([review.to_dict() for review in reviews]), Status.HTTP_200_OK
+        return jsonify([review.to_dict(fields) for review in reviews]), Status.HTTP_200_OK
     
     return jsonify({'error': 'No reviews found!'}), Status.HTTP_404_NOT_FOUND
 
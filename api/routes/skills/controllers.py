@@ -35,6 +35,7 @@ def add_skills_to_lawyer(lawyer_id, skill_ids):
     if not skill_ids:  # Check if skill_ids is empty
         # Remove all skills from the lawyer's profile
         lawyer.skills = []
+        lawyer.refresh_search_vector()
         db.session.commit()
         return {'message': 'All skills removed from lawyer profile'}, Status.HTTP_200_OK
     
@@ -53,6 +54,7 @@ def add_skills_to_lawyer(lawyer_id, skill_ids):
         if skill not in lawyer.skills:
             lawyer.skills.append(skill)
     
+    lawyer.refresh_search_vector()
     db.session.commit()
 
     return {'message': f'Skills added to lawyer {lawyer_id}'}, Status.HTTP_200_OK
@@ -10,19 +10,39 @@
 
 # Lib Imports:
 from werkzeug.utils import secure_filename
-from sqlalchemy import or_, func
+from sqlalchemy import or_, and_, not_, func, case, cast, literal, literal_column, null, select, update, union_all
 from datetime import datetime
 import os
 
 # Module Imports:
 from api.database import db
-from api.models.user import User, Lawyer, Client
-from api.models.skill import Skill
+from api.models.user import User, Lawyer, Client, SEARCH_CONFIG, GEO_PENDING
+from api.models.skill import Skill, lawyer_skills
 from api.utils.hasher import hash_password, verify_password
 from api.utils.helper import allowed_file, get_upload_folder, rename_profile_image, rename_license_image
+from api.utils.paginator import keyset_paginate
+from api.utils.fieldsets import load_fields
+from api.utils.geo_locator import parse_coordinates, bounding_box, longitude_ranges, is_remote_backend, DEFAULT_RADIUS_KM, MAX_RADIUS_KM
+from api.extentions.geo_queue import geo_queue
+from api.utils.revocation import invalidate_account
 
 # ----------------------------------------------- #
 
+# Experience facet buckets => (label, upper bound in years), the last bucket is open:
+EXPERIENCE_BUCKETS = [('0-2', 2), ('3-5', 5), ('6-10', 10), ('11-20', 20)]
+EXPERIENCE_BUCKET_ABOVE = '20+'
+
+# Bulk moderation => action: column values it sets:
+MODERATION_ACTIONS = {
+    'suspend': {'is_suspended': True},
+    'un-suspend': {'is_suspended': False},
+    'activate': {'is_active': True},
+    'de-activate': {'is_active': False},
+    'verify': {'is_verified': True},
+    'un-verify': {'is_verified': False},
+}
+MAX_MODERATION_IDS = 1000
+
 # -- General User Controller -- #
 
 def create_user(email, username, password, first_name, last_name, phone_number, address, cnic, bar_voter_number=None, latitude=None, longitude=None, profile_image=None, role=None, **kwargs):
@@ -53,13 +73,23 @@ def create_user(email, username, password, first_name, last_name, phone_number,
             
     if longitude and latitude:
         try:
-            new_user.fill_location_address(latitude, longitude)
+            new_user.set_location(latitude, longitude)
+            # A local backend answers in no time, no need to queue:
+            if not is_remote_backend():
+                new_user.fill_location_address()
         except Exception as e:
             print(f"Error occurred while updating location: {e}")
     
+    if role == 'lawyer':
+        new_user.refresh_search_vector()
+    
     db.session.add(new_user)
     db.session.commit()
     
+    # Address is resolved in the background:
+    if new_user.geo_status == GEO_PENDING:
+        geo_queue.enqueue(new_user.id)
+    
     return new_user
 
 def get_user_by_id(user_id, is_admin, is_same_user):
@@ -70,24 +100,19 @@ def get_user_by_id(user_id, is_admin, is_same_user):
             user_id (int): The ID of the user to retrieve.
 
         Returns:
-            User: The user object if found, otherwise None.
+            User: The user object if found (and visible to the requester), otherwise None.
     """
     
-    user = User.query.get(user_id)
-    if is_admin in ['admin', 'super-admin'] or is_same_user:
-        return user if user else None
-    else:
-        if user:
-            if user.is_verified and not user.is_suspended and user.is_active:
-                return user 
-        else:
-            return None
+    query = User.query.filter(User.id == user_id)
+    if not is_same_user:
+        query = exclude_immature_accounts(query, is_admin)
+    return query.first()
 
 def get_user_account_by_jwt(id):
     return User.query.get(id)
 
-def get_all_users():
-    return User.query.all()
+def get_all_users(fields=None):
+    return load_fields(User.query, User, fields).all()
 
 def update_user(user_id, 
                 # User Related Fields:
@@ -161,9 +186,14 @@ def update_user(user_id,
                     client.nationality = nationality
                 
         ## update location related fields:
+        location_changed = False
         if longitude and latitude:
             try:
-                user.fill_location_address(latitude, longitude)
+                user.set_location(latitude, longitude)
+                if is_remote_backend():
+                    location_changed = True
+                else:
+                    user.fill_location_address()
             except Exception as e:
                 print(f"Error occurred while updating location: {e}")
                 
@@ -185,8 +215,16 @@ def update_user(user_id,
                         license_image_path = os.path.join(UPLOAD_FOLDER, filename)
                         license_image.save(license_image_path)
                         lawyer.license_image = os.path.join('/static', filename).replace('\\', '/')
+                
+                # Names, city or about may have changed:
+                lawyer.refresh_search_vector()
         
         db.session.commit()
+        
+        if is_active is not None or is_suspended is not None:
+            invalidate_account('user', user.id)
+        if location_changed:
+            geo_queue.enqueue(user.id)
         return user
 
     return None
@@ -224,6 +262,7 @@ def delete_user(user_id):
         # Delete from users table
         db.session.delete(user)
         db.session.commit()
+        invalidate_account('user', user_id)
         
         return user
     return None
@@ -234,6 +273,7 @@ def self_deactivate_user_account(user_id, reason=None):
         user.is_active = False
         user.reason = reason
         db.session.commit()
+        invalidate_account('user', user_id)
         return user
     return None
     
@@ -242,6 +282,7 @@ def self_activate_user_account(user_id):
     if user:
         user.is_active = True
         db.session.commit()
+        invalidate_account('user', user_id)
         return user
     return None
 
@@ -273,35 +314,131 @@ def verify_user_account(email):
         return user
     return None
 
-def exclude_immature_accounts(users):
+def bulk_moderate_users(ids, action, reason, status=None):
     """
-        Filter out users based on certain conditions.
+        Apply a moderation action to many users with one set-based UPDATE, in a single transaction.
+
+        Args:
+            ids (list): The user IDs.
+            action (str): One of MODERATION_ACTIONS.
+            reason (str): Reason stored on every updated user.
+            status (str, optional): Status stored on every updated user.
+
+        Returns:
+            list: [{'id': id, 'result': 'updated' | 'unchanged' | 'not_found'}] in the order of ids.
+
+        Raises:
+            ValueError: If the action or the ids are invalid.
+    """
+    
+    if action not in MODERATION_ACTIONS:
+        raise ValueError(f'Invalid action, expected one of: {", ".join(MODERATION_ACTIONS)}')
+    if not isinstance(ids, list) or not ids or not all(isinstance(id, int) and not isinstance(id, bool) for id in ids):
+        raise ValueError('ids must be a non-empty list of integers')
+    if len(ids) > MAX_MODERATION_IDS:
+        raise ValueError(f'At most {MAX_MODERATION_IDS} ids per request')
+    
+    unique_ids = list(dict.fromkeys(ids))
+    changes = MODERATION_ACTIONS[action]
+    values = dict(changes, reason=reason)
+    if status:
+        values['status'] = status
+    
+    # Only rows not already in the target state => the rest are reported unchanged:
+    already = [getattr(User, column) == value for column, value in changes.items()]
+    updated = set(db.session.execute(
+        update(User)
+        .where(User.id.in_(unique_ids), not_(and_(*already)))
+        .values(**values)
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    ).scalars())
+    existing = set(db.session.execute(select(User.id).where(User.id.in_(unique_ids))).scalars())
+    db.session.commit()
+    
+    for id in updated:
+        invalidate_account('user', id)
+    
+    return [
+        {'id': id, 'result': 'updated' if id in updated else 'unchanged' if id in existing else 'not_found'}
+        for id in unique_ids
+    ]
+
+def exclude_immature_accounts(query, is_admin):
+    """
+        Restrict a user query to publicly visible accounts, unless requested by an admin.
         
-        Conditions:
+        Conditions (evaluated in SQL, see User.is_public):
             - is_verified must be True
             - is_suspended must be False
             - is_active must be True
     """
     
-    filtered_users = []
+    if is_admin in ['admin', 'super-admin']:
+        return query
+    return query.filter(User.is_public)
 
-    for user in users:
-        if user.is_verified and not user.is_suspended and user.is_active:
-            filtered_users.append(user)
-    return filtered_users
+def get_sort_columns(model, sort=None):
+    """
+        Resolve the keyset columns & direction for a user listing.
+
+        Args:
+            model (User): The User model (or subclass) being listed.
+            sort (str, optional): 'rating' for best rated first, anything else for oldest first.
+
+        Returns:
+            tuple: (list of columns, descending flag, key of the cursor values or None).
+    """
+    
+    if sort == 'rating':
+        # Users without reviews may have a NULL rating, ranked as 0 (a NULL cursor would match no row);
+        # inline 0 => same expression as ix_users_average_rating_id:
+        rating = func.coalesce(model.average_rating, literal_column('0')).label('average_rating')
+        return [rating, model.id], True, lambda user: [user.average_rating or 0, user.id]
+    return [model.id], False, None
 
 # -- Lawyers Specific -- #
 
-def get_all_lawyers(is_admin):
-    lawyers = User.query.filter_by(role='lawyer').all()
-    if is_admin in ['admin', 'super-admin']:
-        return lawyers
-    else:
-        return exclude_immature_accounts(lawyers)
+def get_all_lawyers(is_admin, cursor=None, limit=None, sort=None, fields=None):
+    """
+        Retrieve one page of lawyers, loading only the given fields (all if None).
 
-def filter_lawyer_users(is_admin, city=None, skill_ids=None, above_experience_years=None, above_average_rating=None):
-        # Start building the query to filter lawyers
-    query = Lawyer.query
+        Returns:
+            tuple: (list of lawyers, next_cursor).
+        
+        Raises:
+            ValueError: If the cursor or a field is malformed.
+    """
+    
+    # role predicate is implied by the join, but lets the planner pick ix_users_public_role:
+    query = exclude_immature_accounts(Lawyer.query.filter_by(role='lawyer'), is_admin)
+    columns, descending, key = get_sort_columns(Lawyer, sort)
+    query = load_fields(query, Lawyer, fields, extra=[column.key for column in columns])
+    return keyset_paginate(query, columns, cursor=cursor, limit=limit, descending=descending, key=key)
+
+def filter_lawyer_users(is_admin, city=None, skill_ids=None, above_experience_years=None, above_average_rating=None, near=None, radius_km=None, q=None, cursor=None, limit=None, sort=None, fields=None, facets=False):
+    """
+        Retrieve one page of lawyers matching the filters.
+        
+        If near ('lat,long') is given, only lawyers within radius_km are returned, nearest 
+        first, each with a distance_km attribute set.
+        
+        If q is given, only lawyers whose names, skills, city or about match the search are 
+        returned, best match first (unless near is also given), each with a search_rank 
+        attribute set.
+
+        Only the given fields are loaded (all if None). If facets is True, the counts of the 
+        whole filtered set per skill, city, rating & experience are returned as well.
+
+        Returns:
+            tuple: (list of lawyers, next_cursor, facets dict or None).
+        
+        Raises:
+            ValueError: If the cursor, near, radius_km or a field is malformed.
+    """
+    
+    # Start building the query to filter lawyers
+    query = exclude_immature_accounts(Lawyer.query.filter_by(role='lawyer'), is_admin)
     
     # Apply filters based on the provided parameters
     if city:
@@ -321,20 +458,165 @@ def filter_lawyer_users(is_admin, city=None, skill_ids=None, above_experience_ye
     if above_average_rating:
         query = query.filter(Lawyer.average_rating >= above_average_rating)
     
-    # Execute the query and fetch filtered lawyers
-    filtered_lawyers = query.all()
-    if is_admin in ['admin', 'super-admin']:
-        return filtered_lawyers
+    if q:
+        query, rank = filter_lawyers_search(query, q)
+    
+    if near:
+        query, distance = filter_lawyers_near(query, near, radius_km)
+    
+    # Facets are counted over the whole filtered set, not the page:
+    lawyer_facets = get_lawyer_facets(query) if facets else None
+    
+    columns, descending, key = get_sort_columns(Lawyer, sort)
+    query = load_fields(query, Lawyer, fields, extra=[column.key for column in columns])
+    
+    if near:
+        # Nearest first, the search rank (if any) is still returned:
+        lawyers, next_cursor = paginate_lawyers_by(query, distance, 'distance_km', cursor=cursor, limit=limit, extra={'search_rank': rank} if q else None)
+    elif q:
+        lawyers, next_cursor = paginate_lawyers_by(query, rank, 'search_rank', cursor=cursor, limit=limit, descending=True)
     else:
-        excluded_users = exclude_immature_accounts(filtered_lawyers)
-        return excluded_users
+        # Execute the query and fetch a page of filtered lawyers
+        lawyers, next_cursor = keyset_paginate(query, columns, cursor=cursor, limit=limit, descending=descending, key=key)
+    
+    return lawyers, next_cursor, lawyer_facets
+
+def get_lawyer_facets(query):
+    """
+        Count a filtered lawyer query per skill, city, rating bucket & experience bucket.
+        
+        The four GROUP BYs run over the same CTE and are combined with UNION ALL, so all 
+        facets come back from a single statement.
+
+        Returns:
+            dict: {'skills': [{'id', 'name', 'count'}], 'city': [...], 'rating': [...], 'experience_years': [...]},
+                  each facet being a list of {'value', 'count'} (skills also carry the name).
+    """
+    
+    experience_bucket = case(
+        (Lawyer.experience_years.is_(None), null()),
+        *[(Lawyer.experience_years <= upper, label) for label, upper in EXPERIENCE_BUCKETS],
+        else_=EXPERIENCE_BUCKET_ABOVE,
+    )
+    rating_bucket = cast(func.floor(func.coalesce(Lawyer.average_rating, 0)), db.Integer)
+    
+    filtered = query.with_entities(
+        Lawyer.id.label('id'),
+        Lawyer.city.label('city'),
+        rating_bucket.label('rating'),
+        experience_bucket.label('experience_years'),
+    ).cte('filtered_lawyers')
+    
+    def facet(name, column):
+        return select(literal(name).label('facet'), cast(column, db.String).label('value'), literal(None, db.String).label('name'), func.count().label('count')) \
+            .select_from(filtered).group_by(column)
+    
+    skills = select(literal('skills').label('facet'), cast(Skill.id, db.String).label('value'), Skill.name.label('name'), func.count().label('count')) \
+        .select_from(filtered.join(lawyer_skills, lawyer_skills.c.lawyer_id == filtered.c.id).join(Skill, Skill.id == lawyer_skills.c.skill_id)) \
+        .group_by(Skill.id, Skill.name)
+    
+    statement = union_all(
+        skills,
+        facet('city', filtered.c.city),
+        facet('rating', filtered.c.rating),
+        facet('experience_years', filtered.c.experience_years),
+    )
+    
+    facets = {'skills': [], 'city': [], 'rating': [], 'experience_years': []}
+    for row in db.session.execute(statement):
+        if row.facet == 'skills':
+            facets['skills'].append({'id': int(row.value), 'name': row.name, 'count': row.count})
+        elif row.value is not None:
+            value = int(row.value) if row.facet == 'rating' else row.value
+            facets[row.facet].append({'value': value, 'count': row.count})
+    
+    for values in facets.values():
+        values.sort(key=lambda item: item['count'], reverse=True)
+    return facets
+
+def filter_lawyers_search(query, q):
+    """
+        Restrict a lawyer query to a full text search, served by the GIN index ix_lawyers_search_vector.
+
+        Returns:
+            tuple: (filtered query, rank expression).
+    """
+    
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    # ts_rank is a real: as float8 the cursor value round-trips & page boundaries compare exactly:
+    rank = cast(func.ts_rank(Lawyer.search_vector, ts_query), db.Float)
+    return query.filter(Lawyer.search_vector.op('@@')(ts_query)), rank
+
+def filter_lawyers_near(query, near, radius_km=None):
+    """
+        Restrict a lawyer query to a radius around a point.
+        
+        A lat/long bounding box (served by ix_users_latitude_longitude) prefilters the rows,
+        then the exact haversine distance filters them. A box crossing the antimeridian is
+        matched as two longitude ranges.
+
+        Returns:
+            tuple: (filtered query, distance expression).
+        
+        Raises:
+            ValueError: If near or radius_km is malformed.
+    """
+    
+    latitude, longitude = parse_coordinates(near)
+    try:
+        radius_km = min(float(radius_km or DEFAULT_RADIUS_KM), MAX_RADIUS_KM)
+    except (TypeError, ValueError):
+        raise ValueError('Invalid radius_km')
+    
+    min_lat, max_lat, min_long, max_long = bounding_box(latitude, longitude, radius_km)
+    distance = Lawyer.distance_to(latitude, longitude)
+    
+    query = query.filter(
+        Lawyer.latitude.between(min_lat, max_lat),
+        or_(*[Lawyer.longitude.between(low, high) for low, high in longitude_ranges(min_long, max_long)]),
+    )
+    return query.filter(distance <= radius_km), distance
+
+def paginate_lawyers_by(query, expression, name, cursor=None, limit=None, descending=False, extra=None):
+    """
+        Fetch one page of a lawyer query ordered by a computed expression (e.g. distance, rank).
+        The value of the expression is set on each lawyer under the given attribute name, and so
+        are the values of the extra {name: expression} columns (not ordered on).
+
+        Returns:
+            tuple: (list of lawyers, next_cursor).
+        
+        Raises:
+            ValueError: If the cursor is malformed.
+    """
+    
+    extra = extra or {}
+    query = query.add_columns(expression.label(name), *[column.label(key) for key, column in extra.items()])
+    rows, next_cursor = keyset_paginate(query, [expression, Lawyer.id], cursor=cursor, limit=limit, descending=descending, key=lambda row: [row[1], row[0].id])
+    
+    lawyers = []
+    for lawyer, value, *values in rows:
+        setattr(lawyer, name, value)
+        for key, extra_value in zip(extra, values):
+            setattr(lawyer, key, extra_value)
+        lawyers.append(lawyer)
+    return lawyers, next_cursor
 
 # -- Clients Specific -- #
 
-def get_all_clients(is_admin):
-    clients = User.query.filter_by(role='client').all()
-    if is_admin in ['admin', 'super-admin']:
-        return clients
-    else:
-        return exclude_immature_accounts(clients)
+def get_all_clients(is_admin, cursor=None, limit=None, sort=None, fields=None):
+    """
+        Retrieve one page of clients, loading only the given fields (all if None).
+
+        Returns:
+            tuple: (list of clients, next_cursor).
+        
+        Raises:
+            ValueError: If the cursor or a field is malformed.
+    """
+    
+    query = exclude_immature_accounts(Client.query.filter_by(role='client'), is_admin)
+    columns, descending, key = get_sort_columns(Client, sort)
+    query = load_fields(query, Client, fields, extra=[column.key for column in columns])
+    return keyset_paginate(query, columns, cursor=cursor, limit=limit, descending=descending, key=key)
     
\ No newline at end of file
@@ -4,18 +4,18 @@
   Libraries:
     - flask: Micro web framework for Python.
     - flask_jwt_extended: JSON Web Tokens extension for Flask.
-    - flask_mail: Extension for email sending in Flask.
     - flasgger: Extension for Swagger API documentation.
 
   Functions:
     - create_new_lawyer:       Creates a new lawyer. AC: admin_required, MANDATORY: email, username, password, first_name, last_name, address.
-    - all_lawyers:             Retrieves all lawyers. AC: admin_required.
-    - filter_lawyers:          Filters lawyers based on criteria. AC: admin_required.
+    - import_lawyers_file:     Bulk imports lawyers from a CSV/JSONL file, returns the rejected rows. AC: admin_required, MANDATORY: file.
+    - all_lawyers:             Retrieves a page of lawyers (limit, cursor, sort, fields). AC: admin_required.
+    - filter_lawyers:          Filters a page of lawyers based on criteria (limit, cursor, sort, fields), near=lat,long & radius_km sort by distance, q ranks by full text match, facets=true adds counts per skill/city/rating/experience. AC: admin_required.
     - create_new_client:       Creates a new client. AC: admin_required, MANDATORY: email, username, password, first_name, last_name, address.
-    - all_clients:             Retrieves all clients. AC: admin_required.
+    - all_clients:             Retrieves a page of clients (limit, cursor, sort, fields). AC: admin_required.
     - get_user:                Retrieves user details by ID. AC: user_or_admin_required.
     - get_my_account:          Retrieves current user's account details. AC: user_or_admin_required.
-    - get_all:                 Retrieves all users. AC: admin_required.
+    - get_all:                 Retrieves all users (fields). AC: admin_required.
     - update_existing_user:    Updates existing user by ID. AC: user_or_admin_required.
     - update_profile:          Updates user's profile picture by ID. AC: user_or_admin_required, MANDATORY: profile_image.
     - delete_existing_user:    Deletes existing user by ID. AC: admin_required.
@@ -23,8 +23,10 @@
     - activate_account:        Activates user account by ID. AC: user_or_admin_required.
     - suspend_account:         Suspends user account by ID. AC: admin_required, MANDATORY: status.
     - unsuspend_account:       Unsuspends user account by ID. AC: admin_required, MANDATORY: status.
+    - moderate_accounts:       Applies one moderation action to many users in one transaction. AC: admin_required, MANDATORY: ids, action, reason.
     - change_user_password:    Changes user password by ID. AC: user_or_admin_required, MANDATORY: old_password, new_password.
     - login:                   Authenticates user and generates access token. MANDATORY: email, password.
+    - logout:                  Revokes the access token of the request. AC: jwt_required.
     - forgot_pass:             Generates OTP for forget password. MANDATORY: email.
     - password_reset:          Resets admin password. MANDATORY: email, new_password, otp.
     - verify_email_otp:        Sends OTP for email verification. AC: user_or_admin_required, MANDATORY: email.
@@ -61,25 +63,30 @@
 """
 
 # Lib Imports
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask_mail import Message
+import io
+from flask import Blueprint, jsonify, request, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from flasgger import swag_from
 
 # Extentions Imports:
-from api.extentions.mail import mail
+from api.extentions.mail_outbox import outbox
 
 # Utils Imports:
 from api.utils.otp_generator import save_otp, verify_otp, generate_otp, delete_all_otps
 from api.utils.status_codes import Status
 from api.utils.helper import omit_user_sensitive_fields
+from api.utils.fieldsets import parse_fields
 from api.utils.token_generator import generate_user_access_token
+from api.utils.revocation import revoke_token
+from api.utils.lawyer_import import read_rows, import_lawyers, FORMATS
+from api.utils.geo_locator import MAX_RADIUS_KM
 
 # Controllers Imports:
-from .controllers import create_user, get_all_users, update_user, update_profile_picture, delete_user, get_user_by_id, get_all_lawyers, get_all_clients, self_activate_user_account, self_deactivate_user_account, change_password, reset_password, verify_user_account, filter_lawyer_users, get_user_account_by_jwt
+from .controllers import create_user, get_all_users, update_user, update_profile_picture, delete_user, get_user_by_id, get_all_lawyers, get_all_clients, self_activate_user_account, self_deactivate_user_account, change_password, reset_password, verify_user_account, filter_lawyer_users, get_user_account_by_jwt, bulk_moderate_users
 
 # Decorators Imports:
 from api.decorators.mandatory_keys import check_mandatory, check_at_least_one_key
+from api.decorators.rate_limit import rate_limit
 from api.decorators.access_control_decorators import admin_required, user_or_admin_required
 
 # ----------------------------------------------- #
@@ -90,6 +97,7 @@ user_routes = Blueprint('users', __name__)
 
 @user_routes.route('/lawyer', methods=['POST'])
 @swag_from(methods=['POST']) 
+@rate_limit(10, 3600)
 @check_mandatory(['email', 'username', 'password', 'first_name', 'last_name', 'address', 'cnic', 'bar_voter_number', 'longitude', 'latitude'])
 def create_new_lawyer():
     """
@@ -148,6 +156,70 @@ def create_new_lawyer():
     returned_lawyer = omit_user_sensitive_fields(new_lawyer)
     return jsonify(returned_lawyer), Status.HTTP_200_OK
 
+@user_routes.route('/lawyer/import', methods=['POST'])
+@jwt_required()
+@swag_from(methods=['POST'])
+@admin_required
+def import_lawyers_file():
+    """
+    Endpoint to bulk import lawyers from a roster file.
+
+    ---
+    tags:
+      - Lawyer
+    description: Import lawyers from a CSV (with a header line) or JSONL file, in batches. Locations are geocoded in the background.
+    security:
+      - JWT: []
+    consumes:
+      - multipart/form-data
+    parameters:
+      - name: file
+        in: formData
+        type: file
+        required: true
+        description: "Rows with email, username, password, first_name, last_name, address, cnic, bar_voter_number & optional phone_number, about, experience_years, latitude, longitude."
+      - name: format
+        in: formData
+        type: string
+        required: false
+        description: "'csv' or 'jsonl'. Defaults to the file extension."
+      - name: verified
+        in: formData
+        type: boolean
+        required: false
+        description: Import the accounts as verified.
+    responses:
+      200:
+        description: Successful operation. Returns the number of created lawyers & the rejected rows (row, email, error).
+      400:
+        description: Unknown file format.
+      401:
+        description: Unauthorized access.
+      413:
+        description: More rows than LAWYER_IMPORT_MAX_ROWS, use `flask users import-lawyers` instead.
+      422:
+        description: Missing file.
+    """
+    
+    file = request.files.get('file')
+    if not file:
+        return jsonify({'error': 'Missing mandatory key(s): file'}), Status.HTTP_422_UNPROCESSABLE_ENTITY
+    
+    format = request.form.get('format') or file.filename.rsplit('.', 1)[-1].lower()
+    if format not in FORMATS:
+        return jsonify({'error': f'Unknown format, expected one of: {", ".join(FORMATS)}'}), Status.HTTP_400_BAD_REQUEST
+    
+    # Larger rosters must go through the CLI, the hashing must end well within the worker timeout:
+    max_rows = current_app.config.get('LAWYER_IMPORT_MAX_ROWS', 200)
+    if sum(1 for _ in file.stream) > max_rows + 1:
+        return jsonify({'error': f'Too many rows, at most {max_rows} per request'}), Status.HTTP_413_PAYLOAD_TOO_LARGE
+    file.stream.seek(0)
+    
+    verified = request.form.get('verified', '').lower() in ('1', 'true')
+    stream = io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline='')
+    report = import_lawyers(read_rows(stream, format), workers=current_app.config.get('LAWYER_IMPORT_WORKERS'), verified=verified)
+    return jsonify(report), Status.HTTP_200_OK
+
 @user_routes.route('/lawyer', methods=['GET'])
 @swag_from(methods=['GET'])
 @jwt_required()
@@ -158,22 +230,51 @@ def all_lawyers():
     ---
     tags:
       - Lawyer
-    description: Retrieve a list of all lawyers.
+    description: Retrieve one page of lawyers.
+    parameters:
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size (default 20, max 100).
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: The next_cursor returned with the previous page.
+      - name: sort
+        in: query
+        type: string
+        required: false
+        description: "'rating' for best rated first, oldest first otherwise."
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma separated fields to return (e.g. first_name,last_name,profile_image,city,average_rating).
     responses:
       200:
-        description: Successful operation. Returns a list of lawyers.
+        description: Successful operation. Returns a page of lawyers and the next_cursor.
+      400:
+        description: Invalid cursor.
       404:
         description: No lawyer user found.
     """
     is_admin = get_jwt_identity().get('role')
-    lawyers = get_all_lawyers(is_admin)
-    if lawyers:
-        return jsonify([lawyer.to_dict() for lawyer in lawyers]), Status.HTTP_200_OK
+    fields = parse_fields(request.args.get('fields'))
+    
+    try:
+        lawyers, next_cursor = get_all_lawyers(is_admin, cursor=request.args.get('cursor'), limit=request.args.get('limit'), sort=request.args.get('sort'), fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
+    if lawyers or next_cursor:
+        return jsonify({'results': [lawyer.to_dict(fields) for lawyer in lawyers], 'next_cursor': next_cursor}), Status.HTTP_200_OK
     return jsonify({'error': 'No lawyer user found'}), Status.HTTP_404_NOT_FOUND
 
 @user_routes.route('/lawyer/filter-lawyers', methods=['POST'])
 @jwt_required()
-@check_at_least_one_key(['city', 'skill_ids', 'above_experience_years', 'above_average_rating'])
+@check_at_least_one_key(['city', 'skill_ids', 'above_experience_years', 'above_average_rating', 'near', 'q'])
 def filter_lawyers():
     data = request.json
 
@@ -183,9 +284,46 @@ def filter_lawyers():
     above_experience_years = data.get('above_experience_years')
     above_average_rating = data.get('above_average_rating')
     
-    lawyers = filter_lawyer_users(is_admin=is_admin, city=city, skill_ids=skill_ids, above_experience_years=above_experience_years, above_average_rating=above_average_rating)
-    if lawyers:
-      return jsonify([lawyer.to_dict() for lawyer in lawyers]), Status.HTTP_200_OK
+    # Full text search over names, skills, city & about:
+    q = data.get('q')
+    
+    # Radius search ('lat,long' & km):
+    near = data.get('near')
+    radius_km = data.get('radius_km')
+    if radius_km is not None:
+        try:
+            radius_km = float(radius_km)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid radius_km'}), Status.HTTP_400_BAD_REQUEST
+        # NaN fails both comparisons:
+        if not 0 < radius_km <= MAX_RADIUS_KM:
+            return jsonify({'error': f'Invalid radius_km, expected above 0 and at most {MAX_RADIUS_KM}'}), Status.HTTP_400_BAD_REQUEST
+    
+    # Pagination:
+    cursor = data.get('cursor')
+    limit = data.get('limit')
+    sort = data.get('sort')
+    fields = parse_fields(request.args.get('fields'))
+    
+    # Counts per skill, city, rating & experience for the filter sidebar:
+    with_facets = bool(data.get('facets'))
+    
+    try:
+        lawyers, next_cursor, facets = filter_lawyer_users(is_admin=is_admin, city=city, skill_ids=skill_ids, above_experience_years=above_experience_years, above_average_rating=above_average_rating, near=near, radius_km=radius_km, q=q, cursor=cursor, limit=limit, sort=sort, fields=fields, facets=with_facets)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
+    if lawyers or next_cursor:
+      results = [lawyer.to_dict(fields) for lawyer in lawyers]
+      for result, lawyer in zip(results, lawyers):
+          if near:
+              result['distance_km'] = round(lawyer.distance_km, 3)
+          if q:
+              result['search_rank'] = getattr(lawyer, 'search_rank', None)
+      response = {'results': results, 'next_cursor': next_cursor}
+      if facets is not None:
+          response['facets'] = facets
+      return jsonify(response), Status.HTTP_200_OK
     
     return jsonify({'error': 'No Lawyer user found matching the filters'}), Status.HTTP_404_NOT_FOUND
 
@@ -193,6 +331,7 @@ def filter_lawyers():
 
 @user_routes.route('/client', methods=['POST'])
 @swag_from(methods=['POST'])
+@rate_limit(10, 3600)
 @check_mandatory(['email', 'username', 'password', 'first_name', 'last_name', 'address', 'cnic', 'longitude', 'latitude'])
 def create_new_client():
     """
@@ -261,10 +400,33 @@ def all_clients():
     ---
     tags:
       - Client
-    description: Retrieve a list of all clients.
+    description: Retrieve one page of clients.
+    parameters:
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size (default 20, max 100).
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: The next_cursor returned with the previous page.
+      - name: sort
+        in: query
+        type: string
+        required: false
+        description: "'rating' for best rated first, oldest first otherwise."
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma separated fields to return (e.g. first_name,last_name,profile_image,city,average_rating).
     responses:
       200:
-        description: Successful operation. Returns a list of clients.
+        description: Successful operation. Returns a page of clients and the next_cursor.
+      400:
+        description: Invalid cursor.
       401:
         description: Unauthorized access.
       404:
@@ -272,9 +434,15 @@ def all_clients():
     """
     
     is_admin = get_jwt_identity().get('role')
-    clients = get_all_clients(is_admin)
-    if clients:
-        return jsonify([client.to_dict() for client in clients]), Status.HTTP_200_OK
+    fields = parse_fields(request.args.get('fields'))
+    
+    try:
+        clients, next_cursor = get_all_clients(is_admin, cursor=request.args.get('cursor'), limit=request.args.get('limit'), sort=request.args.get('sort'), fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
+    if clients or next_cursor:
+        return jsonify({'results': [client.to_dict(fields) for client in clients], 'next_cursor': next_cursor}), Status.HTTP_200_OK
     return jsonify({'error': 'No client user found'}), Status.HTTP_404_NOT_FOUND
 
 # -- General User Routes -- #
@@ -341,6 +509,12 @@ def get_all():
     description: Retrieve a list of all users.
     security:
       - JWT: []
+    parameters:
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma separated fields to return (e.g. first_name,last_name,profile_image,city,average_rating).
     responses:
       200:
         description: Successful operation. Returns a list of users.
@@ -350,9 +524,15 @@ def get_all():
         description: No user found.
     """
     
-    users = get_all_users()
+    fields = parse_fields(request.args.get('fields'))
+    
+    try:
+        users = get_all_users(fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
     if users:
-        return jsonify([user.to_dict() for user in users]), Status.HTTP_200_OK
+        return jsonify([user.to_dict(fields) for user in users]), Status.HTTP_200_OK
     
     return jsonify({'error': 'No user found'}), Status.HTTP_404_NOT_FOUND
 
@@ -360,6 +540,7 @@ def get_all():
 @jwt_required()
 @swag_from(methods=['PUT'])
 @user_or_admin_required
+@rate_limit(30, 3600, key='user')
 def update_existing_user(id):
     """
     Endpoint to update an existing user by user ID.
@@ -398,6 +579,7 @@ def update_existing_user(id):
 @user_routes.route('/update-profile-image/<int:id>', methods=['POST'])
 @jwt_required()
 @user_or_admin_required
+@rate_limit(10, 3600, key='user')
 @check_mandatory(['profile_image'])
 def update_profile(id):
     profile_image = request.files.get('profile_image')
@@ -637,6 +819,64 @@ def unsuspend_account(id):
         return jsonify({'message': f'User with id {id} un-suspended successfully!'}), Status.HTTP_200_OK
     return jsonify({'error': 'User not found'}), Status.HTTP_404_NOT_FOUND
 
+@user_routes.route('/moderate', methods=['POST'])
+@jwt_required()
+@swag_from(methods=['POST'])
+@check_mandatory(['ids', 'action', 'reason'])
+@admin_required
+def moderate_accounts():
+    """
+    Endpoint to suspend, un-suspend, activate, de-activate, verify or un-verify many users at once.
+
+    ---
+    tags:
+      - User
+    description: Apply one moderation action to a list of user IDs in a single transaction.
+    security:
+      - JWT: []
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            properties:
+              ids:
+                type: array
+                items:
+                  type: integer
+                description: IDs of the users to moderate (at most 1000).
+              action:
+                type: string
+                enum: [suspend, un-suspend, activate, de-activate, verify, un-verify]
+                description: The moderation action.
+              reason:
+                type: string
+                description: Reason stored on every updated user.
+              status:
+                type: string
+                description: Status stored on every updated user.
+    responses:
+      200:
+        description: Successful operation. Returns the result (updated, unchanged or not_found) per ID.
+      400:
+        description: Invalid action or ids.
+      401:
+        description: Unauthorized access.
+      422:
+        description: Missing mandatory key(s) in request.
+    """
+    
+    data = request.get_json()
+    
+    try:
+        results = bulk_moderate_users(ids=data.get('ids'), action=data.get('action'), reason=data.get('reason'), status=data.get('status'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), Status.HTTP_400_BAD_REQUEST
+    
+    updated = sum(result['result'] == 'updated' for result in results)
+    return jsonify({'action': data.get('action'), 'updated': updated, 'results': results}), Status.HTTP_200_OK
+
 @user_routes.route('/change-password/<int:id>', methods=['POST'])
 @jwt_required()
 @swag_from(methods=['POST'])
@@ -702,6 +942,8 @@ def change_user_password(id):
 # User Login Endpoint
 @user_routes.route('/login', methods=['POST'])
 @swag_from(methods=['POST'])
+@rate_limit(20, 60)
+@rate_limit(5, 300, key='email')
 @check_mandatory(['email', 'password'])
 def login():
     """
@@ -731,6 +973,10 @@ def login():
         description: Invalid credentials.
       422:
         description: Missing mandatory key(s) in request.
+      429:
+        description: Too many login attempts from this IP or for this email.
+      503:
+        description: Password checks are saturated, retry later.
     """
     
     data = request.get_json()
@@ -744,9 +990,32 @@ def login():
     
     return jsonify({'error': 'Invalid credentials'}), Status.HTTP_401_UNAUTHORIZED
 
+@user_routes.route('/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    """
+    Endpoint to revoke the access token of the request.
+
+    ---
+    tags:
+      - Auth
+    description: Revoke the current access token until it expires.
+    responses:
+      200:
+        description: Successful operation. Token revoked.
+      401:
+        description: Missing, invalid or already revoked token.
+    """
+    
+    token = get_jwt()
+    revoke_token(token['jti'], token['exp'])
+    return jsonify({'message': 'Logged out successfully'}), Status.HTTP_200_OK
+
 # -- Forgot Password -- #
 
 @user_routes.route('/forgot-password-otp', methods=['POST'])
+@rate_limit(10, 3600)
+@rate_limit(3, 600, key='email')
 @check_mandatory(['email'])
 def forgot_pass():
     email = request.json.get('email')
@@ -754,27 +1023,27 @@ def forgot_pass():
     otp = generate_otp()
     save_otp(email, otp, otp_for='password_reset')
 
-    msg = Message('Forgot Password - OTP', sender='info.lawpeer@gmail.com', recipients=[email])
-    msg.body = f'Your OTP for resetting the password is: {otp}'
-    
     try:
-        mail.send(msg)
+        # Sent in the background by the outbox worker:
+        outbox.enqueue(subject='Forgot Password - OTP', recipients=[email], body=f'Your OTP for resetting the password is: {otp}', sender='info.lawpeer@gmail.com')
         return jsonify({'message': 'OTP sent successfully'}), Status.HTTP_200_OK
     except Exception as e:
-        delete_all_otps(email)
+        delete_all_otps(email, otp_for='password_reset')
         return jsonify({'error': str(e)}), Status.HTTP_500_INTERNAL_SERVER_ERROR
   
 @user_routes.route('/reset-password', methods=['POST'])
+@rate_limit(20, 600)
+@rate_limit(10, 600, key='email')
 @check_mandatory(['email', 'new_password', 'otp'])
 def password_reset():
     email = request.json.get('email')
     otp = request.json.get('otp')
     new_password = request.json.get('new_password')
     
-    if verify_otp(email, otp):
+    if verify_otp(email, otp, otp_for='password_reset'):
         resetted_pass = reset_password(email, new_password)
         if resetted_pass:
-          delete_all_otps(email)
+          delete_all_otps(email, otp_for='password_reset')
           return jsonify({'message': 'Password reset successfully'}), Status.HTTP_200_OK
         else:
          return jsonify({'error': f'User with email: {email} not found'}), Status.HTTP_404_NOT_FOUND 
@@ -785,6 +1054,7 @@ def password_reset():
 
 @user_routes.route('/verify-email-otp', methods=['POST'])
 @jwt_required()
+@rate_limit(3, 600, key='user')
 @check_mandatory(['email'])
 def verify_email_otp():
     email = request.json.get('email')
@@ -792,27 +1062,26 @@ def verify_email_otp():
     otp = generate_otp()
     save_otp(email, otp, otp_for='email_verification')
 
-    msg = Message('Email Verification - OTP', sender='info.lawpeer@gmail.com', recipients=[email])
-    msg.body = f'Your OTP for email verification is: {otp}'
-    
     try:
-        mail.send(msg)
+        # Sent in the background by the outbox worker:
+        outbox.enqueue(subject='Email Verification - OTP', recipients=[email], body=f'Your OTP for email verification is: {otp}', sender='info.lawpeer@gmail.com')
         return jsonify({'message': 'OTP sent successfully'}), Status.HTTP_200_OK
     except Exception as e:
-        delete_all_otps(email)
+        delete_all_otps(email, otp_for='email_verification')
         return jsonify({'error': str(e)}), Status.HTTP_500_INTERNAL_SERVER_ERROR
       
 @user_routes.route('/verify-email', methods=['POST'])
 @jwt_required()
+@rate_limit(10, 600, key='user')
 @check_mandatory(['email', 'otp'])
 def email_verification():
     email = request.json.get('email')
     otp = request.json.get('otp')
     
-    if verify_otp(email, otp):
+    if verify_otp(email, otp, otp_for='email_verification'):
         verified = verify_user_account(email)
         if verified:
-          delete_all_otps(email)
+          delete_all_otps(email, otp_for='email_verification')
           return jsonify({'message': 'User account verified!'}), Status.HTTP_200_OK
         else:
          return jsonify({'error': f'User with email: {email} not found'}), Status.HTTP_404_NOT_FOUND 
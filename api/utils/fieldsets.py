@@ -0,0 +1,70 @@
+"""
+    Util file; Contains functions for sparse fieldsets (?fields=id,first_name,...) on list endpoints.
+
+    The requested fields both trim the serialized rows (see Model.to_dict(fields)) and narrow
+    the SELECT through load_only, so unrequested columns are never fetched.
+
+    External Libraries:
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+
+    Function Names:
+        - parse_fields
+        - load_fields
+"""
+
+# Lib Imports:
+from sqlalchemy.orm import load_only
+
+# Module Imports:
+from api.utils.serializer import get_plan
+
+# ----------------------------------------------- #
+
+def parse_fields(fields):
+    """
+    Parse the value of a fields query parameter.
+
+    Parameters:
+        - fields (str or None): Comma separated field names, e.g. 'first_name,city'.
+
+    Returns:
+        - list or None: The field names ('id' always included), None if no fieldset was requested.
+    """
+
+    if not fields:
+        return None
+
+    parsed = ['id']
+    for field in fields.split(','):
+        field = field.strip()
+        if field and field not in parsed:
+            parsed.append(field)
+    return parsed
+
+def load_fields(query, model, fields, extra=()):
+    """
+    Restrict the columns loaded by a query to a fieldset.
+
+    Parameters:
+        - query (Query): The SQLAlchemy query on model.
+        - model (type): The mapped class being listed, e.g. Lawyer.
+        - fields (list or None): The fieldset from parse_fields(), None to load every column.
+        - extra (iterable, optional): Field names the controller needs loaded anyway (e.g. keyset columns).
+
+    Returns:
+        - Query: The query with load_only applied.
+
+    Raises:
+        - ValueError: If a field is not a serializable column of the model.
+    """
+
+    if not fields:
+        return query
+
+    allowed = {key for key, _ in get_plan(model)}
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f'Unknown field(s): {", ".join(unknown)}')
+
+    keys = dict.fromkeys([*fields, *extra])
+    return query.options(load_only(*[getattr(model, key) for key in keys]))
@@ -0,0 +1,156 @@
+"""
+    Util file; Contains an offline reverse geocoder over a local gazetteer (GeoNames cities dump).
+
+    The places are bucketed in a grid of 1 degree cells; a lookup scans the rings of cells around
+    the point, nearest first, and stops as soon as no farther ring can hold a closer place. With a
+    cities1000/cities500 dump a lookup reads a handful of cells (sub-millisecond), no network needed.
+
+    Gazetteer format (https://download.geonames.org/export/dump/, e.g. cities1000.zip):
+        Tab separated, columns: geonameid, name, asciiname, alternatenames, latitude, longitude,
+        feature class, feature code, country code, ... (a .zip holding the .txt is read directly).
+
+    External Libraries:
+        - pycountry: ISO country codes to country names.
+        - math: A module in Python that provides mathematical functions.
+
+    Class Names:
+        - Gazetteer
+
+    Function Names:
+        - get_gazetteer
+"""
+
+# Lib Imports:
+import io
+import math
+import os
+import threading
+import zipfile
+import pycountry
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+CELL_DEGREES = 1.0
+MAX_RINGS = 180
+
+_instances = {}     # Path => loaded Gazetteer
+_lock = threading.Lock()
+
+class Gazetteer:
+    def __init__(self, places=()):
+        """
+        Parameters:
+            - places (iterable): (name, latitude, longitude, country code) tuples.
+        """
+
+        self.names, self.latitudes, self.longitudes, self.country_codes = [], [], [], []
+        self.cells = {}
+        for name, latitude, longitude, country_code in places:
+            self.add(name, latitude, longitude, country_code)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Load a GeoNames dump (.txt, or a .zip holding it).
+        """
+
+        if path.endswith('.zip'):
+            with zipfile.ZipFile(path) as archive:
+                member = os.path.basename(path)[:-len('.zip')] + '.txt'
+                with archive.open(member) as raw:
+                    return cls(_read_geonames(io.TextIOWrapper(raw, encoding='utf-8')))
+
+        with open(path, encoding='utf-8') as file:
+            return cls(_read_geonames(file))
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _cell(latitude, longitude):
+        return math.floor(latitude / CELL_DEGREES), math.floor((longitude % 360) / CELL_DEGREES)
+
+    def add(self, name, latitude, longitude, country_code):
+        index = len(self.names)
+        self.names.append(name)
+        self.latitudes.append(latitude)
+        self.longitudes.append(longitude)
+        self.country_codes.append(country_code)
+        self.cells.setdefault(self._cell(latitude, longitude), []).append(index)
+
+    def nearest(self, latitude, longitude):
+        """
+        Find the place nearest to a point.
+
+        Returns:
+            - int or None: The index of the place, None if the gazetteer is empty.
+        """
+
+        # Equirectangular distance in degrees: exact enough to rank places this close.
+        scale = math.cos(math.radians(latitude))
+        row, column = self._cell(latitude, longitude)
+        columns = round(360 / CELL_DEGREES)
+        best, best_distance = None, math.inf
+
+        for ring in range(MAX_RINGS + 1):
+            # Places of this ring are at least (ring - 1) cells away along one axis:
+            if best is not None and (ring - 1) * CELL_DEGREES * max(scale, 0.01) > best_distance:
+                break
+
+            for d_row in range(-ring, ring + 1):
+                step = 1 if abs(d_row) == ring else 2 * ring
+                for d_column in range(-ring, ring + 1, step or 1):
+                    cell = (row + d_row, (column + d_column) % columns)
+                    for index in self.cells.get(cell, ()):
+                        d_lat = self.latitudes[index] - latitude
+                        d_long = (self.longitudes[index] - longitude + 180) % 360 - 180
+                        distance = math.hypot(d_lat, d_long * scale)
+                        if distance < best_distance:
+                            best, best_distance = index, distance
+        return best
+
+    def reverse(self, latitude, longitude):
+        """
+        Function to get address from latitude and longitude (same contract as geo_locator.get_address).
+
+        Returns:
+            - country (str), city (str), postal_code (None: not in the cities dump), full_address (str).
+
+        Raises:
+            - LookupError: If the gazetteer is empty.
+        """
+
+        index = self.nearest(float(latitude), float(longitude))
+        if index is None:
+            raise LookupError('Empty gazetteer')
+
+        city = self.names[index]
+        country = _country_name(self.country_codes[index])
+        full_address = ', '.join(part for part in (city, country) if part)
+        return country, city, None, full_address
+
+def _read_geonames(lines):
+    for line in lines:
+        columns = line.rstrip('\n').split('\t')
+        if len(columns) < 9:
+            continue
+        yield columns[1], float(columns[4]), float(columns[5]), columns[8]
+
+def _country_name(code):
+    country = pycountry.countries.get(alpha_2=code) if code else None
+    return country.name if country else (code or '')
+
+def get_gazetteer(path):
+    """
+    Get the gazetteer of a file, loading it once per process.
+    """
+
+    gazetteer = _instances.get(path)
+    if gazetteer is None:
+        with _lock:
+            gazetteer = _instances.get(path)
+            if gazetteer is None:
+                gazetteer = _instances[path] = Gazetteer.from_file(path)
+    return gazetteer
@@ -0,0 +1,179 @@
+"""
+    Util file; Contains a two level cache in front of geo_locator.get_address (reverse geocoding).
+
+    Coordinates are rounded (GEO_CACHE_PRECISION decimals, ~110m at 3) and looked up in:
+        1 - An in-process LRU (GEO_CACHE_MAX_ENTRIES entries), so repeat lookups never leave the process.
+        2 - The geo_cache table (GEO_CACHE_TTL_DAYS), shared by all workers & restarts.
+    Only then is the provider (Nominatim) called and both levels filled.
+    Local backends (the gazetteer) are faster than the cache and bypass it.
+
+    Cache writes use their own connection, so they never commit the caller's session.
+
+    External Libraries:
+        - flask: A micro web framework for Python.
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+        - threading: A module in Python for working with threads.
+
+    Function Names:
+        - get_cached_address
+        - get_cache_stats
+        - clear_local_cache
+"""
+
+# Lib Imports:
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+
+# Module Imports:
+from api.database import db
+from api.models.geo_cache import GeoCache
+from api.utils.geo_locator import get_address, is_remote_backend
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+DEFAULT_PRECISION = 3
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_ENTRIES = 4096
+
+## --- LOCAL (in-process) LEVEL --- ##
+
+_local = OrderedDict()      # (lat_key, long_key) => (address tuple, expires_at)
+_lock = threading.Lock()
+_stats = {'local_hits': 0, 'db_hits': 0, 'misses': 0}
+
+## --- METHODS --- ##
+
+def _config(key, default):
+    return current_app.config.get(key, default)
+
+def _round_key(latitude, longitude):
+    """
+    Round coordinates to the cache key, scaled to integers.
+    """
+
+    scale = 10 ** _config('GEO_CACHE_PRECISION', DEFAULT_PRECISION)
+    return round(float(latitude) * scale), round(float(longitude) * scale)
+
+def _local_get(key, now):
+    with _lock:
+        entry = _local.get(key)
+        if entry is None:
+            return None
+        address, expires_at = entry
+        if expires_at <= now:
+            del _local[key]
+            return None
+        _local.move_to_end(key)
+        _stats['local_hits'] += 1
+        return address
+
+def _local_put(key, address, expires_at):
+    with _lock:
+        _local[key] = (address, expires_at)
+        _local.move_to_end(key)
+        while len(_local) > _config('GEO_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES):
+            _local.popitem(last=False)
+
+def _db_get(key, now):
+    """
+    Read a fresh row of the geo_cache table and count the hit.
+    """
+
+    with db.engine.begin() as connection:
+        row = connection.execute(
+            select(GeoCache.id, GeoCache.country, GeoCache.city, GeoCache.postal_code, GeoCache.geo_address, GeoCache.expires_at)
+            .where(GeoCache.lat_key == key[0], GeoCache.long_key == key[1], GeoCache.expires_at > now)
+        ).first()
+        if row is None:
+            return None
+        connection.execute(update(GeoCache).where(GeoCache.id == row.id).values(hits=GeoCache.hits + 1))
+
+    with _lock:
+        _stats['db_hits'] += 1
+    return (row.country, row.city, row.postal_code, row.geo_address), row.expires_at
+
+def _db_put(key, address, now, expires_at):
+    """
+    Insert (or refresh an expired) row of the geo_cache table and count the miss.
+    """
+
+    country, city, postal_code, full_address = address
+    values = dict(country=country, city=city, postal_code=postal_code, geo_address=full_address, expires_at=expires_at, updated=now)
+    statement = insert(GeoCache).values(lat_key=key[0], long_key=key[1], created=now, hits=0, misses=1, **values)
+    statement = statement.on_conflict_do_update(
+        constraint='uq_geo_cache_lat_long',
+        set_=dict(misses=GeoCache.misses + 1, **values),
+    )
+    with db.engine.begin() as connection:
+        connection.execute(statement)
+
+def get_cached_address(latitude, longitude, fetch=None):
+    """
+    Function to get address from latitude and longitude through the cache.
+
+    Parameters:
+        - latitude (float or str): The latitude coordinate.
+        - longitude (float or str): The longitude coordinate.
+        - fetch (callable, optional): Provider lookup used on a miss, e.g. a rate limited one. Defaults to get_address.
+
+    Returns:
+        - country (str), city (str), postal_code (str or None), full_address (str): See geo_locator.get_address.
+    """
+
+    if not is_remote_backend():
+        return tuple((fetch or get_address)(latitude, longitude))
+
+    key = _round_key(latitude, longitude)
+    now = datetime.now(timezone.utc)
+
+    address = _local_get(key, now)
+    if address is not None:
+        return address
+
+    try:
+        cached = _db_get(key, now)
+    except Exception as e:
+        # The cache must never break geocoding:
+        print(f"Error occurred while reading geo cache: {e}")
+        cached = None
+    if cached is not None:
+        address, expires_at = cached
+        _local_put(key, address, expires_at)
+        return address
+
+    with _lock:
+        _stats['misses'] += 1
+    address = tuple((fetch or get_address)(latitude, longitude))
+    expires_at = now + timedelta(days=_config('GEO_CACHE_TTL_DAYS', DEFAULT_TTL_DAYS))
+
+    try:
+        _db_put(key, address, now, expires_at)
+    except Exception as e:
+        print(f"Error occurred while writing geo cache: {e}")
+    _local_put(key, address, expires_at)
+    return address
+
+def get_cache_stats():
+    """
+    Function to get the counters of this process' cache.
+
+    Returns:
+        - dict: local_hits, db_hits, misses & the number of local entries.
+    """
+
+    with _lock:
+        return dict(_stats, local_entries=len(_local))
+
+def clear_local_cache():
+    """
+    Function to empty this process' cache level (the table is left untouched).
+    """
+
+    with _lock:
+        _local.clear()
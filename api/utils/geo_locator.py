@@ -1,11 +1,25 @@
 """
     Util file; Contains functions for geo-location purposes.
 
+    Reverse geocoding backends (GEO_BACKEND config):
+        - 'nominatim':  OpenStreetMap's Nominatim over HTTP (default).
+        - 'gazetteer':  Offline lookup in the local GeoNames dump at GEO_GAZETTEER_PATH (see api.utils.gazetteer).
+
     External Libraries:
         - geopy.geocoders.Nominatim: A geocoding service provided by OpenStreetMap (OSM) that provides data for reverse geocoding.
+        - flask: A micro web framework for Python.
+        - math: A module in Python that provides mathematical functions.
 
     Function Names:
         - get_address
+        - nominatim_address
+        - gazetteer_address
+        - get_backend
+        - is_remote_backend
+        - parse_coordinates
+        - bounding_box
+        - longitude_ranges
+        - haversine
         
     # Example usage
         latitude = 32.81591
@@ -14,17 +28,30 @@
 """
 
 # Lib Imports:
+import math
+from flask import current_app, has_app_context
 from geopy.geocoders import Nominatim
 
+# Module Imports:
+from api.utils.gazetteer import get_gazetteer
+
 # ----------------------------------------------- #
 
+## --- CONTS --- ##
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.045
+DEFAULT_RADIUS_KM = 25
+MAX_RADIUS_KM = 500
+DEFAULT_BACKEND = 'nominatim'
+
 # Initialize geolocator:
 ## Bug fix: SSL cert error, https://stackoverflow.com/a/47091697
 geolocator = Nominatim(user_agent="geo_locator", scheme='http')
 
-def get_address(latitude, longitude):
+def nominatim_address(latitude, longitude):
     """
-    Function to get address from latitude and longitude.
+    Function to get address from latitude and longitude with Nominatim.
 
     Parameters:
         - latitude (float): The latitude coordinate.
@@ -46,3 +73,148 @@ def get_address(latitude, longitude):
     postal_code = address.get('address', {}).get('postcode', None)
 
     return country, city, postal_code, full_address
+
+def gazetteer_address(latitude, longitude):
+    """
+    Function to get address from latitude and longitude in the local gazetteer (GEO_GAZETTEER_PATH).
+
+    Returns:
+        - country (str), city (str), postal_code (None), full_address (str): As nominatim_address.
+    """
+
+    path = current_app.config.get('GEO_GAZETTEER_PATH') if has_app_context() else None
+    if not path:
+        raise LookupError('GEO_GAZETTEER_PATH is not configured')
+    return get_gazetteer(path).reverse(latitude, longitude)
+
+# Backend name => (function, calls a remote service):
+BACKENDS = {
+    'nominatim': (nominatim_address, True),
+    'gazetteer': (gazetteer_address, False),
+}
+
+def _backend_name():
+    return current_app.config.get('GEO_BACKEND', DEFAULT_BACKEND) if has_app_context() else DEFAULT_BACKEND
+
+def get_backend():
+    """
+    Function to get the reverse geocoding function of the configured backend.
+
+    Raises:
+        - ValueError: If GEO_BACKEND is not a known backend.
+    """
+
+    name = _backend_name()
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown geo backend: {name}')
+    return BACKENDS[name][0]
+
+def is_remote_backend():
+    """
+    Function to check whether the configured backend calls a remote service (and must be rate limited).
+    """
+
+    return BACKENDS.get(_backend_name(), (None, True))[1]
+
+def get_address(latitude, longitude):
+    """
+    Function to get address from latitude and longitude with the configured backend.
+
+    Parameters:
+        - latitude (float): The latitude coordinate.
+        - longitude (float): The longitude coordinate.
+
+    Returns:
+        - country (str): The country name.
+        - city (str): The city name.
+        - postal_code (str or None): The postal code.
+        - full_address (str): The complete address.
+    """
+
+    return get_backend()(latitude, longitude)
+
+def parse_coordinates(near):
+    """
+    Function to parse a 'lat,long' string (or [lat, long] list) into floats.
+
+    Parameters:
+        - near (str or list): The coordinates, e.g. '32.81591,73.86236'.
+
+    Returns:
+        - latitude (float): The latitude coordinate.
+        - longitude (float): The longitude coordinate.
+
+    Raises:
+        - ValueError: If the coordinates are malformed or out of range.
+    """
+    
+    try:
+        if isinstance(near, str):
+            near = near.split(',')
+        latitude, longitude = (float(value) for value in near)
+    except (TypeError, ValueError):
+        raise ValueError('Invalid near coordinates, expected "lat,long"')
+    
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValueError('Invalid near coordinates, out of range')
+    return latitude, longitude
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Function to get the lat/long box enclosing a circle, used as an indexable prefilter.
+
+    Parameters:
+        - latitude (float): The latitude of the centre.
+        - longitude (float): The longitude of the centre.
+        - radius_km (float): The radius of the circle in km.
+
+    Returns:
+        - min_lat, max_lat, min_long, max_long (float): The box edges, the longitudes may be beyond ±180 (see longitude_ranges).
+    """
+    
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = latitude - lat_delta, latitude + lat_delta
+    if min_lat <= -90 or max_lat >= 90:
+        # The circle encloses a pole, every longitude is in it:
+        return max(min_lat, -90.0), min(max_lat, 90.0), longitude - 180, longitude + 180
+    
+    # Degrees of longitude shrink towards the poles:
+    long_delta = radius_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(latitude)))
+    return min_lat, max_lat, longitude - long_delta, longitude + long_delta
+
+def longitude_ranges(min_long, max_long):
+    """
+    Function to wrap the longitude edges of a bounding box into [-180, 180].
+    A box crossing the antimeridian is split in two ranges, one on each side of it.
+
+    Parameters:
+        - min_long, max_long (float): The box edges, as returned by bounding_box (may be beyond ±180).
+
+    Returns:
+        - list of (min_long, max_long) tuples: The ranges to match, OR-ed together.
+    """
+
+    if max_long - min_long >= 360:
+        return [(-180.0, 180.0)]
+    if min_long < -180:
+        return [(min_long + 360, 180.0), (-180.0, max_long)]
+    if max_long > 180:
+        return [(min_long, 180.0), (-180.0, max_long - 360)]
+    return [(min_long, max_long)]
+
+def haversine(lat1, long1, lat2, long2):
+    """
+    Function to get the great-circle distance between two points.
+
+    Parameters:
+        - lat1, long1 (float): The first point.
+        - lat2, long2 (float): The second point.
+
+    Returns:
+        - float: The distance in km.
+    """
+    
+    d_lat = math.radians(lat2 - lat1)
+    d_long = math.radians(long2 - long1)
+    a = math.sin(d_lat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(d_long / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
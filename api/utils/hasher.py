@@ -1,19 +1,125 @@
 """
     Util file; for hashing and verification of passwords.
 
+    bcrypt runs on a bounded process pool (HASHER_POOL_SIZE processes per app process) so a login
+    burst cannot hold every worker on CPU hashing. At most HASHER_MAX_PENDING hashes may be queued
+    or running; past that HasherBusy is raised and answered with 503 (see create_app).
+    HASHER_POOL_SIZE = 0 hashes inline, in the calling thread.
+    On a gevent worker the caller waits for the pool on the hub (see _wait): other requests &
+    websockets of the worker keep running while bcrypt does.
+    Bulk imports hash through hash_passwords, on one pool of their own per import (hashing_pool).
+
     External Libraries:
         - bcrypt: A password-hashing library for Python, which uses the OpenBSD Blowfish hashing algorithm.
+        - concurrent.futures: A module in Python for running callables asynchronously.
+
+    Class Names:
+        - HasherBusy
 
     Function Names:
         - hash_password
+        - hashing_pool
+        - hash_passwords
         - verify_password
+        - shutdown_pool
 """
 
 # Lib Imports:
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 import bcrypt
+from flask import current_app, has_app_context
+
+# Module Imports:
+from api.extentions.async_mode import is_gevent_patched
 
 # ----------------------------------------------- #
 
+## --- CONTS --- ##
+
+DEFAULT_ROUNDS = 12         # bcrypt.gensalt() default cost
+DEFAULT_POOL_SIZE = 0
+DEFAULT_MAX_PENDING = 16
+
+_pool = None
+_pool_pid = None            # A forked process must not reuse its parent's pool
+_slots = None
+_pool_lock = threading.Lock()
+
+class HasherBusy(Exception):
+    """
+        Raised when HASHER_MAX_PENDING hashes are already queued or running.
+    """
+
+## --- METHODS --- ##
+
+def _config(key, default):
+    return current_app.config.get(key, default) if has_app_context() else default
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+def _check(password, hashed_password):
+    return bcrypt.checkpw(password, hashed_password)
+
+def _get_pool():
+    global _pool, _pool_pid, _slots
+
+    size = _config('HASHER_POOL_SIZE', DEFAULT_POOL_SIZE)
+    if not size:
+        return None
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # spawn => pool processes never inherit the app's threads or connections:
+            _pool = ProcessPoolExecutor(max_workers=size, mp_context=multiprocessing.get_context('spawn'))
+            _pool_pid = os.getpid()
+            _slots = threading.BoundedSemaphore(_config('HASHER_MAX_PENDING', DEFAULT_MAX_PENDING))
+    return _pool
+
+def _wait(future):
+    """
+    Wait for a pool result, as a greenlet on a gevent worker (future.result() could stall the hub).
+    """
+
+    if not is_gevent_patched():
+        return future.result()
+
+    from gevent.event import AsyncResult
+    result = AsyncResult()
+
+    def done(future):
+        if future.exception() is not None:
+            result.set_exception(future.exception())
+        else:
+            result.set(future.result())
+
+    future.add_done_callback(done)
+    return result.get()
+
+def _run(function, *args):
+    """
+    Run a bcrypt function on the pool (or inline without one), blocking until it's done.
+
+    Raises:
+        - HasherBusy: If the pool queue is full.
+    """
+
+    pool = _get_pool()
+    if pool is None:
+        return function(*args)
+
+    slots = _slots
+    if not slots.acquire(blocking=False):
+        raise HasherBusy('Too many password checks in progress, try again later')
+    try:
+        return _wait(pool.submit(function, *args))
+    finally:
+        slots.release()
+
 def hash_password(password):
     """
     Hashes the provided password using bcrypt.
@@ -23,25 +129,89 @@ def hash_password(password):
 
     Returns:
         - hashed_password (str): The hashed password.
+
+    Raises:
+        - HasherBusy: If the hashing pool is saturated.
     """
-    
-    # Generate a salt and hash the password
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
+
+    # Generate a salt (cost from BCRYPT_ROUNDS) and hash the password
+    hashed_password = _run(_hash, password.encode('utf-8'), _config('BCRYPT_ROUNDS', DEFAULT_ROUNDS))
     return hashed_password.decode('utf-8')
 
+@contextmanager
+def hashing_pool(workers=None):
+    """
+    A process pool for bulk hashing (hash_passwords), shared by every batch of an import & shut down
+    after it. It leaves the request pool & its HASHER_MAX_PENDING slots to the logins.
+
+    Parameters:
+        - workers (int, optional): Hashing processes. Defaults to the CPU count, 1 => None (hash inline).
+
+    Yields:
+        - ProcessPoolExecutor or None.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        yield None
+        return
+
+    # Processes are only spawned on the first hash:
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        yield pool
+    finally:
+        pool.shutdown()
+
+def hash_passwords(passwords, pool=None):
+    """
+    Hashes many passwords in parallel (bulk imports).
+
+    Parameters:
+        - passwords (list): The passwords to be hashed.
+        - pool (ProcessPoolExecutor, optional): A pool from hashing_pool, None hashes inline.
+
+    Returns:
+        - list: The hashed passwords, in the same order.
+    """
+
+    rounds = _config('BCRYPT_ROUNDS', DEFAULT_ROUNDS)
+    encoded = [password.encode('utf-8') for password in passwords]
+
+    if pool is None:
+        return [_hash(password, rounds).decode('utf-8') for password in encoded]
+
+    # Waited one by one through _wait: a gevent worker keeps serving while the batch hashes
+    futures = [pool.submit(_hash, password, rounds) for password in encoded]
+    return [_wait(future).decode('utf-8') for future in futures]
+
 def verify_password(password, hashed_password):
     """
     Verifies the provided password against the hashed password using bcrypt.
     Returns True if the passwords match, False otherwise.
-    
+
     Parameters:
         - password (str): The password to be verified.
-        - hashed_password (str): The hashed password to be compared with.
+        - hashed_password (str): The hashed password to be compared with (its own cost is used).
 
     Returns:
         - bool: True if the passwords match, False otherwise.
+
+    Raises:
+        - HasherBusy: If the hashing pool is saturated.
     """
-    
+
     # Check if the provided password matches the hashed password
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    return _run(_check, password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+def shutdown_pool():
+    """
+    Stop the pool processes of this process (e.g. between benchmark runs).
+    """
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
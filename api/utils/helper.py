@@ -5,7 +5,6 @@
         - flask: A micro web framework for Python.
         - datetime: A module in Python that supplies classes for manipulating dates and times.
         - os: A module in Python that provides functions for interacting with the operating system.
-        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
 
     Function Names:
         - allowed_file
@@ -21,7 +20,9 @@
 from flask import current_app
 from datetime import datetime
 import os
-from sqlalchemy import inspect
+
+# Module Imports:
+from api.utils.serializer import serialize
 
 # ----------------------------------------------- #
 
@@ -130,12 +131,15 @@ def rename_document(file):
     new_filename = f"{current_time}{extension}"
     return new_filename
 
-def to_dict(instance):
+def to_dict(instance, fields=None):
     """
         Convert SQLAlchemy model instance to a dictionary representation.
+        Uses the precompiled plan of the instance's class (see api.utils.serializer): dates are
+        converted to strings, deferred columns and passwords are left out.
 
         Args:
             instance: SQLAlchemy model instance to be converted.
+            fields (list, optional): Sparse fieldset, only these keys are included.
 
         Returns:
             dict: Dictionary representation of the SQLAlchemy model instance.
@@ -144,4 +148,4 @@ def to_dict(instance):
             How to serialize SqlAlchemy PostgreSQL Query to JSON => https://stackoverflow.com/a/46180522
     """
     
-    return {c.key: getattr(instance, c.key) for c in inspect(instance).mapper.column_attrs}
+    return serialize(instance, fields)
@@ -0,0 +1,226 @@
+"""
+    Util file; Contains the bulk import of lawyers (bar association rosters) from CSV or JSONL.
+
+    Instead of one create_user per lawyer (2 duplicate queries, a bcrypt hash, a geocode & a commit each):
+        - The file is streamed & validated row by row; emails & usernames are checked against sets
+          loaded in one query (and the rows already read).
+        - Passwords are hashed in parallel, one batch at a time, on one pool for the whole import
+          (hasher.hashing_pool & hash_passwords).
+        - Each batch is one multi-row INSERT ... RETURNING per table & one commit.
+        - Geocoding is left to the background queue (rows with coordinates are saved pending).
+    A batch failing on insert (e.g. a signup racing the import) is retried row by row, so only the
+    offending rows are reported.
+
+    Run with `flask users import-lawyers <file>` or POST /api/users/lawyer/import.
+
+    External Libraries:
+        - csv: A module in Python for reading & writing CSV files.
+        - json: A module in Python for encoding & decoding JSON.
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+
+    Function Names:
+        - read_rows
+        - import_lawyers
+"""
+
+# Lib Imports:
+import csv
+import json
+from datetime import datetime
+from sqlalchemy import insert, select, update, func
+from sqlalchemy.exc import SQLAlchemyError
+
+# Module Imports:
+from api.database import db
+from api.models.user import User, Lawyer, GEO_PENDING
+from api.utils.hasher import hashing_pool, hash_passwords
+from api.utils.geo_locator import parse_coordinates
+from api.extentions.geo_queue import geo_queue
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+DEFAULT_BATCH_SIZE = 500
+FORMATS = ['csv', 'jsonl']
+
+# Same mandatory keys as POST /api/users/lawyer, coordinates are optional:
+MANDATORY_KEYS = ['email', 'username', 'password', 'first_name', 'last_name', 'address', 'cnic', 'bar_voter_number']
+OPTIONAL_KEYS = ['phone_number', 'about']
+
+## --- METHODS --- ##
+
+def read_rows(stream, format):
+    """
+    Function to stream the rows of a CSV (with a header line) or JSONL file.
+
+    Parameters:
+        - stream (file): A text stream of the file.
+        - format (str): 'csv' or 'jsonl'.
+
+    Yields:
+        - tuple: (line number, row dict or None, parse error or None).
+
+    Raises:
+        - ValueError: If the format is unknown.
+    """
+
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+    elif format == 'jsonl':
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield number, None, 'Invalid JSON'
+                continue
+            if isinstance(row, dict):
+                yield number, row, None
+            else:
+                yield number, None, 'Expected a JSON object'
+    else:
+        raise ValueError(f'Unknown format, expected one of: {", ".join(FORMATS)}')
+
+def _text(row, key):
+    value = row.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def _validate(row, emails, usernames, verified):
+    """
+    Check a row & turn it into the insert values of one lawyer (password still plain).
+
+    Raises:
+        - ValueError: With the error reported for the row.
+    """
+
+    values = {key: _text(row, key) for key in MANDATORY_KEYS + OPTIONAL_KEYS}
+
+    missing_keys = [key for key in MANDATORY_KEYS if values[key] is None]
+    if missing_keys:
+        raise ValueError(f'Missing mandatory key(s): {", ".join(missing_keys)}')
+
+    if values['email'] in emails or values['username'] in usernames:
+        raise ValueError('User with the same email or username already exists')
+
+    experience_years = _text(row, 'experience_years')
+    try:
+        values['experience_years'] = int(experience_years) if experience_years is not None else None
+    except ValueError:
+        raise ValueError('Invalid experience_years, expected an integer')
+
+    latitude, longitude = _text(row, 'latitude'), _text(row, 'longitude')
+    values.update(latitude=None, longitude=None, geo_status=None, geo_attempts=0, geo_retry_at=None)
+    if latitude is not None or longitude is not None:
+        try:
+            latitude, longitude = parse_coordinates([latitude, longitude])
+        except ValueError:
+            raise ValueError('Invalid latitude/longitude')
+        # Address resolved in the background, as User.set_location:
+        values.update(latitude=latitude, longitude=longitude, geo_status=GEO_PENDING, geo_retry_at=datetime.now())
+
+    values.update(role='lawyer', is_verified=verified)
+    return values
+
+def _insert(rows):
+    """
+    Insert lawyers (both tables) & build their search documents, in the current transaction.
+    """
+
+    ids = db.session.execute(insert(Lawyer).returning(Lawyer.id), rows).scalars().all()
+
+    # New lawyers have no skills & no city yet (geo_queue.resolve refreshes the document):
+    if db.engine.dialect.name == 'postgresql':
+        users, lawyers = User.__table__, Lawyer.__table__
+        db.session.execute(
+            update(lawyers)
+            .where(lawyers.c.id == users.c.id, lawyers.c.id.in_(ids))
+            .values(search_vector=Lawyer.search_document(
+                func.concat(users.c.first_name, ' ', users.c.last_name), '', '', func.coalesce(lawyers.c.about, '')
+            ))
+        )
+    return ids
+
+def _flush(batch, report, pool):
+    """
+    Hash & insert one batch of validated rows, reporting the rows that could not be inserted.
+    """
+
+    passwords = hash_passwords([values['password'] for _, values in batch], pool=pool)
+    for (_, values), password in zip(batch, passwords):
+        values['password'] = password
+
+    try:
+        _insert([values for _, values in batch])
+        db.session.commit()
+        report['created'] += len(batch)
+        return
+    except SQLAlchemyError:
+        db.session.rollback()
+
+    for number, values in batch:
+        try:
+            with db.session.begin_nested():
+                _insert([values])
+            report['created'] += 1
+        except SQLAlchemyError as e:
+            report['errors'].append({'row': number, 'email': values['email'], 'error': str(getattr(e, 'orig', e)).strip()[:300]})
+    db.session.commit()
+
+def import_lawyers(rows, batch_size=DEFAULT_BATCH_SIZE, workers=None, verified=False):
+    """
+    Function to import lawyers in batches.
+
+    Parameters:
+        - rows (iterable): (line number, row, parse error) tuples, as yielded by read_rows.
+        - batch_size (int): Lawyers hashed & inserted per commit.
+        - workers (int, optional): Password hashing processes. Defaults to the CPU count.
+        - verified (bool): Import the accounts as verified (trusted roster).
+
+    Returns:
+        - dict: {'created': int, 'failed': int, 'errors': [{'row', 'email', 'error'}]}.
+    """
+
+    report = {'created': 0, 'failed': 0, 'errors': []}
+
+    # Every taken email & username, in one query:
+    emails, usernames = set(), set()
+    for email, username in db.session.execute(select(User.email, User.username)):
+        emails.add(email)
+        usernames.add(username)
+
+    batch, geocode = [], False
+    with hashing_pool(workers) as pool:
+        for number, row, error in rows:
+            if error is None:
+                try:
+                    values = _validate(row, emails, usernames, verified)
+                except ValueError as e:
+                    error = str(e)
+            if error is not None:
+                report['errors'].append({'row': number, 'email': _text(row or {}, 'email'), 'error': error})
+                continue
+
+            emails.add(values['email'])
+            usernames.add(values['username'])
+            geocode = geocode or values['geo_status'] == GEO_PENDING
+            batch.append((number, values))
+            if len(batch) >= batch_size:
+                _flush(batch, report, pool)
+                batch = []
+
+        if batch:
+            _flush(batch, report, pool)
+
+    if geocode:
+        geo_queue.enqueue()
+
+    report['errors'].sort(key=lambda error: error['row'])
+    report['failed'] = len(report['errors'])
+    return report
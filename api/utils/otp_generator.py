@@ -1,22 +1,37 @@
 """
-    Util file; Contains functions for OTP (One-Time Password) generation, saving, verification, and deletion from the database.
+    Util file; Contains functions for OTP (One-Time Password) generation, saving, verification, and deletion.
+
+    OTPs are kept by the OTP_BACKEND config:
+        - 'database' (default):  The otp table, shared by every worker. Expired rows are purged at most
+                                 every OTP_PURGE_INTERVAL seconds on save, and by `flask otp purge`.
+        - 'memory':              A per process TTL store, for single process deployments that don't need
+                                 OTPs to survive a restart.
+
+    An OTP is scoped by email and purpose (otp_for); only the latest one of a purpose is valid.
 
     External Libraries:
         - random: A module in Python that provides functions for generating random numbers.
         - string: A module in Python that provides functions for manipulating strings.
         - datetime: A module in Python that supplies classes for manipulating dates and times.
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
 
     Function Names:
         - generate_otp
         - save_otp
         - verify_otp
         - delete_all_otps
+        - purge_expired_otps
 """
 
 # Lib Imports:
+import hmac
 import random
 import string
+import threading
+import time
 from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete
 
 # Module Imports:
 from api.database import db
@@ -24,6 +39,20 @@ from api.models.otp import OTP
 
 # ----------------------------------------------- #
 
+## --- CONTS --- ##
+
+OTP_TTL = timedelta(minutes=5)
+DEFAULT_PURGE_INTERVAL = 3600
+
+_lock = threading.Lock()
+_memory = {}                        # (email, otp_for) => (otp, expiry_time)
+_purge = {'next': 0.0}
+
+## --- METHODS --- ##
+
+def _use_memory():
+    return current_app.config.get('OTP_BACKEND', 'database') == 'memory'
+
 def generate_otp():
     """
     Function to generate OTP.
@@ -31,13 +60,13 @@ def generate_otp():
     Returns:
         - otp (str): The generated OTP.
     """
-    
+
     otp = ''.join(random.choices(string.digits, k=6))  # 6-digit OTP
     return otp
 
 def save_otp(email, otp, otp_for):
     """
-    Function to save OTP with expiry time in the database.
+    Function to save OTP with expiry time.
 
     Parameters:
         - email (str): The email associated with the OTP.
@@ -47,40 +76,97 @@ def save_otp(email, otp, otp_for):
     Returns:
         - None
     """
-    expiry_time = datetime.now() + timedelta(minutes=5)  # OTP expiry time set to 5 minutes
+
+    expiry_time = datetime.now() + OTP_TTL  # OTP expiry time set to 5 minutes
+    if _use_memory():
+        with _lock:
+            _memory[(email, otp_for)] = (otp, expiry_time)
+        return
+
     otp_record = OTP(email=email, otp=otp, otp_for=otp_for, expiry_time=expiry_time)
     db.session.add(otp_record)
     db.session.commit()
 
-def verify_otp(email, otp):
+    # Periodic purge, at most once per interval per process:
+    now = time.monotonic()
+    with _lock:
+        due = _purge['next'] <= now
+        if due:
+            _purge['next'] = now + current_app.config.get('OTP_PURGE_INTERVAL', DEFAULT_PURGE_INTERVAL)
+    if due:
+        purge_expired_otps()
+
+def verify_otp(email, otp, otp_for):
     """
-    Function to verify OTP.
+    Function to verify OTP against the latest one of its purpose.
 
     Parameters:
         - email (str): The email associated with the OTP.
         - otp (str): The OTP to be verified.
+        - otp_for (str): The purpose the OTP was generated for.
 
     Returns:
         - bool: True if the OTP is valid and not expired, False otherwise.
     """
-    
-    otp_record = OTP.query.filter_by(email=email).order_by(OTP.created_at.desc()).first()
-    if otp_record and otp_record.otp == otp and datetime.now() <= otp_record.expiry_time:
-        return True
-    return False
 
-def delete_all_otps(email):
+    if _use_memory():
+        with _lock:
+            record = _memory.get((email, otp_for))
+        expected, expiry_time = record if record else (None, None)
+    else:
+        # Served by ix_otp_email_otp_for_created_at:
+        otp_record = (
+            OTP.query.filter_by(email=email, otp_for=otp_for)
+            .order_by(OTP.created_at.desc(), OTP.id.desc())
+            .with_entities(OTP.otp, OTP.expiry_time)
+            .first()
+        )
+        expected, expiry_time = otp_record if otp_record else (None, None)
+
+    if expected is None or not isinstance(otp, str):
+        return False
+    return hmac.compare_digest(expected, otp) and datetime.now() <= expiry_time
+
+def delete_all_otps(email, otp_for=None):
     """
-    Function to delete all OTPs associated with an email from the database.
+    Function to delete the OTPs of an email (of one purpose, or all) in one statement.
 
     Parameters:
         - email (str): The email associated with the OTPs to be deleted.
+        - otp_for (str, optional): Only delete the OTPs of this purpose.
 
     Returns:
         - None
     """
-    
-    otp_records = OTP.query.filter_by(email=email).all()
-    for otp_record in otp_records:
-        db.session.delete(otp_record)
+
+    if _use_memory():
+        with _lock:
+            for key in [key for key in _memory if key[0] == email and otp_for in (None, key[1])]:
+                del _memory[key]
+        return
+
+    statement = delete(OTP).where(OTP.email == email)
+    if otp_for is not None:
+        statement = statement.where(OTP.otp_for == otp_for)
+    db.session.execute(statement)
+    db.session.commit()
+
+def purge_expired_otps():
+    """
+    Function to delete every expired OTP.
+
+    Returns:
+        - int: The number of deleted OTPs.
+    """
+
+    now = datetime.now()
+    if _use_memory():
+        with _lock:
+            expired = [key for key, (_, expiry_time) in _memory.items() if expiry_time < now]
+            for key in expired:
+                del _memory[key]
+        return len(expired)
+
+    deleted = db.session.execute(delete(OTP).where(OTP.expiry_time < now)).rowcount
     db.session.commit()
+    return deleted
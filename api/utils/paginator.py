@@ -0,0 +1,156 @@
+"""
+    Util file; Contains functions for keyset (cursor) pagination of SQLAlchemy queries.
+
+    External Libraries:
+        - base64: A module in Python that provides functions for encoding binary data to printable ASCII characters.
+        - json: A module in Python for encoding and decoding JSON data.
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+
+    Function Names:
+        - parse_limit
+        - encode_cursor
+        - cursor_type
+        - decode_cursor
+        - keyset_paginate
+
+    # Example usage
+        lawyers, next_cursor = keyset_paginate(Lawyer.query, [Lawyer.average_rating, Lawyer.id], cursor=None, limit=20, descending=True)
+"""
+
+# Lib Imports:
+import base64
+import json
+from decimal import Decimal
+from sqlalchemy import tuple_
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+## --- METHODS --- ##
+
+def parse_limit(limit):
+    """
+    Clamp the requested page size between 1 and MAX_PAGE_SIZE.
+
+    Parameters:
+        - limit (int or str or None): The requested page size.
+
+    Returns:
+        - int: A page size safe to use in a query.
+    """
+
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def encode_cursor(values):
+    """
+    Encode the sort key values of the last row of a page into an opaque cursor.
+
+    Parameters:
+        - values (list): The sort key values (e.g. [average_rating, id]).
+
+    Returns:
+        - str: A url safe cursor string.
+    """
+
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('utf-8')
+
+def cursor_type(column):
+    """
+    The Python type(s) a cursor value of a sort column must have, None if it cannot be told.
+    """
+
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return None
+    # JSON numbers come back as int or float:
+    if issubclass(python_type, (float, Decimal)):
+        return (int, float)
+    return python_type
+
+def decode_cursor(cursor, size, types=None):
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Parameters:
+        - cursor (str): The cursor received from the client.
+        - size (int): The number of sort key values the cursor must contain.
+        - types (list, optional): The expected type(s) of each value (see cursor_type), None entries are not checked.
+
+    Returns:
+        - list: The sort key values.
+
+    Raises:
+        - ValueError: If the cursor is malformed.
+    """
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+
+    # A tampered value must not reach the database (bool is an int subclass, None never sorts):
+    for value, expected in zip(values, types or []):
+        if expected is not None and (isinstance(value, bool) or not isinstance(value, expected)):
+            raise ValueError('Invalid cursor')
+    return values
+
+def keyset_paginate(query, columns, cursor=None, limit=None, descending=False, key=None):
+    """
+    Fetch one page of a query using keyset pagination on the given columns.
+
+    The last column must be unique (normally the primary key) so that the
+    ordering is total and no row is skipped or repeated between pages. No
+    column may be NULL (a NULL cursor value matches no row): coalesce it.
+
+    Parameters:
+        - query (Query): The (already filtered) SQLAlchemy query.
+        - columns (list): The columns to order and seek on, e.g. [User.id] or [User.average_rating, User.id].
+        - cursor (str, optional): The cursor returned with the previous page.
+        - limit (int, optional): The page size, clamped by parse_limit().
+        - descending (bool, optional): Order the rows in descending order. Defaults to False.
+        - key (callable, optional): Returns the sort key values of a row. Needed when a column is
+                                    a computed expression; defaults to reading each column by name.
+
+    Returns:
+        - items (list): The rows of the requested page.
+        - next_cursor (str or None): The cursor of the next page, None on the last page.
+
+    Raises:
+        - ValueError: If the cursor is malformed.
+    """
+
+    limit = parse_limit(limit)
+
+    if cursor:
+        values = decode_cursor(cursor, len(columns), [cursor_type(column) for column in columns])
+        # Row value comparison => (a, b) > (x, y), served by a composite index on the same columns.
+        if descending:
+            query = query.filter(tuple_(*columns) < tuple_(*values))
+        else:
+            query = query.filter(tuple_(*columns) > tuple_(*values))
+
+    order_by = [column.desc() for column in columns] if descending else [column.asc() for column in columns]
+
+    # Fetch one extra row to know if there is a next page:
+    rows = query.order_by(*order_by).limit(limit + 1).all()
+
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        values = key(last) if key else [getattr(last, column.key) for column in columns]
+        next_cursor = encode_cursor(values)
+
+    return items, next_cursor
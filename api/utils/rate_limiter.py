@@ -0,0 +1,140 @@
+"""
+    Util file; Contains the storage backends of the @rate_limit decorator (sliding windows).
+
+    Backends (RATE_LIMIT_STORAGE_URL config):
+        - None / 'memory://':               Per process, exact sliding log. Limits are multiplied by the
+                                            number of gunicorn workers.
+        - 'sqlite:///...' / 'postgresql://...':   Shared by every worker (and host, for Postgres). Sliding
+                                            window counter: the previous fixed window is weighted by how
+                                            much of it still overlaps the sliding window.
+
+    The database backend keeps its counters in its own rate_limit_counters table (created on first
+    use, not part of the app migrations) and prunes old windows as it goes.
+
+    External Libraries:
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+        - threading: A module in Python for working with threads.
+
+    Class Names:
+        - MemoryBackend
+        - DatabaseBackend
+
+    Function Names:
+        - create_backend
+"""
+
+# Lib Imports:
+import math
+import random
+import threading
+import time
+from collections import deque
+from sqlalchemy import create_engine, MetaData, Table, Column, String, Integer, select, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+PRUNE_PROBABILITY = 0.01    # Share of hits that also delete expired entries
+
+class MemoryBackend:
+    def __init__(self):
+        self._hits = {}         # Key => deque of hit timestamps (oldest first)
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window):
+        """
+        Record a hit of key, unless limit hits already happened in the last window seconds.
+
+        Returns:
+            - (bool, int): Whether the hit is allowed, and the seconds to wait if not.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.setdefault(key, deque())
+            while hits and hits[0] <= now - window:
+                hits.popleft()
+
+            if len(hits) >= limit:
+                return False, max(1, math.ceil(hits[0] + window - now))
+            hits.append(now)
+
+            if random.random() < PRUNE_PROBABILITY:
+                self._prune(now, window)
+        return True, 0
+
+    def _prune(self, now, window):
+        # Windows differ per limit, only drop keys whose newest hit is older than this one:
+        for key in [key for key, hits in self._hits.items() if not hits or hits[-1] <= now - window]:
+            del self._hits[key]
+
+    def reset(self):
+        with self._lock:
+            self._hits.clear()
+
+class DatabaseBackend:
+    def __init__(self, url):
+        self.engine = create_engine(url)
+        self.table = Table(
+            'rate_limit_counters', MetaData(),
+            Column('key', String(255), primary_key=True),
+            Column('window_start', Integer, primary_key=True),
+            Column('count', Integer, nullable=False),
+        )
+        try:
+            self.table.create(self.engine, checkfirst=True)
+        except SQLAlchemyError:
+            # Created meanwhile by another worker, the first hit fails otherwise:
+            pass
+        self.insert = postgresql.insert if self.engine.dialect.name == 'postgresql' else sqlite.insert
+
+    def hit(self, key, limit, window):
+        """
+        Record a hit of key, unless the sliding window count has reached limit (see MemoryBackend.hit).
+        """
+
+        now = time.time()
+        current = int(now // window) * window
+        previous = current - window
+        table = self.table
+
+        with self.engine.connect() as connection, connection.begin() as transaction:
+            # Count the hit first: the upsert locks the row, so concurrent hits of every worker
+            # are counted one after the other & each decides from its own returned count:
+            statement = self.insert(table).values(key=key, window_start=current, count=1)
+            count = connection.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.key, table.c.window_start],
+                set_={'count': table.c.count + 1},
+            ).returning(table.c.count)).scalar()
+
+            previous_count = connection.execute(
+                select(table.c.count).where(table.c.key == key, table.c.window_start == previous)
+            ).scalar() or 0
+
+            # Share of the previous window still inside the sliding window:
+            overlap = 1 - (now - current) / window
+            if previous_count * overlap + count > limit:
+                # Refused hits are not counted:
+                transaction.rollback()
+                return False, max(1, math.ceil(current + window - now))
+
+            if random.random() < PRUNE_PROBABILITY:
+                # Windows differ per key, keep a day of history:
+                connection.execute(delete(table).where(table.c.window_start < now - max(window, 86400) * 2))
+        return True, 0
+
+    def reset(self):
+        with self.engine.begin() as connection:
+            connection.execute(delete(self.table))
+
+def create_backend(url=None):
+    """
+    Create the backend of a RATE_LIMIT_STORAGE_URL.
+    """
+
+    if not url or url == 'memory://':
+        return MemoryBackend()
+    return DatabaseBackend(url)
@@ -0,0 +1,183 @@
+"""
+    Util file; Contains the token revocation & account state checks of protected routes.
+
+    Consulted by the JWT blocklist callback (see create_app) on every jwt_required route, so it
+    answers from memory:
+        - Account state: (is_active, is_suspended) per account, cached for ACCOUNT_STATE_TTL seconds.
+          Suspend, deactivate & delete controllers invalidate it at once in their process; other
+          processes see the change within the TTL.
+        - Revoked tokens: the jti set of the revoked_tokens table, synced incrementally (new rows by id)
+          every REVOCATION_SYNC_SECONDS.
+
+    A token is rejected if its jti was revoked, its account no longer exists, the user is suspended
+    or the admin is inactive. Deactivated users keep access (they can re-activate their account).
+
+    External Libraries:
+        - flask: A micro web framework for Python.
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+        - threading: A module in Python for working with threads.
+
+    Function Names:
+        - get_account_state
+        - invalidate_account
+        - revoke_token
+        - is_token_revoked
+        - clear_caches
+"""
+
+# Lib Imports:
+import threading
+import time
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import select, delete
+
+# Module Imports:
+from api.database import db
+from api.models.user import User
+from api.models.admin import Admin
+from api.models.revoked_token import RevokedToken
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+DEFAULT_STATE_TTL = 30
+DEFAULT_SYNC_SECONDS = 5
+ADMIN_ROLES = ['admin', 'super-admin']
+
+_lock = threading.Lock()
+_states = {}            # ('user' | 'admin', id) => ((is_active, is_suspended) or None if missing, expires)
+_revoked = {}           # jti => expiry timestamp
+_sync = {'last_id': 0, 'next': 0.0}
+
+## --- METHODS --- ##
+
+def _kind(role):
+    return 'admin' if role in ADMIN_ROLES else 'user'
+
+def get_account_state(role, id):
+    """
+    Get the (is_active, is_suspended) state of an account, from the cache when fresh.
+
+    Parameters:
+        - role (str): The JWT role ('admin', 'super-admin', 'lawyer', 'client').
+        - id (int): The account id.
+
+    Returns:
+        - tuple or None: (is_active, is_suspended), None if the account does not exist.
+    """
+
+    key = (_kind(role), int(id))
+    now = time.monotonic()
+    with _lock:
+        cached = _states.get(key)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+
+    if key[0] == 'admin':
+        row = db.session.execute(select(Admin.is_active).where(Admin.id == key[1])).first()
+        state = (row.is_active is not False, False) if row else None
+    else:
+        row = db.session.execute(select(User.is_active, User.is_suspended).where(User.id == key[1])).first()
+        state = (row.is_active, row.is_suspended) if row else None
+
+    with _lock:
+        _states[key] = (state, now + current_app.config.get('ACCOUNT_STATE_TTL', DEFAULT_STATE_TTL))
+    return state
+
+def invalidate_account(role, id):
+    """
+    Drop the cached state of an account (call after its activation, suspension or deletion is committed).
+
+    Parameters:
+        - role (str): The account role, or 'user' / 'admin'.
+        - id (int): The account id.
+    """
+
+    with _lock:
+        _states.pop((_kind(role), int(id)), None)
+
+def _sync_revoked():
+    """
+    Load the tokens revoked since the last sync (by any process) & drop the expired ones.
+    """
+
+    now = time.time()
+    with _lock:
+        if _sync['next'] > now:
+            return
+        _sync['next'] = now + current_app.config.get('REVOCATION_SYNC_SECONDS', DEFAULT_SYNC_SECONDS)
+        last_id = _sync['last_id']
+
+    rows = db.session.execute(
+        select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+        .where(RevokedToken.id > last_id, RevokedToken.expires_at > datetime.now(timezone.utc))
+        .order_by(RevokedToken.id)
+    ).all()
+
+    with _lock:
+        for row in rows:
+            _revoked[row.jti] = row.expires_at.timestamp()
+        if rows:
+            _sync['last_id'] = max(_sync['last_id'], rows[-1].id)
+        for jti in [jti for jti, expires in _revoked.items() if expires <= now]:
+            del _revoked[jti]
+
+def revoke_token(jti, expires):
+    """
+    Revoke a token until it expires (e.g. on logout).
+
+    Parameters:
+        - jti (str): The token id (JWT 'jti' claim).
+        - expires (int): The token expiry timestamp (JWT 'exp' claim).
+    """
+
+    expires_at = datetime.fromtimestamp(expires, timezone.utc)
+    if not RevokedToken.query.filter_by(jti=jti).first():
+        db.session.add(RevokedToken(jti=jti, expires_at=expires_at))
+    # Expired tokens are rejected anyway:
+    db.session.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc)))
+    db.session.commit()
+
+    with _lock:
+        _revoked[jti] = expires
+
+def is_token_revoked(jwt_payload):
+    """
+    Check a decoded JWT against the revoked tokens & its account state.
+
+    Parameters:
+        - jwt_payload (dict): The decoded token, identity {'id', 'role'} in 'sub'.
+
+    Returns:
+        - bool: True if the token must be rejected.
+    """
+
+    _sync_revoked()
+    with _lock:
+        if jwt_payload.get('jti') in _revoked:
+            return True
+
+    identity = jwt_payload.get('sub')
+    if not isinstance(identity, dict) or 'id' not in identity:
+        return False
+
+    state = get_account_state(identity.get('role'), identity['id'])
+    if state is None:
+        return True
+
+    is_active, is_suspended = state
+    if _kind(identity.get('role')) == 'admin':
+        return not is_active
+    return bool(is_suspended)
+
+def clear_caches():
+    """
+    Forget every cached state & revoked token of this process (next check reloads them).
+    """
+
+    with _lock:
+        _states.clear()
+        _revoked.clear()
+        _sync.update(last_id=0, next=0.0)
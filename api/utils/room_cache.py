@@ -0,0 +1,136 @@
+"""
+    Util file; Contains the in-process cache of chat room memberships (Socket.IO events).
+
+    Every join & send_message event checks the membership of the sender; the cache answers it from
+    memory: room name => (room id, set of member user ids), loaded in one query on the first event
+    of a room (join warms it) and kept for ROOM_CACHE_TTL seconds (ROOM_CACHE_MAX_ENTRIES rooms, LRU).
+    Missing rooms are only remembered for ROOM_CACHE_MISS_TTL seconds, so a new room is usable at once
+    from every process.
+
+    The room controllers invalidate a room at once in their process when it is created, its members
+    change or it is deleted; other processes see the change within the TTL. A load that was running
+    during an invalidation is returned but not cached (it may predate the change).
+
+    External Libraries:
+        - flask: A micro web framework for Python.
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+        - threading: A module in Python for working with threads.
+
+    Function Names:
+        - get_room
+        - is_member
+        - invalidate_room
+        - clear_room_cache
+"""
+
+# Lib Imports:
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import select
+
+# Module Imports:
+from api.database import db
+from api.models.chat import ChatRoom, ChatRoomMember
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+DEFAULT_TTL = 60
+DEFAULT_MISS_TTL = 1
+DEFAULT_MAX_ENTRIES = 10000
+
+_lock = threading.Lock()
+_rooms = OrderedDict()      # room name => ((room id, frozenset of user ids) or None if missing, expires)
+_names = {}                 # room id => room name
+_version = 0                # Invalidations so far, a load only caches its result if none happened meanwhile
+
+## --- METHODS --- ##
+
+def _load(name):
+    rows = db.session.execute(
+        select(ChatRoom.id, ChatRoomMember.user_id)
+        .outerjoin(ChatRoomMember, ChatRoomMember.room_id == ChatRoom.id)
+        .where(ChatRoom.name == name)
+    ).all()
+    if not rows:
+        return None
+    return rows[0].id, frozenset(row.user_id for row in rows if row.user_id is not None)
+
+def get_room(name):
+    """
+    Get the id & members of a room, from the cache when fresh.
+
+    Parameters:
+        - name (str): The room name.
+
+    Returns:
+        - tuple or None: (room id, frozenset of member user ids), None if the room does not exist.
+    """
+
+    now = time.monotonic()
+    with _lock:
+        cached = _rooms.get(name)
+        if cached is not None and cached[1] > now:
+            _rooms.move_to_end(name)
+            return cached[0]
+        version = _version
+
+    room = _load(name)
+
+    if room is None:
+        ttl = current_app.config.get('ROOM_CACHE_MISS_TTL', DEFAULT_MISS_TTL)
+    else:
+        ttl = current_app.config.get('ROOM_CACHE_TTL', DEFAULT_TTL)
+
+    with _lock:
+        if version != _version:
+            return room
+        _rooms[name] = (room, now + ttl)
+        _rooms.move_to_end(name)
+        if room is not None:
+            _names[room[0]] = name
+        while len(_rooms) > current_app.config.get('ROOM_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES):
+            evicted, (evicted_room, _) = _rooms.popitem(last=False)
+            if evicted_room is not None:
+                _names.pop(evicted_room[0], None)
+    return room
+
+def is_member(name, user_id):
+    """
+    Check if a user is a member of a room (by name).
+    """
+
+    room = get_room(name)
+    return room is not None and user_id in room[1]
+
+def invalidate_room(name=None, room_id=None):
+    """
+    Drop a room from the cache, by name and/or id (call after its creation, member changes or deletion).
+    """
+
+    global _version
+
+    with _lock:
+        _version += 1
+        if name is None and room_id is not None:
+            name = _names.get(room_id)
+        if name is None:
+            return
+        cached = _rooms.pop(name, None)
+        if cached is not None and cached[0] is not None:
+            _names.pop(cached[0][0], None)
+
+def clear_room_cache():
+    """
+    Forget every cached room of this process.
+    """
+
+    global _version
+
+    with _lock:
+        _version += 1
+        _rooms.clear()
+        _names.clear()
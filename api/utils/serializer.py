@@ -0,0 +1,123 @@
+"""
+    Util file; Contains a registry of precompiled serialization plans for SQLAlchemy models.
+
+    A plan is the list of (column key, converter) pairs of a mapper. It is built once per
+    mapped class (so Lawyer & Client get their own plan including their joined columns)
+    and reused for every instance, instead of reflecting the mapper on each call.
+
+    External Libraries:
+        - sqlalchemy: A SQL toolkit and Object-Relational Mapping (ORM) for Python.
+        - datetime: A module in Python that supplies classes for manipulating dates and times.
+
+    Function Names:
+        - format_datetime
+        - format_date
+        - get_plan
+        - serialize
+        - clear_plans
+"""
+
+# Lib Imports:
+from datetime import timezone
+from sqlalchemy import inspect, DateTime, Date
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+# Never serialized, whatever the model:
+EXCLUDED_FIELDS = {'password'}
+
+# Mapped class => tuple of (key, converter or None):
+_plans = {}
+
+# HTTP date format (RFC 822) => the format flask.jsonify gives dates, kept for API compatibility:
+_DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+## --- METHODS --- ##
+
+def format_datetime(value):
+    """
+    Format a datetime like werkzeug.http.http_date (naive values are taken as UTC), without its overhead.
+    """
+
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return f'{_DAYS[value.weekday()]}, {value.day:02d} {_MONTHS[value.month - 1]} {value.year:04d} {value.hour:02d}:{value.minute:02d}:{value.second:02d} GMT'
+
+def format_date(value):
+    """
+    Format a date like werkzeug.http.http_date (midnight UTC), without its overhead.
+    """
+
+    return f'{_DAYS[value.weekday()]}, {value.day:02d} {_MONTHS[value.month - 1]} {value.year:04d} 00:00:00 GMT'
+
+def _converter_for(column):
+    """
+    Pick the converter of a column, matching what flask.jsonify would output for its values.
+
+    Parameters:
+        - column (Column): The mapped column.
+
+    Returns:
+        - callable or None: The converter, None if the value is JSON ready.
+    """
+
+    if isinstance(column.type, DateTime):
+        return format_datetime
+    if isinstance(column.type, Date):
+        return format_date
+    return None
+
+def get_plan(cls):
+    """
+    Get (building it on first use) the serialization plan of a mapped class.
+
+    Parameters:
+        - cls (type): The mapped class, e.g. Lawyer.
+
+    Returns:
+        - tuple: (key, converter) pairs; deferred and excluded columns are left out.
+    """
+
+    plan = _plans.get(cls)
+    if plan is None:
+        plan = tuple(
+            (attr.key, _converter_for(attr.columns[0]))
+            for attr in inspect(cls).column_attrs
+            if not attr.deferred and attr.key not in EXCLUDED_FIELDS
+        )
+        _plans[cls] = plan
+    return plan
+
+def serialize(instance, fields=None):
+    """
+    Convert a SQLAlchemy model instance to a JSON ready dictionary using its class plan.
+
+    Parameters:
+        - instance: The SQLAlchemy model instance.
+        - fields (list, optional): Only serialize these keys (sparse fieldset). Defaults to all.
+
+    Returns:
+        - dict: The serialized instance.
+    """
+
+    data = {}
+    # Loaded values live in the instance __dict__, read them without the attribute descriptor:
+    loaded = instance.__dict__
+    for key, converter in get_plan(type(instance)):
+        if fields is not None and key not in fields:
+            continue
+        value = loaded[key] if key in loaded else getattr(instance, key)
+        if converter is not None and value is not None:
+            value = converter(value)
+        data[key] = value
+    return data
+
+def clear_plans():
+    """
+    Drop every cached plan (e.g. after mappers are reconfigured in tests).
+    """
+
+    _plans.clear()
@@ -14,12 +14,15 @@ class Status:
     
     HTTP_200_OK = 200
     HTTP_201_CREATED = 201
+    HTTP_202_ACCEPTED = 202
     HTTP_204_NO_CONTENT = 204
     HTTP_400_BAD_REQUEST = 400
     HTTP_401_UNAUTHORIZED = 401
     HTTP_403_FORBIDDEN = 403
     HTTP_404_NOT_FOUND = 404
     HTTP_409_CONFLICT = 409                 # Conflict - For Duplicate Content
+    HTTP_413_PAYLOAD_TOO_LARGE = 413
     HTTP_422_UNPROCESSABLE_ENTITY = 422     # For Missing keys/fields
     HTTP_429_TOO_MANY_REQUESTS = 429
     HTTP_500_INTERNAL_SERVER_ERROR = 500
+    HTTP_503_SERVICE_UNAVAILABLE = 503      # Overloaded - Retry Later
@@ -0,0 +1,178 @@
+"""
+    Benchmark file; memory per idle Socket.IO websocket connection & REST latency under them, for the
+    threaded gunicorn worker against the gevent worker (deploy/gevent/gunicorn.conf.py).
+
+    A single gunicorn worker serves a minimal app with the api Socket.IO extension (async mode detected
+    like in production) & a /ping route. The client opens N websocket connections (greenlets in this
+    process, Engine.IO pings answered), then measures the worker's resident memory (/proc, Linux) &
+    the latency of REST requests sent while the connections stay open.
+
+    Run (no database needed):
+        python -m benchmarks.bench_connections --modes threading gevent --connections 100 1000 --threads 100
+"""
+
+# Lib Imports:
+import os
+import sys
+import time
+import socket
+import argparse
+import subprocess
+import urllib.request
+from flask import Flask
+
+# Module Imports:
+from api.extentions.socketio import socketio, init_app
+
+# ----------------------------------------------- #
+
+## --- CONTS --- ##
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = 'benchmarks.bench_connections:create_bench_app()'
+CONNECT_TIMEOUT = 30            # Seconds to wait for every connection
+PINGS = 20                      # REST requests timed per run
+
+## --- METHODS --- ##
+
+def create_bench_app():
+    """
+    The app served by the benchmarked worker (imported by gunicorn, after its gevent patches).
+    """
+
+    app = Flask(__name__)
+    init_app(app)
+
+    @app.route('/ping')
+    def ping():
+        return socketio.async_mode
+
+    return app
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_server(mode, port, threads):
+    if mode == 'gevent':
+        command = ['gunicorn', '-c', 'deploy/gevent/gunicorn.conf.py', APP]
+    else:
+        command = ['gunicorn', '-k', 'gthread', '--threads', str(threads), APP]
+    env = dict(os.environ, GUNICORN_WORKERS='1', GUNICORN_BIND=f'127.0.0.1:{port}')
+    command += ['-w', '1', '-b', f'127.0.0.1:{port}', '--log-level', 'warning']
+    server = subprocess.Popen(command, cwd=ROOT, env=env)
+
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/ping', timeout=5) as response:
+                assert response.read().decode() == mode, f'The worker runs in {mode} mode'
+            return server
+        except OSError:
+            if time.monotonic() > deadline:
+                server.kill()
+                raise RuntimeError(f'gunicorn ({mode}) did not start')
+            time.sleep(0.2)
+
+def worker_stats(server):
+    # The only worker of the gunicorn master:
+    with open(f'/proc/{server.pid}/task/{server.pid}/children') as file:
+        worker = int(file.read().split()[0])
+    stats = {}
+    with open(f'/proc/{worker}/status') as file:
+        for line in file:
+            key, value = line.split(':', 1)
+            if key in ('VmRSS', 'Threads'):
+                stats[key] = int(value.split()[0])
+    return stats
+
+def open_connection(port, connected):
+    """
+    One idle Socket.IO client: handshake, namespace connect, then answer pings until killed.
+    """
+
+    from gevent import socket as gsocket
+    from wsproto import WSConnection, ConnectionType
+    from wsproto.events import Request, Message, TextMessage, Ping
+
+    sock = gsocket.create_connection(('127.0.0.1', port))
+    ws = WSConnection(ConnectionType.CLIENT)
+    sock.sendall(ws.send(Request(host=f'127.0.0.1:{port}', target='/socket.io/?EIO=4&transport=websocket')))
+    try:
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                return
+            ws.receive_data(data)
+            for event in ws.events():
+                if isinstance(event, Ping):
+                    sock.sendall(ws.send(event.response()))
+                elif isinstance(event, TextMessage):
+                    if event.data.startswith('0'):             # Engine.IO open => Socket.IO connect
+                        sock.sendall(ws.send(Message(data='40')))
+                    elif event.data.startswith('40'):
+                        connected.append(port)
+                    elif event.data == '2':                     # Engine.IO ping
+                        sock.sendall(ws.send(Message(data='3')))
+    finally:
+        sock.close()
+
+def time_pings(port):
+    latencies, failures = [], 0
+    for _ in range(PINGS):
+        start = time.perf_counter()
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/ping', timeout=5).read()
+            latencies.append((time.perf_counter() - start) * 1000)
+        except OSError:
+            failures += 1
+    latencies.sort()
+    return latencies, failures
+
+def run(mode, connections, threads):
+    import gevent
+
+    port = free_port()
+    server = start_server(mode, port, threads)
+    try:
+        baseline = worker_stats(server)
+        connected = []
+        clients = [gevent.spawn(open_connection, port, connected) for _ in range(connections)]
+
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while len(connected) < connections and time.monotonic() < deadline:
+            gevent.sleep(0.2)
+        gevent.sleep(1)
+        loaded = worker_stats(server)
+
+        # REST requests in a thread of the hub => the idle clients keep answering meanwhile:
+        latencies, failures = gevent.get_hub().threadpool.apply(time_pings, (port,))
+        gevent.killall(clients, block=True, timeout=10)
+    finally:
+        server.terminate()
+        server.wait()
+
+    per_connection = (loaded['VmRSS'] - baseline['VmRSS']) / len(connected) if connected else 0
+    median = f"{latencies[len(latencies) // 2]:7.1f} ms" if latencies else '      - '
+    print(
+        f"{mode:<9} {len(connected):5d}/{connections:<5d} connected   RSS {baseline['VmRSS'] / 1024:6.1f} -> {loaded['VmRSS'] / 1024:6.1f} MB"
+        f"   {per_connection:6.1f} KB/connection   {loaded['Threads']:5d} threads   /ping median {median}, {failures} failed"
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modes', nargs='+', default=['threading', 'gevent'], choices=['threading', 'gevent'])
+    parser.add_argument('--connections', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--threads', type=int, default=100, help='Threads of the threaded worker')
+    args = parser.parse_args()
+
+    if not sys.platform.startswith('linux'):
+        sys.exit('Memory is read from /proc: Linux only')
+
+    for connections in args.connections:
+        for mode in args.modes:
+            run(mode, connections, args.threads)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+    Benchmark file; logins per second (bcrypt verifications) of api.utils.hasher at several
+    cost settings, inline against the process pool, under concurrent requests.
+
+    Each client thread stands for a request thread calling verify_password; requests refused
+    with HasherBusy (503) are counted, not retried.
+
+    Run (no database needed):
+        python -m benchmarks.bench_hasher --rounds 10 11 12 --pool 4 --clients 16 --logins 64
+"""
+
+# Lib Imports:
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask
+
+# Module Imports:
+from api.utils.hasher import hash_password, verify_password, shutdown_pool, HasherBusy
+
+# ----------------------------------------------- #
+
+def run(rounds, pool_size, clients, logins, max_pending):
+    app = Flask(__name__)
+    app.config.update(BCRYPT_ROUNDS=rounds, HASHER_POOL_SIZE=pool_size, HASHER_MAX_PENDING=max_pending)
+
+    def login(_):
+        with app.app_context():
+            try:
+                return verify_password('correct horse', hashed)
+            except HasherBusy:
+                return None
+
+    with app.app_context():
+        hashed = hash_password('correct horse')     # Also starts the pool processes
+
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        start = time.perf_counter()
+        results = list(executor.map(login, range(logins)))
+        elapsed = time.perf_counter() - start
+    shutdown_pool()
+
+    served = sum(result is not None for result in results)
+    mode = f'pool={pool_size}' if pool_size else 'inline'
+    print(f'cost={rounds:<3} {mode:<8} {served / elapsed:8.1f} logins/s   {logins - served:4d} refused (503)')
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 11, 12])
+    parser.add_argument('--pool', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--logins', type=int, default=64)
+    parser.add_argument('--max-pending', type=int, default=16)
+    args = parser.parse_args()
+
+    for rounds in args.rounds:
+        for pool_size in (0, args.pool):
+            run(rounds, pool_size, args.clients, args.logins, args.max_pending)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+    Benchmark file; per-row cost of serializing models with the precompiled plans of
+    api.utils.serializer against the previous inspect() based helper.
+
+    Run (no database needed, instances are transient):
+        python -m benchmarks.bench_serializer --rows 5000
+"""
+
+# Lib Imports:
+import argparse
+import timeit
+from datetime import datetime, date
+from flask import Flask
+from sqlalchemy import inspect
+
+# Module Imports:
+from api.models.user import Lawyer, Client
+from api.models.contract import Contract
+from api.utils.serializer import serialize
+
+# ----------------------------------------------- #
+
+def inspect_to_dict(instance):
+    """ The previous api.utils.helper.to_dict (dates left to flask.jsonify) """
+    return {c.key: getattr(instance, c.key) for c in inspect(instance).mapper.column_attrs}
+
+def make_rows(count):
+    rows = []
+    for i in range(count):
+        common = dict(id=i, email=f'user{i}@example.com', username=f'user{i}', password='x' * 60,
+                      first_name='First', last_name='Last', created=datetime.now(), updated=datetime.now(),
+                      dob=date(1990, 1, 1), city='Lahore', average_rating=4.5)
+        if i % 2:
+            rows.append(Lawyer(about='Family law', experience_years=5, **common))
+        else:
+            rows.append(Client(occupation='Engineer', **common))
+    rows.extend(Contract(id=i, title='Contract', price=100, created=datetime.now()) for i in range(count // 2))
+
+    # Rows loaded from the database have every column set, do the same here:
+    for row in rows:
+        for attr in inspect(row).mapper.column_attrs:
+            if attr.key not in row.__dict__:
+                setattr(row, attr.key, None)
+    return rows
+
+def bench(name, func, rows, repeat):
+    best = min(timeit.repeat(lambda: func(rows), number=1, repeat=repeat))
+    print(f'{name:<36} {best * 1e6 / len(rows):8.2f} us/row')
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    # jsonify() encodes with the app JSON provider, which is where the old helper's dates got converted:
+    dumps = Flask(__name__).json.dumps
+
+    print(f'{len(rows)} rows (Lawyer, Client, Contract), best of {args.repeat}')
+    bench('inspect() helper, dict only', lambda rows: [inspect_to_dict(row) for row in rows], rows, args.repeat)
+    bench('precompiled plan, dict only', lambda rows: [serialize(row) for row in rows], rows, args.repeat)
+    old = bench('inspect() helper + JSON encoding', lambda rows: dumps([inspect_to_dict(row) for row in rows]), rows, args.repeat)
+    new = bench('precompiled plan + JSON encoding', lambda rows: dumps([serialize(row) for row in rows]), rows, args.repeat)
+    print(f'end to end speed-up: {old / new:.2f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+"""
+    Gunicorn profile; gevent workers for REST & Socket.IO (see api/extentions/async_mode.py).
+
+    Each worker serves up to GUNICORN_WORKER_CONNECTIONS concurrent connections as greenlets: idle
+    websockets & long-polling requests no longer hold threads. Several workers share their emits
+    through SOCKETIO_MESSAGE_QUEUE, Postgres LISTEN/NOTIFY on the app database unless set (local://
+    drops emits to busy workers, it is meant for development); keep polling clients sticky (deploy/sticky).
+
+    Run:
+        gunicorn -c deploy/gevent/gunicorn.conf.py api.app:app
+"""
+
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = 'gevent'
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+# The app config (after .env is loaded) picks the default message queue from the worker count:
+os.environ.setdefault('GUNICORN_WORKERS', str(workers))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 10000))
+timeout = 60
+keepalive = 5
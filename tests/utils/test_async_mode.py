@@ -0,0 +1,31 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from api.extentions.async_mode import get_async_mode, is_gevent_patched
+
+class TestAsyncMode(unittest.TestCase):
+
+    def test_01_mode_follows_the_worker(self):
+        """
+            - Check a process not patched by gevent runs Socket.IO on threads, even with gevent installed.
+            - Check forcing 'gevent' outside a gevent worker is refused, other modes are kept.
+        """
+
+        app = Flask(__name__)
+        self.assertFalse(is_gevent_patched())
+        self.assertEqual(get_async_mode(app), 'threading')
+
+        app.config['SOCKETIO_ASYNC_MODE'] = 'gevent'
+        with self.assertRaises(RuntimeError):
+            get_async_mode(app)
+
+        app.config['SOCKETIO_ASYNC_MODE'] = 'threading'
+        self.assertEqual(get_async_mode(app), 'threading')
+
+if __name__ == '__main__':
+    unittest.main()
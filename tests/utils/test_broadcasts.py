@@ -0,0 +1,88 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from api.database import db
+from api.models.user import User
+from api.models.outbox import OutboxEmail, PRIORITY_BULK
+from api.models.broadcast import Broadcast, BROADCAST_DONE
+from api.extentions.mail_outbox import outbox
+from api.extentions.broadcasts import broadcasts
+from api.routes.admin.controllers import create_broadcast
+
+class TestBroadcasts(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(
+            SQLALCHEMY_DATABASE_URI='sqlite://', MAIL_USERNAME='info@x.com',
+            MAIL_OUTBOX_IN_PROCESS=False, BROADCAST_QUEUE_IN_PROCESS=False,
+        )
+        db.init_app(self.app)
+        outbox.init_app(self.app)
+        broadcasts.init_app(self.app)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.metadata.create_all(db.engine, tables=[User.__table__, OutboxEmail.__table__, Broadcast.__table__])
+        # Lawyers & clients rows of the base table only => inserted without their polymorphic classes:
+        db.session.execute(User.__table__.insert(), [
+            {'id': id, 'email': f'u{id}@x.com', 'username': f'u{id}', 'password': 'x', 'first_name': 'U', 'last_name': 'U', 'role': role, 'city': city, 'is_suspended': id == 5}
+            for id, role, city in [(1, 'lawyer', 'Lahore'), (2, 'client', 'Lahore'), (3, 'lawyer', 'Karachi'), (4, 'lawyer', 'lahore'), (5, 'lawyer', 'Lahore')]
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def test_01_fan_out_in_chunks(self):
+        """
+            - Check recipients are filtered by role, status & city (case insensitive) & counted on creation.
+            - Check one bulk email is queued per recipient, chunk by chunk, & each recipient room is notified.
+            - Check the progress reports the processed recipients & queued emails.
+        """
+
+        with mock.patch('api.extentions.broadcasts.socketio') as socketio:
+            broadcast = create_broadcast(1, 'Outage', 'Down at 2am', role='lawyer', account_status='active', city='LAHORE')
+            self.assertEqual(broadcast.total, 2)
+
+            while broadcasts.process_due(batch_size=1):
+                pass
+
+        rooms = [call.kwargs['to'] for call in socketio.emit.call_args_list]
+        self.assertEqual(rooms, ['user:1', 'user:4'])
+
+        emails = OutboxEmail.query.order_by(OutboxEmail.id).all()
+        self.assertEqual([email.recipients for email in emails], ['u1@x.com', 'u4@x.com'])
+        self.assertEqual({(email.priority, email.broadcast_id, email.sender) for email in emails}, {(PRIORITY_BULK, broadcast.id, 'info@x.com')})
+
+        progress = broadcasts.get_progress(db.session.get(Broadcast, broadcast.id))
+        self.assertEqual((progress['status'], progress['processed'], progress['emails']['pending']), (BROADCAST_DONE, 2, 2))
+
+    def test_02_role_room(self):
+        """
+            - Check a role-only broadcast is emitted once to the role room & sends no email without the channel.
+            - Check unknown targets are rejected.
+        """
+
+        with mock.patch('api.extentions.broadcasts.socketio') as socketio:
+            create_broadcast(1, 'Policy', 'New terms', role='client', channels=['socket'])
+            while broadcasts.process_due(batch_size=1):
+                pass
+
+        socketio.emit.assert_called_once()
+        self.assertEqual(socketio.emit.call_args.kwargs['to'], 'role:client')
+        self.assertEqual(OutboxEmail.query.count(), 0)
+
+        with self.assertRaises(ValueError):
+            create_broadcast(1, 'S', 'B', role='admin')
+        with self.assertRaises(ValueError):
+            create_broadcast(1, 'S', 'B', channels=['sms'])
+
+if __name__ == '__main__':
+    unittest.main()
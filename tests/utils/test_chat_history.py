@@ -0,0 +1,51 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from api.database import db
+from api.models.chat import Message
+from api.routes.chats.message_controllers import get_room_messages_by_id
+
+class TestChatHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://')
+        db.init_app(self.app)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.metadata.create_all(db.engine, tables=[Message.__table__])
+        db.session.add_all([Message(id=id, chat_room_id=1 if id <= 10 else 2, content=f'm{id}') for id in range(1, 13)])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def ids(self, **kwargs):
+        messages, has_more = get_room_messages_by_id(1, **kwargs)
+        return [message.id for message in messages], has_more
+
+    def test_01_pages_newest_first(self):
+        """
+            - Check pages go back in time with before_id & has_more turns False on the oldest page.
+            - Check after_id returns the messages right after it (newest first), never skipping one.
+        """
+
+        self.assertEqual(self.ids(limit=4), ([10, 9, 8, 7], True))
+        self.assertEqual(self.ids(before_id=7, limit=4), ([6, 5, 4, 3], True))
+        self.assertEqual(self.ids(before_id=3, limit=4), ([2, 1], False))
+
+        self.assertEqual(self.ids(after_id=2, limit=3), ([5, 4, 3], True))
+        self.assertEqual(self.ids(after_id=8, limit=3), ([10, 9], False))
+        self.assertEqual(self.ids(after_id=2, before_id=6), ([5, 4, 3], False))
+
+        with self.assertRaises(ValueError):
+            self.ids(before_id='abc')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import io
+import os
+import csv
+import sys
+import json
+import unittest
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from api.database import db
+from api.models.transaction import Transaction
+from api.routes.admin.controllers import get_export_statement
+from api.utils.exporter import export_rows, parse_date_range
+
+class TestExporter(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://')
+        db.init_app(self.app)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.metadata.create_all(db.engine, tables=[Transaction.__table__])
+        db.session.add_all([
+            Transaction(id=id, description=f'T{id}', amount=id * 100, transaction_mode='credit', created=datetime(2024, 1, id), updated=datetime(2024, 2, id))
+            for id in range(1, 6)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def test_01_csv_in_batches(self):
+        """
+            - Check the CSV has a header & every row, written one chunk per batch.
+        """
+
+        chunks = list(export_rows(get_export_statement('transactions'), 'csv', batch_size=2))
+        self.assertEqual(len(chunks), 3)
+
+        rows = list(csv.DictReader(io.StringIO(''.join(chunks))))
+        self.assertEqual([row['id'] for row in rows], ['1', '2', '3', '4', '5'])
+        self.assertEqual(rows[0]['created'], '2024-01-01T00:00:00')
+
+    def test_02_ndjson_date_range(self):
+        """
+            - Check the date range is half-open & NDJSON lines are JSON objects.
+            - Check malformed dates & unknown resources are rejected.
+        """
+
+        date_range = parse_date_range({'created_from': '2024-01-02', 'updated_to': '2024-02-04'})
+        lines = ''.join(export_rows(get_export_statement('transactions', **date_range), 'ndjson')).splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [2, 3])
+
+        with self.assertRaises(ValueError):
+            parse_date_range({'updated_from': 'yesterday'})
+        self.assertIsNone(get_export_statement('admins'))
+
+    def test_03_empty_csv(self):
+        """
+            - Check an empty extract still has its header line.
+        """
+
+        date_range = parse_date_range({'created_from': '2030-01-01'})
+        self.assertEqual(''.join(export_rows(get_export_statement('transactions', **date_range), 'csv')).strip().split(',')[0], 'id')
+
+    def test_04_csv_formula_escaped(self):
+        """
+            - Check CSV text cells starting with =, +, -, @ are prefixed with a quote.
+            - Check numbers & NDJSON values are left as they are.
+        """
+
+        Transaction.query.filter_by(id=1).update({'description': '=HYPERLINK("http://x")', 'amount': -100})
+        Transaction.query.filter_by(id=2).update({'description': '@SUM(A1)'})
+        Transaction.query.filter_by(id=3).update({'description': '-2+3'})
+        db.session.commit()
+
+        rows = list(csv.DictReader(io.StringIO(''.join(export_rows(get_export_statement('transactions'), 'csv')))))
+        self.assertEqual([row['description'] for row in rows], ['\'=HYPERLINK("http://x")', "'@SUM(A1)", "'-2+3", 'T4', 'T5'])
+        self.assertTrue(rows[0]['amount'].startswith('-100'))
+
+        lines = ''.join(export_rows(get_export_statement('transactions'), 'ndjson')).splitlines()
+        self.assertEqual(json.loads(lines[0])['description'], '=HYPERLINK("http://x")')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import select
+
+from api.models.user import Lawyer
+from api.utils.fieldsets import parse_fields, load_fields
+
+class TestFieldsets(unittest.TestCase):
+
+    def test_01_parse_fields(self):
+        """
+            - Check 'id' is always included, blanks & duplicates dropped.
+            - Check no fieldset gives None.
+        """
+
+        self.assertEqual(parse_fields('first_name, city,,city'), ['id', 'first_name', 'city'])
+        self.assertIsNone(parse_fields(None))
+        self.assertIsNone(parse_fields(''))
+
+    def test_02_load_fields_narrows_select(self):
+        """
+            - Check only the requested (and extra) columns are selected.
+            - Check lawyer specific columns are not selected when not requested.
+        """
+
+        statement = str(load_fields(select(Lawyer), Lawyer, ['id', 'first_name'], extra=['average_rating']))
+
+        self.assertIn('users.first_name', statement)
+        self.assertIn('users.average_rating', statement)
+        self.assertNotIn('users.email', statement)
+        self.assertNotIn('lawyers.about', statement)
+
+    def test_03_unknown_or_hidden_fields(self):
+        """
+            - Check unknown, password & deferred fields are rejected.
+        """
+
+        for field in ['nope', 'password', 'search_vector']:
+            with self.assertRaises(ValueError):
+                load_fields(select(Lawyer), Lawyer, ['id', field])
+
+if __name__ == '__main__':
+    unittest.main()
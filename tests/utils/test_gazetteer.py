@@ -0,0 +1,64 @@
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from api.utils.gazetteer import Gazetteer
+from api.utils.geo_locator import get_address, is_remote_backend, haversine
+
+PLACES = [
+    ('Islamabad', 33.72148, 73.04329, 'PK'),
+    ('Rawalpindi', 33.59733, 73.0479, 'PK'),
+    ('Jhelum', 32.93448, 73.73102, 'PK'),
+    ('Suva', -18.14161, 178.44149, 'FJ'),
+    ('Taveuni', -16.85, -179.95, 'FJ'),
+]
+
+def geonames_line(index, name, latitude, longitude, country_code):
+    return '\t'.join([str(index), name, name, '', str(latitude), str(longitude), 'P', 'PPL', country_code, '', '', '', '', '', '0']) + '\n'
+
+class TestGazetteer(unittest.TestCase):
+
+    def test_01_nearest_matches_brute_force(self):
+        """
+            - Check the grid lookup finds the same place as a full scan, across the antimeridian too.
+        """
+
+        gazetteer = Gazetteer(PLACES)
+        for latitude, longitude in [(33.7, 73.05), (33.6, 73.0), (32.8, 73.9), (25.0, 67.0), (-17.0, 179.99), (-18.0, -179.0)]:
+            expected = min(PLACES, key=lambda place: haversine(latitude, longitude, place[1], place[2]))[0]
+            self.assertEqual(gazetteer.names[gazetteer.nearest(latitude, longitude)], expected)
+
+    def test_02_reverse_contract(self):
+        """
+            - Check reverse() returns (country, city, postal_code, full_address) like get_address.
+            - Check an empty gazetteer raises LookupError.
+        """
+
+        self.assertEqual(Gazetteer(PLACES).reverse('32.81591', '73.86236'), ('Pakistan', 'Jhelum', None, 'Jhelum, Pakistan'))
+        with self.assertRaises(LookupError):
+            Gazetteer().reverse(0, 0)
+
+    def test_03_backend_from_zipped_dump(self):
+        """
+            - Load a GeoNames dump from a .zip through GEO_BACKEND = 'gazetteer'.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cities1000.zip')
+            with zipfile.ZipFile(path, 'w') as archive:
+                archive.writestr('cities1000.txt', ''.join(geonames_line(index, *place) for index, place in enumerate(PLACES)))
+
+            app = Flask(__name__)
+            app.config.update(GEO_BACKEND='gazetteer', GEO_GAZETTEER_PATH=path)
+            with app.app_context():
+                self.assertFalse(is_remote_backend())
+                self.assertEqual(get_address(33.6, 73.0)[1], 'Rawalpindi')
+
+if __name__ == '__main__':
+    unittest.main()
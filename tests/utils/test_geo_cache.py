@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from api.utils import geo_cache
+
+class TestGeoCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(GEO_CACHE_PRECISION=3, GEO_CACHE_MAX_ENTRIES=2)
+        self.context = self.app.app_context()
+        self.context.push()
+        geo_cache.clear_local_cache()
+
+    def tearDown(self):
+        geo_cache.clear_local_cache()
+        self.context.pop()
+
+    def test_01_round_key(self):
+        """
+            - Check nearby coordinates share a key, string input is accepted.
+        """
+
+        self.assertEqual(geo_cache._round_key(32.81591, 73.86236), (32816, 73862))
+        self.assertEqual(geo_cache._round_key('32.8162', '73.8624'), (32816, 73862))
+
+    def test_02_local_lru_and_ttl(self):
+        """
+            - Check the least recently used entry is evicted past GEO_CACHE_MAX_ENTRIES.
+            - Check expired entries are not served.
+        """
+
+        now = datetime.now(timezone.utc)
+        later = now + timedelta(days=1)
+        geo_cache._local_put((1, 1), ('PK', 'A', None, 'a'), later)
+        geo_cache._local_put((2, 2), ('PK', 'B', None, 'b'), later)
+        self.assertIsNotNone(geo_cache._local_get((1, 1), now))
+        geo_cache._local_put((3, 3), ('PK', 'C', None, 'c'), later)
+
+        self.assertIsNone(geo_cache._local_get((2, 2), now))
+        self.assertEqual(geo_cache._local_get((1, 1), now)[1], 'A')
+        self.assertIsNone(geo_cache._local_get((3, 3), later))
+        self.assertEqual(geo_cache.get_cache_stats()['local_entries'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
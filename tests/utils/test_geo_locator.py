@@ -0,0 +1,64 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.utils.geo_locator import haversine, bounding_box, longitude_ranges, parse_coordinates
+
+# Lahore & Islamabad city centres:
+LAHORE = (31.5204, 74.3587)
+ISLAMABAD = (33.6844, 73.0479)
+
+class TestGeoLocator(unittest.TestCase):
+
+    def test_01_haversine(self):
+        """
+            - Check the Lahore -> Islamabad distance is about 270 km.
+            - Check the distance of a point to itself is 0.
+        """
+
+        self.assertAlmostEqual(haversine(*LAHORE, *ISLAMABAD), 270.1, delta=1)
+        self.assertEqual(haversine(*LAHORE, *LAHORE), 0)
+
+    def test_02_bounding_box_encloses_radius(self):
+        """
+            - Check the box edges due north & due east are at least the radius away.
+        """
+
+        min_lat, max_lat, min_long, max_long = bounding_box(*LAHORE, 25)
+        self.assertGreaterEqual(haversine(*LAHORE, max_lat, LAHORE[1]), 25)
+        self.assertGreaterEqual(haversine(*LAHORE, LAHORE[0], max_long), 25)
+        self.assertLess(min_lat, LAHORE[0])
+        self.assertLess(min_long, LAHORE[1])
+
+    def test_03_parse_coordinates(self):
+        """
+            - Parse 'lat,long' strings & lists.
+            - Check malformed & out of range coordinates raise ValueError.
+        """
+
+        self.assertEqual(parse_coordinates('31.5,74.3'), (31.5, 74.3))
+        self.assertEqual(parse_coordinates([31.5, 74.3]), (31.5, 74.3))
+        for near in ['lahore', '31.5', '91,74', None]:
+            with self.assertRaises(ValueError):
+                parse_coordinates(near)
+
+    def test_04_longitude_ranges_wrap(self):
+        """
+            - Check a box within [-180, 180] is kept as one range.
+            - Check a box crossing the antimeridian on either side is split in two ranges.
+            - Check a box wider than the globe matches every longitude.
+        """
+
+        self.assertEqual(longitude_ranges(74.0, 75.0), [(74.0, 75.0)])
+        self.assertEqual(longitude_ranges(179.0, 181.0), [(179.0, 180.0), (-180.0, -179.0)])
+        self.assertEqual(longitude_ranges(-181.0, -179.0), [(179.0, 180.0), (-180.0, -179.0)])
+        self.assertEqual(longitude_ranges(-200.0, 200.0), [(-180.0, 180.0)])
+
+        min_lat, max_lat, min_long, max_long = bounding_box(89.9, 0, 25)
+        self.assertEqual(max_lat, 90.0)
+        self.assertEqual(longitude_ranges(min_long, max_long), [(-180.0, 180.0)])
+
+if __name__ == '__main__':
+    unittest.main()
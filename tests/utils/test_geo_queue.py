@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+
+from api.database import db
+from api.models.user import User, GEO_PENDING, GEO_RESOLVED
+from api.extentions import geo_queue
+from api.extentions.geo_queue import GeoQueue, RateLimiter, DatabaseRateLimiter
+
+# The lawyers table on sqlite (User is polymorphic):
+@compiles(TSVECTOR, 'sqlite')
+def compile_tsvector(type_, compiler, **kw):
+    return 'TEXT'
+
+class TestGeoQueue(unittest.TestCase):
+
+    def test_01_rate_limiter_spaces_calls(self):
+        """
+            - Check consecutive calls are at least min_interval apart.
+        """
+
+        calls = []
+        limited = RateLimiter(0.05).wrap(lambda: calls.append(time.monotonic()))
+        for _ in range(3):
+            limited()
+
+        self.assertGreaterEqual(calls[1] - calls[0], 0.045)
+        self.assertGreaterEqual(calls[2] - calls[1], 0.045)
+
+    def test_02_backoff_grows_and_is_capped(self):
+        """
+            - Check the retry delay doubles per attempt (within jitter) up to GEO_QUEUE_MAX_BACKOFF.
+            - Check enqueue does not start a worker when GEO_QUEUE_IN_PROCESS is off.
+        """
+
+        app = Flask(__name__)
+        app.config.update(GEO_QUEUE_BACKOFF=10, GEO_QUEUE_MAX_BACKOFF=100, GEO_QUEUE_IN_PROCESS=False)
+        queue = GeoQueue(app)
+
+        self.assertTrue(8 <= queue.backoff(1).total_seconds() <= 12)
+        self.assertTrue(32 <= queue.backoff(3).total_seconds() <= 48)
+        self.assertTrue(80 <= queue.backoff(10).total_seconds() <= 120)
+
+        queue.enqueue(1)
+        self.assertIsNone(queue._thread)
+
+    def test_03_shared_limiter_spaces_calls_of_every_process(self):
+        """
+            - Check calls through two database limiters (as in two worker processes) are still min_interval apart.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            app = Flask(__name__)
+            app.config.update(SQLALCHEMY_DATABASE_URI=f'sqlite:///{directory}/limits.db')
+            db.init_app(app)
+
+            calls = []
+            def worker(limiter):
+                limited = limiter.wrap(lambda: calls.append(time.time()))
+                with app.app_context():
+                    for _ in range(3):
+                        limited()
+
+            threads = [threading.Thread(target=worker, args=(DatabaseRateLimiter(0.1, name='geo-provider'),)) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            with app.app_context():
+                db.engine.dispose()
+
+        calls.sort()
+        self.assertEqual(len(calls), 6)
+        self.assertGreaterEqual(min(b - a for a, b in zip(calls, calls[1:])), 0.09)
+
+    def test_04_moved_user_left_pending(self):
+        """
+            - Check an address is only written if the coordinates did not change during the lookup.
+            - Check a user who moved meanwhile stays pending (for the new location).
+        """
+
+        app = Flask(__name__)
+        app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', GEO_QUEUE_IN_PROCESS=False, GEO_QUEUE_SHARED_LIMIT=False)
+        db.init_app(app)
+        queue = GeoQueue(app)
+        with app.app_context():
+            db.metadata.create_all(db.engine, tables=[User.__table__])
+            db.session.execute(User.__table__.insert(), [
+                {'id': id, 'email': f'u{id}@x.com', 'username': f'u{id}', 'password': 'x', 'first_name': 'U', 'last_name': str(id), 'role': 'client',
+                 'latitude': 31.52, 'longitude': 74.35, 'geo_status': GEO_PENDING, 'geo_attempts': 0, 'geo_retry_at': datetime.now()}
+                for id in [1, 2]
+            ])
+            db.session.commit()
+
+            def lookup_while_moving(latitude, longitude, fetch=None):
+                # update_user of user 2 commits a new location during the lookup:
+                db.session.execute(update(User).where(User.id == 2).values(latitude=24.86, longitude=67.0, geo_status=GEO_PENDING))
+                db.session.commit()
+                return 'Pakistan', 'Lahore', 54000, 'Lahore, Pakistan'
+
+            with mock.patch.object(geo_queue, 'get_cached_address', return_value=('Pakistan', 'Lahore', 54000, 'Lahore, Pakistan')):
+                self.assertTrue(queue.resolve(1))
+            with mock.patch.object(geo_queue, 'get_cached_address', side_effect=lookup_while_moving):
+                self.assertFalse(queue.resolve(2))
+
+            rows = {row.id: row for row in db.session.execute(User.__table__.select())}
+            self.assertEqual((rows[1].city, rows[1].geo_status), ('Lahore', GEO_RESOLVED))
+            self.assertEqual((rows[2].city, rows[2].latitude, rows[2].geo_status), (None, 24.86, GEO_PENDING))
+            db.session.remove()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import sys
+import json
+import unittest
+import subprocess
+import importlib.util
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from api.utils.hasher import hash_password, verify_password, shutdown_pool, HasherBusy
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# A gevent worker: hashes on the pool next to a greenlet ticking every 50 ms.
+GEVENT_SCRIPT = '''
+from gevent import monkey; monkey.patch_all()
+import json, time, gevent
+from flask import Flask
+from api.utils.hasher import hash_password, shutdown_pool
+
+app = Flask(__name__)
+app.config.update(BCRYPT_ROUNDS=12, HASHER_POOL_SIZE=2, HASHER_MAX_PENDING=16)
+with app.app_context():
+    hash_password('warm')
+
+ticks = []
+def ticker():
+    while True:
+        ticks.append(time.monotonic())
+        gevent.sleep(0.05)
+
+def login():
+    with app.app_context():
+        return hash_password('secret')
+
+clock = gevent.spawn(ticker)
+gevent.sleep(0)
+started = time.monotonic()
+gevent.joinall([gevent.spawn(login) for _ in range(4)], raise_error=True)
+elapsed = time.monotonic() - started
+clock.kill()
+shutdown_pool()
+print(json.dumps({'elapsed': elapsed, 'ticks': len(ticks), 'max_gap': max(b - a for a, b in zip(ticks, ticks[1:]))}))
+'''
+
+class TestHasher(unittest.TestCase):
+
+    def tearDown(self):
+        shutdown_pool()
+
+    def test_01_inline_cost(self):
+        """
+            - Check new hashes use BCRYPT_ROUNDS and still verify.
+        """
+
+        app = Flask(__name__)
+        app.config.update(BCRYPT_ROUNDS=4, HASHER_POOL_SIZE=0)
+        with app.app_context():
+            hashed = hash_password('secret')
+            self.assertTrue(hashed.startswith('$2b$04$'))
+            self.assertTrue(verify_password('secret', hashed))
+            self.assertFalse(verify_password('wrong', hashed))
+
+    def test_02_pool_and_queue_limit(self):
+        """
+            - Check hashing through the process pool.
+            - Check a full queue raises HasherBusy instead of waiting.
+        """
+
+        app = Flask(__name__)
+        app.config.update(BCRYPT_ROUNDS=4, HASHER_POOL_SIZE=1, HASHER_MAX_PENDING=1)
+        with app.app_context():
+            self.assertTrue(verify_password('secret', hash_password('secret')))
+
+            from api.utils import hasher
+            hasher._slots.acquire()
+            try:
+                with self.assertRaises(HasherBusy):
+                    hash_password('secret')
+            finally:
+                hasher._slots.release()
+
+    @unittest.skipUnless(importlib.util.find_spec('gevent'), 'gevent is not installed')
+    def test_03_gevent_hub_not_blocked(self):
+        """
+            - Check other greenlets keep running while a gevent worker waits for pool hashes.
+        """
+
+        output = subprocess.run([sys.executable, '-c', GEVENT_SCRIPT], cwd=ROOT, env=dict(os.environ, PYTHONPATH=ROOT),
+                                capture_output=True, text=True, timeout=120, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        self.assertLess(result['max_gap'], 0.25)
+        self.assertGreaterEqual(result['ticks'], int(result['elapsed'] / 0.05 * 0.5))
+
+if __name__ == '__main__':
+    unittest.main()
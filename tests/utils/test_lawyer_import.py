@@ -0,0 +1,109 @@
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+
+from api.database import db
+from api.models.user import User, Lawyer, GEO_PENDING
+from api.extentions.geo_queue import geo_queue
+from api.utils import hasher
+from api.utils.hasher import verify_password
+from api.utils.lawyer_import import read_rows, import_lawyers
+
+CSV = '''email,username,password,first_name,last_name,address,cnic,bar_voter_number,latitude,longitude,experience_years
+a@x.com,a,secret-a,Ali,Khan,Lahore,1,B-1,31.52,74.35,4
+taken@x.com,new,secret,Taken,Email,Lahore,2,B-2,,,
+b@x.com,b,secret-b,Bina,Shah,Karachi,3,B-3,,,
+c@x.com,a,secret-c,Same,Username,Karachi,4,B-4,,,
+d@x.com,d,,No,Password,Karachi,5,B-5,,,
+e@x.com,e,secret-e,Bad,Location,Karachi,6,B-6,95,74,
+'''
+
+# The lawyers table on sqlite (search documents are only built on postgres):
+@compiles(TSVECTOR, 'sqlite')
+def compile_tsvector(type_, compiler, **kw):
+    return 'TEXT'
+
+class TestLawyerImport(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', BCRYPT_ROUNDS=4, GEO_QUEUE_IN_PROCESS=False)
+        db.init_app(self.app)
+        geo_queue.init_app(self.app)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.metadata.create_all(db.engine, tables=[User.__table__, Lawyer.__table__])
+        db.session.add(User(email='taken@x.com', username='taken', password='x', first_name='T', last_name='T'))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def test_01_import_csv(self):
+        """
+            - Check valid rows are inserted as lawyers with hashed passwords, in batches.
+            - Check rows with coordinates are left pending for the geocoding queue.
+            - Check duplicates (in the table & in the file), missing keys & bad coordinates are reported per row.
+        """
+
+        report = import_lawyers(read_rows(io.StringIO(CSV), 'csv'), batch_size=1, workers=1)
+
+        self.assertEqual(report['created'], 2)
+        self.assertEqual([(error['row'], error['email']) for error in report['errors']], [
+            (3, 'taken@x.com'), (5, 'c@x.com'), (6, 'd@x.com'), (7, 'e@x.com'),
+        ])
+        self.assertEqual(report['failed'], 4)
+
+        lawyer = Lawyer.query.filter_by(email='a@x.com').one()
+        self.assertEqual((lawyer.role, lawyer.experience_years, lawyer.geo_status), ('lawyer', 4, GEO_PENDING))
+        self.assertTrue(verify_password('secret-a', lawyer.password))
+        self.assertIsNone(Lawyer.query.filter_by(email='b@x.com').one().geo_status)
+
+    def test_02_import_jsonl(self):
+        """
+            - Check JSONL rows (non string values included) are imported & invalid lines reported.
+        """
+
+        lines = '\n'.join([
+            '{"email": "j@x.com", "username": "j", "password": "pw", "first_name": "J", "last_name": "L", "address": "A", "cnic": 7, "bar_voter_number": 8}',
+            'not json',
+            '',
+            '[1, 2]',
+        ])
+        report = import_lawyers(read_rows(io.StringIO(lines), 'jsonl'), verified=True, workers=1)
+
+        self.assertEqual(report['created'], 1)
+        self.assertEqual([(error['row'], error['error']) for error in report['errors']], [(2, 'Invalid JSON'), (4, 'Expected a JSON object')])
+        lawyer = Lawyer.query.filter_by(email='j@x.com').one()
+        self.assertEqual((lawyer.cnic, lawyer.is_verified), ('7', True))
+
+    def test_03_one_pool_per_import(self):
+        """
+            - Check every batch of an import is hashed on the same process pool, shut down after the import.
+        """
+
+        pools = []
+        def make_pool(*args, **kwargs):
+            pools.append(ProcessPoolExecutor(*args, **kwargs))
+            return pools[-1]
+
+        with mock.patch.object(hasher, 'ProcessPoolExecutor', side_effect=make_pool):
+            report = import_lawyers(read_rows(io.StringIO(CSV), 'csv'), batch_size=1, workers=2)
+
+        self.assertEqual((report['created'], len(pools)), (2, 1))
+        self.assertTrue(verify_password('secret-b', Lawyer.query.filter_by(email='b@x.com').one().password))
+        with self.assertRaises(RuntimeError):
+            pools[0].submit(int)
+
+if __name__ == '__main__':
+    unittest.main()
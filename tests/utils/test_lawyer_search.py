@@ -0,0 +1,109 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+from sqlalchemy import event, cast
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+
+from api.database import db
+from api.models.user import User, Lawyer
+from api.routes.users import controllers
+from api.routes.users.controllers import filter_lawyer_users
+from api.routes.users.urls import user_routes
+
+# The lawyers table on sqlite (full text search itself only runs on postgres):
+@compiles(TSVECTOR, 'sqlite')
+def compile_tsvector(type_, compiler, **kw):
+    return 'TEXT'
+
+def register_functions(connection, record):
+    connection.create_function('least', 2, min)
+
+def fake_search(query, q):
+    # Stands in for ts_rank: a float computed per row
+    return query, cast(Lawyer.experience_years / 10.0, db.Float)
+
+class TestLawyerSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', JWT_SECRET_KEY='secret')
+        db.init_app(self.app)
+        JWTManager(self.app)
+        self.app.register_blueprint(user_routes, url_prefix='/api/users')
+        self.context = self.app.app_context()
+        self.context.push()
+        event.listen(db.engine, 'connect', register_functions)
+        db.engine.dispose()
+        db.metadata.create_all(db.engine, tables=[User.__table__, Lawyer.__table__])
+        db.session.add_all([
+            Lawyer(email=f'l{n}@x.com', username=f'l{n}', password='x', first_name='L', last_name=str(n), is_verified=True,
+                   latitude=31.52 + n * 0.01, longitude=74.35, experience_years=n)
+            for n in range(1, 6)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        event.remove(db.engine, 'connect', register_functions)
+        self.context.pop()
+
+    def test_01_near_and_q(self):
+        """
+            - Check near + q pages nearest first and still sets the search rank of each lawyer.
+            - Check the cursor of a page continues without repeating or skipping a lawyer.
+        """
+
+        with mock.patch.object(controllers, 'filter_lawyers_search', side_effect=fake_search):
+            lawyers, cursor, _ = filter_lawyer_users(is_admin=None, near='31.52,74.35', radius_km=50, q='family', limit=3)
+            self.assertEqual([lawyer.experience_years for lawyer in lawyers], [1, 2, 3])
+            self.assertEqual([lawyer.search_rank for lawyer in lawyers], [0.1, 0.2, 0.3])
+            self.assertLess(lawyers[0].distance_km, lawyers[1].distance_km)
+
+            lawyers, cursor, _ = filter_lawyer_users(is_admin=None, near='31.52,74.35', radius_km=50, q='family', limit=3, cursor=cursor)
+            self.assertEqual([lawyer.experience_years for lawyer in lawyers], [4, 5])
+            self.assertIsNone(cursor)
+
+    def test_02_radius_validated(self):
+        """
+            - Check a negative, zero, NaN, non numeric or too large radius_km is answered with 400.
+            - Check a valid radius_km filters the lawyers within it.
+        """
+
+        headers = {'Authorization': f"Bearer {create_access_token(identity={'id': 1, 'role': 'client'})}"}
+        client = self.app.test_client()
+        def search(radius_km):
+            return client.post('/api/users/lawyer/filter-lawyers', json={'near': '31.52,74.35', 'radius_km': radius_km}, headers=headers)
+
+        for radius_km in [-5, 0, 'NaN', 'far', 501]:
+            response = search(radius_km)
+            self.assertEqual(response.status_code, 400, radius_km)
+            self.assertIn('radius_km', response.get_json()['error'])
+
+        response = search(2.5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()['results']), 2)
+
+    def test_03_near_antimeridian(self):
+        """
+            - Check a search next to the antimeridian finds the lawyers on both sides of it.
+        """
+
+        db.session.add_all([
+            Lawyer(email=f'f{n}@x.com', username=f'f{n}', password='x', first_name='F', last_name=str(n), is_verified=True,
+                   latitude=-17.0, longitude=longitude, experience_years=n)
+            for n, longitude in [(6, 179.95), (7, -179.95), (8, 178.0)]
+        ])
+        db.session.commit()
+
+        lawyers, cursor, _ = filter_lawyer_users(is_admin=None, near='-17.0,179.99', radius_km=25)
+        self.assertEqual(sorted(lawyer.experience_years for lawyer in lawyers), [6, 7])
+
+if __name__ == '__main__':
+    unittest.main()
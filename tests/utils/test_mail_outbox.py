@@ -0,0 +1,130 @@
+import os
+import socket
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from api.database import db
+from api.extentions.mail import init_mail
+from api.extentions.mail_outbox import MailOutbox
+from api.models.outbox import OutboxEmail, OUTBOX_SENT, OUTBOX_PENDING, OUTBOX_DEAD
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    Controller = None
+
+class Recorder:
+    """ Local SMTP stand-in handler, records (client port, recipients) of every message """
+
+    def __init__(self):
+        self.received = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received.append((session.peer[1], envelope.rcpt_tos))
+        return '250 OK'
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+@unittest.skipIf(Controller is None, 'aiosmtpd is not installed')
+class TestMailOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.port = free_port()
+        self.app = Flask(__name__)
+        self.app.config.update(
+            SQLALCHEMY_DATABASE_URI='sqlite://', MAIL_SERVER='127.0.0.1', MAIL_PORT=self.port,
+            MAIL_USE_TLS=False, MAIL_USE_SSL=False, MAIL_USERNAME=None, MAIL_PASSWORD=None,
+            MAIL_OUTBOX_IN_PROCESS=False, MAIL_OUTBOX_MAX_ATTEMPTS=2,
+        )
+        db.init_app(self.app)
+        init_mail(self.app)
+        self.outbox = MailOutbox(self.app)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.metadata.create_all(db.engine, tables=[OutboxEmail.__table__])
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def enqueue(self, count):
+        for i in range(count):
+            self.outbox.enqueue(subject='OTP', recipients=[f'user{i}@example.com'], body='123456', sender='info@example.com')
+
+    def test_01_drains_over_one_connection(self):
+        """
+            - Check every queued email is sent & marked sent.
+            - Check they all went over the same SMTP connection (same client port).
+        """
+
+        recorder = Recorder()
+        controller = Controller(recorder, hostname='127.0.0.1', port=self.port)
+        controller.start()
+        try:
+            self.enqueue(3)
+            while self.outbox.process_due():
+                pass
+        finally:
+            controller.stop()
+
+        self.assertEqual(sorted(rcpt[0] for _, rcpt in recorder.received), [f'user{i}@example.com' for i in range(3)])
+        self.assertEqual(len({port for port, _ in recorder.received}), 1)
+        self.assertEqual({email.status for email in OutboxEmail.query.all()}, {OUTBOX_SENT})
+
+    def test_02_retry_then_dead_letter(self):
+        """
+            - Check a failed send is retried later, then dead-lettered after MAIL_OUTBOX_MAX_ATTEMPTS.
+        """
+
+        self.enqueue(1)  # No SMTP server listening
+        self.outbox.process_due()
+        email = OutboxEmail.query.one()
+        self.assertEqual((email.status, email.attempts), (OUTBOX_PENDING, 1))
+        self.assertIsNotNone(email.last_error)
+
+        # Not due before its backoff:
+        self.assertEqual(self.outbox.process_due(), 0)
+
+        email.next_attempt_at = email.created.replace(tzinfo=None)
+        db.session.commit()
+        self.outbox.process_due()
+        self.assertEqual(OutboxEmail.query.one().status, OUTBOX_DEAD)
+
+    def test_03_sent_bodies_cleared_and_old_emails_purged(self):
+        """
+            - Check a sent email keeps no body (OTP codes).
+            - Check the idle worker deletes sent & dead emails older than MAIL_OUTBOX_RETENTION_DAYS, not pending ones.
+        """
+
+        controller = Controller(Recorder(), hostname='127.0.0.1', port=self.port)
+        controller.start()
+        try:
+            self.enqueue(1)
+            self.outbox.process_due()
+        finally:
+            controller.stop()
+        self.assertIsNone(OutboxEmail.query.one().body)
+
+        old = datetime.now() - timedelta(days=31)
+        db.session.add_all([
+            OutboxEmail(subject='old', sender='s', recipients='r', status=status, updated=old)
+            for status in [OUTBOX_SENT, OUTBOX_DEAD, OUTBOX_PENDING]
+        ])
+        db.session.commit()
+        OutboxEmail.query.filter(OutboxEmail.status == OUTBOX_PENDING).update({'next_attempt_at': datetime.now() + timedelta(hours=1)})
+        db.session.commit()
+
+        self.assertEqual(self.outbox.process_due(), 0)
+        self.assertEqual(sorted((email.subject, email.status) for email in OutboxEmail.query.all()), [('OTP', OUTBOX_SENT), ('old', OUTBOX_PENDING)])
+        self.assertEqual(self.outbox.purge(retention_days=0), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import sys
+import glob
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.compiler import compiles
+
+from api.database import db
+from api.models.user import User
+from api.models.chat import ChatRoom, Message
+from api.extentions.message_writer import MessageWriter
+
+# The chat_rooms table on sqlite (the member arrays are not read by the writer):
+@compiles(ARRAY, 'sqlite')
+def compile_array(type_, compiler, **kw):
+    return 'TEXT'
+
+class TestMessageWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.spool_dir = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', MESSAGE_WRITER_IN_PROCESS=False, MESSAGE_WRITER_SPOOL_DIR=self.spool_dir.name)
+        db.init_app(self.app)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.metadata.create_all(db.engine, tables=[User.__table__, ChatRoom.__table__, Message.__table__])
+        db.session.execute(User.__table__.insert(), [
+            {'id': 1, 'email': 'u1@x.com', 'username': 'u1', 'password': 'x', 'first_name': 'Ali', 'last_name': 'Khan', 'role': 'client'},
+        ])
+        for id in [1, 2]:
+            db.session.execute(text("INSERT INTO chat_rooms (id, name, creator_id, user_ids, user_names) VALUES (:id, :name, 1, '{}', '{}')"), {'id': id, 'name': f'room-{id}'})
+        db.session.commit()
+        self.writer = MessageWriter(self.app)
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+        self.spool_dir.cleanup()
+
+    def test_01_buffered_then_flushed_in_one_batch(self):
+        """
+            - Check messages get their final ids at once but are only saved by the flush.
+            - Check one flush saves every message & the latest message of each room, and is counted.
+        """
+
+        messages = [self.writer.add(room_id, 1, f'hi {n}') for n, room_id in enumerate([1, 2, 1])]
+        self.assertEqual([message.id for message in messages], [1, 2, 3])
+        self.assertEqual(messages[0].sender_name, 'Ali Khan')
+        self.assertIsNone(self.writer.add(1, 99, 'ghost'))
+        self.assertEqual(db.session.scalar(select(db.func.count()).select_from(Message)), 0)
+
+        self.assertEqual(self.writer.process_due(), 3)
+        self.assertEqual(db.session.scalars(select(Message.content).order_by(Message.id)).all(), ['hi 0', 'hi 1', 'hi 2'])
+        self.assertEqual(db.session.scalars(select(ChatRoom.last_message).order_by(ChatRoom.id)).all(), ['hi 2', 'hi 1'])
+        self.assertEqual(self.writer.add(2, 1, 'next').id, 4)
+
+        stats = self.writer.get_stats()
+        self.assertEqual((stats['flushes'], stats['messages'], stats['max_batch_size'], stats['buffered']), (1, 3, 3, 1))
+
+    def test_02_spooled_messages_replayed_once(self):
+        """
+            - Check unflushed messages are spooled to a file & written by the next process, skipping saved ones.
+        """
+
+        self.writer.add(1, 1, 'saved')
+        self.writer.add(1, 1, 'spooled')
+        path = self.writer.spool()
+        self.assertTrue(os.path.exists(path))
+        db.session.execute(Message.__table__.insert(), [{'id': 1, 'chat_room_id': 1, 'sender_id': 1, 'content': 'saved'}])
+        db.session.commit()
+
+        restarted = MessageWriter(self.app)
+        self.assertEqual(restarted.process_due(), 0)
+        self.assertEqual(db.session.scalars(select(Message.content).order_by(Message.id)).all(), ['saved', 'spooled'])
+        self.assertEqual(os.listdir(self.spool_dir.name), [])
+
+    def test_03_refused_rows_dead_lettered(self):
+        """
+            - Check a batch the database refuses is retried row by row: the other rows are saved, in id order.
+            - Check the refused row is dead-lettered to a file, not retried forever.
+        """
+
+        for n in range(3):
+            self.writer.add(1, 1, f'hi {n}')
+        db.session.execute(Message.__table__.insert(), [{'id': 2, 'chat_room_id': 1, 'sender_id': 1, 'content': 'taken'}])
+        db.session.commit()
+
+        self.assertEqual(self.writer.process_due(), 3)
+        self.assertEqual(db.session.scalars(select(Message.content).order_by(Message.id)).all(), ['hi 0', 'taken', 'hi 2'])
+        self.assertEqual(self.writer.get_stats()['buffered'], 0)
+        self.assertEqual(self.writer.get_stats()['dead_lettered'], 1)
+        self.assertEqual(len(glob.glob(os.path.join(self.spool_dir.name, 'dead-messages-*.jsonl'))), 1)
+
+    def test_04_unreachable_database_spooled(self):
+        """
+            - Check a batch is kept while the database is unreachable, then spooled after MESSAGE_WRITER_MAX_ATTEMPTS flushes.
+            - Check a spool file that fails to replay is put back & replayed later.
+        """
+
+        self.app.config['MESSAGE_WRITER_MAX_ATTEMPTS'] = 2
+        self.writer.add(1, 1, 'hi')
+        down = OperationalError('INSERT', {}, Exception('connection refused'))
+        with mock.patch.object(self.writer, '_write', side_effect=down):
+            with self.assertRaises(OperationalError):
+                self.writer.flush()
+            self.assertEqual(self.writer.get_stats()['buffered'], 1)
+            with self.assertRaises(OperationalError):
+                self.writer.flush()
+            self.assertEqual(self.writer.get_stats()['buffered'], 0)
+
+            with self.assertRaises(OperationalError):
+                self.writer.replay_spool()
+        self.assertEqual(len(glob.glob(os.path.join(self.spool_dir.name, 'messages-*.jsonl'))), 1)
+
+        self.assertEqual(self.writer.replay_spool(), 1)
+        self.assertEqual(db.session.scalars(select(Message.content)).all(), ['hi'])
+        self.assertEqual(os.listdir(self.spool_dir.name), [])
+
+if __name__ == '__main__':
+    unittest.main()
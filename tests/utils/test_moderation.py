@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from api.database import db
+from api.models.user import User
+from api.routes.users.controllers import bulk_moderate_users
+from api.utils.revocation import get_account_state, clear_caches
+
+class TestBulkModeration(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', ACCOUNT_STATE_TTL=60)
+        db.init_app(self.app)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.metadata.create_all(db.engine, tables=[User.__table__])
+        db.session.add_all([
+            User(id=id, email=f'u{id}@x.com', username=f'u{id}', password='x', first_name='U', last_name='U')
+            for id in (1, 2, 3)
+        ])
+        db.session.get(User, 3).is_suspended = True
+        db.session.commit()
+        clear_caches()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+        clear_caches()
+
+    def test_01_bulk_suspend(self):
+        """
+            - Check every user is reported updated, unchanged (already suspended) or not_found.
+            - Check the reason is stored & the cached account state is invalidated.
+        """
+
+        self.assertEqual(get_account_state('client', 1), (True, False))
+
+        results = bulk_moderate_users([1, 2, 3, 9, 1], 'suspend', 'spam')
+        self.assertEqual(results, [
+            {'id': 1, 'result': 'updated'},
+            {'id': 2, 'result': 'updated'},
+            {'id': 3, 'result': 'unchanged'},
+            {'id': 9, 'result': 'not_found'},
+        ])
+        self.assertEqual(db.session.get(User, 1).reason, 'spam')
+        self.assertEqual(get_account_state('client', 1), (True, True))
+
+    def test_02_invalid_requests(self):
+        """
+            - Check unknown actions & non integer ids raise ValueError.
+        """
+
+        with self.assertRaises(ValueError):
+            bulk_moderate_users([1], 'ban', 'spam')
+        with self.assertRaises(ValueError):
+            bulk_moderate_users(['a'], 'suspend', 'spam')
+        with self.assertRaises(ValueError):
+            bulk_moderate_users([], 'suspend', 'spam')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from api.database import db
+from api.models.otp import OTP
+from api.utils.otp_generator import save_otp, verify_otp, delete_all_otps, purge_expired_otps
+
+class TestOTPStore(unittest.TestCase):
+
+    def check_backend(self, app):
+        with app.app_context():
+            save_otp('a@x.com', '111111', otp_for='password_reset')
+            save_otp('a@x.com', '222222', otp_for='password_reset')
+            save_otp('a@x.com', '333333', otp_for='email_verification')
+
+            # Only the latest OTP of the purpose is valid:
+            self.assertFalse(verify_otp('a@x.com', '111111', otp_for='password_reset'))
+            self.assertTrue(verify_otp('a@x.com', '222222', otp_for='password_reset'))
+            self.assertFalse(verify_otp('a@x.com', '333333', otp_for='password_reset'))
+            self.assertFalse(verify_otp('b@x.com', '222222', otp_for='password_reset'))
+
+            delete_all_otps('a@x.com', otp_for='password_reset')
+            self.assertFalse(verify_otp('a@x.com', '222222', otp_for='password_reset'))
+            self.assertTrue(verify_otp('a@x.com', '333333', otp_for='email_verification'))
+
+    def test_01_database_backend(self):
+        """
+            - Check purpose scoping, latest-only & deletes on the otp table.
+            - Check the purge only removes expired rows.
+        """
+
+        app = Flask(__name__)
+        app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://')
+        db.init_app(app)
+        with app.app_context():
+            db.metadata.create_all(db.engine, tables=[OTP.__table__])
+        self.check_backend(app)
+
+        with app.app_context():
+            db.session.add(OTP(email='c@x.com', otp='444444', otp_for='password_reset', expiry_time=datetime.now() - timedelta(minutes=1)))
+            db.session.commit()
+            self.assertEqual(purge_expired_otps(), 1)
+            self.assertEqual(OTP.query.count(), 1)
+
+    def test_02_memory_backend(self):
+        """
+            - Check the in-memory backend behaves the same.
+        """
+
+        app = Flask(__name__)
+        app.config.update(OTP_BACKEND='memory')
+        self.check_backend(app)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, Column, Integer, Float, func
+from sqlalchemy.orm import declarative_base, Session
+
+from api.utils.paginator import keyset_paginate, encode_cursor, decode_cursor, parse_limit, MAX_PAGE_SIZE
+
+Base = declarative_base()
+
+class Row(Base):
+    __tablename__ = 'rows'
+    id = Column(Integer, primary_key=True)
+    average_rating = Column(Float)
+
+class TestKeysetPaginate(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        self.session = Session(engine)
+        # Ratings repeat so that the id tie-breaker matters:
+        self.session.add_all([Row(id=i, average_rating=float(i % 3)) for i in range(1, 11)])
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+
+    def collect(self, columns, descending, limit):
+        """ Walk every page and return all ids in order """
+        ids, cursor = [], None
+        while True:
+            rows, cursor = keyset_paginate(self.session.query(Row), columns, cursor=cursor, limit=limit, descending=descending)
+            ids.extend(row.id for row in rows)
+            if cursor is None:
+                return ids
+
+    def test_01_pages_by_id(self):
+        """
+            - Walk all pages ordered by id.
+            - Check every row is returned exactly once in order.
+        """
+
+        self.assertEqual(self.collect([Row.id], False, 3), list(range(1, 11)))
+
+    def test_02_pages_by_rating_and_id(self):
+        """
+            - Walk all pages ordered by (average_rating, id) descending.
+            - Check every row is returned exactly once in order.
+        """
+
+        expected = [row.id for row in sorted(self.session.query(Row).all(), key=lambda r: (r.average_rating, r.id), reverse=True)]
+        self.assertEqual(self.collect([Row.average_rating, Row.id], True, 4), expected)
+
+    def test_03_invalid_cursor(self):
+        """
+            - Pass a malformed cursor and a cursor of the wrong size.
+            - Pass cursors whose values do not match the type of their sort column.
+            - Check a ValueError is raised.
+        """
+
+        with self.assertRaises(ValueError):
+            decode_cursor('not-a-cursor', 1)
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor([1, 2]), 1)
+        for values in [['abc', 1], [None, 1], [2.5, 'x'], [True, 1], [2.5, 1.5]]:
+            with self.assertRaises(ValueError):
+                keyset_paginate(self.session.query(Row), [Row.average_rating, Row.id], cursor=encode_cursor(values))
+        self.assertEqual(decode_cursor(encode_cursor([2, 1]), 2, [(int, float), int]), [2, 1])
+
+    def test_04_limit_is_clamped(self):
+        """
+            - Check the page size is clamped to [1, MAX_PAGE_SIZE].
+        """
+
+        self.assertEqual(parse_limit('5'), 5)
+        self.assertEqual(parse_limit(0), 1)
+        self.assertEqual(parse_limit(10000), MAX_PAGE_SIZE)
+
+    def test_05_null_sort_values_coalesced(self):
+        """
+            - Sort on coalesce(average_rating, 0) with NULL ratings on a page boundary.
+            - Check every row is still returned exactly once, NULL ratings ranked as 0.
+        """
+
+        self.session.query(Row).filter(Row.id.in_([3, 6, 9])).update({'average_rating': None})
+        self.session.commit()
+        rating = func.coalesce(Row.average_rating, 0).label('average_rating')
+        ids, cursor = [], None
+        while True:
+            rows, cursor = keyset_paginate(self.session.query(Row), [rating, Row.id], cursor=cursor, limit=2, descending=True,
+                                           key=lambda row: [row.average_rating or 0, row.id])
+            ids.extend(row.id for row in rows)
+            if cursor is None:
+                break
+
+        self.assertEqual(ids, [8, 5, 2, 10, 7, 4, 1, 9, 6, 3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, jsonify
+
+from api.decorators.rate_limit import rate_limit
+from api.utils.rate_limiter import MemoryBackend, DatabaseBackend
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+
+    @app.route('/login', methods=['POST'])
+    @rate_limit(4, 60)
+    @rate_limit(2, 60, key='email')
+    def login():
+        return jsonify(ok=True)
+
+    return app
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_01_backends(self):
+        """
+            - Check both backends allow limit hits per window, then refuse with a retry delay.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            backends = [MemoryBackend(), DatabaseBackend(f'sqlite:///{directory}/limits.db')]
+            for backend in backends:
+                self.assertEqual([backend.hit('k', 2, 60)[0] for _ in range(3)], [True, True, False])
+                self.assertGreaterEqual(backend.hit('k', 2, 60)[1], 1)
+                self.assertTrue(backend.hit('other', 2, 60)[0])
+            backends[1].engine.dispose()
+
+    def test_02_decorator_per_ip_and_email(self):
+        """
+            - Check the email limit is counted per email & the IP limit across emails.
+            - Check 429 with Retry-After, and RATE_LIMIT_ENABLED = False.
+        """
+
+        client = make_app().test_client()
+        statuses = [client.post('/login', json={'email': email}).status_code for email in ['a@x.com', 'A@x.com ', 'a@x.com', 'b@x.com']]
+        self.assertEqual(statuses, [200, 200, 429, 200])
+
+        response = client.post('/login', json={'email': 'c@x.com'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response.headers)
+
+        client = make_app(RATE_LIMIT_ENABLED=False).test_client()
+        self.assertTrue(all(client.post('/login', json={'email': 'a@x.com'}).status_code == 200 for _ in range(5)))
+
+    def test_03_concurrent_database_hits(self):
+        """
+            - Check concurrent hits of several workers on the database backend never let more than limit through.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            url = f'sqlite:///{directory}/limits.db'
+            DatabaseBackend(url).engine.dispose()
+            workers = [DatabaseBackend(url) for _ in range(4)]
+            barrier = threading.Barrier(12)
+            results = []
+
+            def hit(backend):
+                barrier.wait()
+                results.append(backend.hit('k', 5, 60)[0])
+
+            threads = [threading.Thread(target=hit, args=(workers[n % 4],)) for n in range(12)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(results.count(True), 5)
+            for worker in workers:
+                worker.engine.dispose()
+
+    def test_04_concurrent_table_creation(self):
+        """
+            - Check workers starting together on a new database all get a working backend.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            url = f'sqlite:///{directory}/limits.db'
+            barrier = threading.Barrier(8)
+            workers, errors = [], []
+
+            def start():
+                barrier.wait()
+                try:
+                    workers.append(DatabaseBackend(url))
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=start) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            self.assertEqual([worker.hit('k', 8, 60)[0] for worker in workers], [True] * 8)
+            for worker in workers:
+                worker.engine.dispose()
+
+if __name__ == '__main__':
+    unittest.main()
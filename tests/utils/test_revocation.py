@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from api.database import db
+from api.models.user import User
+from api.models.admin import Admin
+from api.models.revoked_token import RevokedToken
+from api.utils.revocation import is_token_revoked, invalidate_account, revoke_token, clear_caches
+
+class TestRevocation(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', ACCOUNT_STATE_TTL=60, REVOCATION_SYNC_SECONDS=60)
+        db.init_app(self.app)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.metadata.create_all(db.engine, tables=[User.__table__, Admin.__table__, RevokedToken.__table__])
+        db.session.add_all([
+            User(id=1, email='u@x.com', username='u', password='x', first_name='U', last_name='U'),
+            Admin(id=1, email='a@x.com', password='x', role='admin'),
+        ])
+        db.session.commit()
+        clear_caches()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+        clear_caches()
+
+    def payload(self, role, jti='jti-1'):
+        return {'jti': jti, 'exp': int(time.time()) + 3600, 'sub': {'id': 1, 'role': role}}
+
+    def test_01_account_state_is_cached_until_invalidated(self):
+        """
+            - Check a suspension is only seen after invalidate_account (state cached meanwhile).
+            - Check deleted accounts & inactive admins are rejected, deactivated users are not.
+        """
+
+        self.assertFalse(is_token_revoked(self.payload('client')))
+        db.session.get(User, 1).is_suspended = True
+        db.session.commit()
+        self.assertFalse(is_token_revoked(self.payload('client')))
+
+        invalidate_account('client', 1)
+        self.assertTrue(is_token_revoked(self.payload('client')))
+
+        user = db.session.get(User, 1)
+        user.is_suspended, user.is_active = False, False
+        db.session.commit()
+        invalidate_account('user', 1)
+        self.assertFalse(is_token_revoked(self.payload('client')))
+
+        db.session.get(Admin, 1).is_active = False
+        db.session.commit()
+        self.assertTrue(is_token_revoked(self.payload('admin')))
+        self.assertTrue(is_token_revoked({'jti': 'x', 'sub': {'id': 99, 'role': 'lawyer'}}))
+
+    def test_02_revoked_tokens(self):
+        """
+            - Check a revoked jti is rejected in this process, and loaded by a fresh one (cleared caches).
+        """
+
+        payload = self.payload('client')
+        revoke_token(payload['jti'], payload['exp'])
+        self.assertTrue(is_token_revoked(payload))
+        self.assertFalse(is_token_revoked(self.payload('client', jti='jti-2')))
+
+        clear_caches()
+        self.assertTrue(is_token_revoked(payload))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from sqlalchemy import event, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.compiler import compiles
+
+from api.database import db
+from api.models.user import User
+from api.models.chat import ChatRoom, ChatRoomMember
+from api.utils import room_cache
+from api.utils.room_cache import get_room, is_member, invalidate_room, clear_room_cache
+
+# The chat_rooms table on sqlite (the member arrays are not read by the cache):
+@compiles(ARRAY, 'sqlite')
+def compile_array(type_, compiler, **kw):
+    return 'TEXT'
+
+class TestRoomCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', ROOM_CACHE_TTL=60, ROOM_CACHE_MAX_ENTRIES=2)
+        db.init_app(self.app)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.metadata.create_all(db.engine, tables=[User.__table__, ChatRoom.__table__, ChatRoomMember.__table__])
+        for id, name in [(1, 'room-1'), (2, 'room-2'), (3, 'room-3')]:
+            db.session.execute(text("INSERT INTO chat_rooms (id, name, creator_id, user_ids, user_names) VALUES (:id, :name, 1, '{}', '{}')"), {'id': id, 'name': name})
+        db.session.add_all([ChatRoomMember(room_id=1, user_id=1), ChatRoomMember(room_id=1, user_id=2)])
+        db.session.commit()
+        clear_room_cache()
+
+        self.queries = 0
+        event.listen(db.engine, 'before_cursor_execute', self.count_query)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self.count_query)
+        db.session.remove()
+        self.context.pop()
+        clear_room_cache()
+
+    def count_query(self, *args):
+        self.queries += 1
+
+    def test_01_members_cached_until_invalidated(self):
+        """
+            - Check a room is loaded once, then membership checks run no query.
+            - Check invalidation by room id reloads the new members, missing rooms are cached briefly too.
+        """
+
+        self.assertEqual(get_room('room-1'), (1, frozenset({1, 2})))
+        self.assertTrue(is_member('room-1', 2))
+        self.assertFalse(is_member('room-1', 3))
+        self.assertFalse(is_member('missing', 1))
+        self.assertFalse(is_member('missing', 1))
+        self.assertEqual(self.queries, 2)
+
+        db.session.add(ChatRoomMember(room_id=1, user_id=3))
+        db.session.commit()
+        self.assertFalse(is_member('room-1', 3))
+        invalidate_room(room_id=1)
+        self.assertTrue(is_member('room-1', 3))
+
+    def test_02_lru_bound(self):
+        """
+            - Check the least recently used room is evicted past ROOM_CACHE_MAX_ENTRIES.
+        """
+
+        get_room('room-1')
+        get_room('room-2')
+        get_room('room-1')
+        get_room('room-3')
+        queries = self.queries
+        get_room('room-1')
+        self.assertEqual(self.queries, queries)
+        get_room('room-2')
+        self.assertEqual(self.queries, queries + 1)
+
+    def test_03_misses_expire_and_stale_loads_dropped(self):
+        """
+            - Check a missing room is looked up again after ROOM_CACHE_MISS_TTL (e.g. created by another worker).
+            - Check a load running during an invalidation is returned but not cached.
+        """
+
+        self.app.config['ROOM_CACHE_MISS_TTL'] = 0
+        self.assertIsNone(get_room('room-4'))
+        db.session.execute(text("INSERT INTO chat_rooms (id, name, creator_id, user_ids, user_names) VALUES (4, 'room-4', 1, '{}', '{}')"))
+        db.session.commit()
+        self.assertEqual(get_room('room-4'), (4, frozenset()))
+
+        load = room_cache._load
+        def load_then_invalidate(name):
+            room = load(name)
+            invalidate_room(name=name)
+            return room
+
+        with mock.patch.object(room_cache, '_load', side_effect=load_then_invalidate):
+            self.assertEqual(get_room('room-1'), (1, frozenset({1, 2})))
+        queries = self.queries
+        get_room('room-1')
+        self.assertEqual(self.queries, queries + 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.compiler import compiles
+
+from api.database import db
+from api.models.user import User
+from api.models.chat import ChatRoom, ChatRoomMember, MEMBER, MEMBER_CREATOR
+from api.extentions.socketio import socketio
+from api.routes.chats import urls
+from api.routes.chats.urls import chat_routes
+
+# The chat_rooms table on sqlite (the member arrays are not read by the check):
+@compiles(ARRAY, 'sqlite')
+def compile_array(type_, compiler, **kw):
+    return 'TEXT'
+
+class FakeRoom:
+    def to_dict(self):
+        return {'id': 1}
+
+class TestRoomMembers(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', JWT_SECRET_KEY='secret')
+        db.init_app(self.app)
+        JWTManager(self.app)
+        self.app.register_blueprint(chat_routes, url_prefix='/api/chat')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.metadata.create_all(db.engine, tables=[User.__table__, ChatRoom.__table__, ChatRoomMember.__table__])
+        db.session.execute(User.__table__.insert(), [
+            {'id': id, 'email': f'u{id}@x.com', 'username': f'u{id}', 'password': 'x', 'first_name': 'U', 'last_name': str(id), 'role': 'client'}
+            for id in [1, 2, 3]
+        ])
+        db.session.execute(text("INSERT INTO chat_rooms (id, name, creator_id, user_ids, user_names) VALUES (1, 'room-1', 1, '{}', '{}')"))
+        # The creator (user 1) did not list themselves as a member:
+        db.session.execute(ChatRoomMember.__table__.insert(), [{'room_id': 1, 'user_id': 2, 'role': MEMBER}])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+
+    def add_user(self, identity, data={'user_id': 3}):
+        token = create_access_token(identity=identity)
+        with mock.patch.object(urls, 'add_users_to_chat_room', return_value=FakeRoom()) as add:
+            response = self.client.post('/api/chat/chat-rooms/1/users', json=data, headers={'Authorization': f'Bearer {token}'})
+        return response, add
+
+    def test_01_only_creator_or_admin_adds_users(self):
+        """
+            - Check a member who did not create the room, or a stranger, gets 403 & no user is added.
+            - Check the room creator (even if not a member) & an admin may add users.
+            - Check user_ids other than an ID or a list of IDs are answered with 400.
+        """
+
+        for identity in [{'id': 2, 'role': 'client'}, {'id': 3, 'role': 'lawyer'}]:
+            response, add = self.add_user(identity)
+            self.assertEqual(response.status_code, 403)
+            add.assert_not_called()
+
+        for identity in [{'id': 1, 'role': 'client'}, {'id': 2, 'role': 'admin'}]:
+            response, add = self.add_user(identity)
+            self.assertNotEqual(response.status_code, 403)
+            add.assert_called_once_with(1, [3])
+
+        for data in [{'user_ids': 'abc'}, {'user_ids': ['3']}, {'user_id': True}, {'user_ids': {'id': 3}}]:
+            response, add = self.add_user({'id': 1, 'role': 'client'}, data)
+            self.assertEqual(response.status_code, 400, data)
+            add.assert_not_called()
+
+    def test_02_notification_room_names_reserved(self):
+        """
+            - Check a chat room cannot be named like a notification room ('users', 'role:...', 'user:...').
+            - Check a legacy room with such a name cannot be sent to (no broadcast to every user).
+        """
+
+        headers = {'Authorization': f"Bearer {create_access_token(identity={'id': 1, 'role': 'client'})}"}
+        for name in ['users', 'role:lawyer', 'user:5']:
+            response = self.client.post('/api/chat/chat-rooms', json={'name': name, 'user_ids': [1, 2]}, headers=headers)
+            self.assertEqual(response.status_code, 400, name)
+
+        db.session.execute(text("INSERT INTO chat_rooms (id, name, creator_id, user_ids, user_names) VALUES (2, 'users', 1, '{}', '{}')"))
+        db.session.execute(ChatRoomMember.__table__.insert(), [{'room_id': 2, 'user_id': 1, 'role': MEMBER_CREATOR}])
+        db.session.commit()
+
+        socketio.init_app(self.app)
+        client = socketio.test_client(self.app, headers=headers)
+        with mock.patch.object(urls, 'save_message') as save:
+            client.emit('send_message', {'room_name': 'users', 'content': 'hi all'})
+        save.assert_not_called()
+        self.assertEqual(client.get_received()[-1]['args'][0], {'error': 'Chat room not accessible.', 'success': False})
+        client.disconnect()
+
+if __name__ == '__main__':
+    unittest.main()
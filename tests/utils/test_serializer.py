@@ -0,0 +1,57 @@
+import os
+import sys
+import unittest
+from datetime import datetime, date, timezone, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from werkzeug.http import http_date
+
+from api.models.user import Lawyer, Client
+from api.utils.serializer import serialize, get_plan, format_datetime, format_date
+
+class TestSerializer(unittest.TestCase):
+
+    def test_01_dates_match_jsonify(self):
+        """
+            - Check dates & datetimes (naive and aware) are formatted like flask.jsonify does.
+        """
+
+        for value in [datetime(2024, 2, 29, 23, 5, 1), datetime(2024, 1, 1, 3, 0, tzinfo=timezone(timedelta(hours=5)))]:
+            self.assertEqual(format_datetime(value), http_date(value))
+        self.assertEqual(format_date(date(1990, 1, 1)), http_date(date(1990, 1, 1)))
+
+    def test_02_plan_per_polymorphic_class(self):
+        """
+            - Check Lawyer & Client get their own plan with their joined columns.
+            - Check password & deferred columns are left out.
+        """
+
+        lawyer_keys = {key for key, _ in get_plan(Lawyer)}
+        client_keys = {key for key, _ in get_plan(Client)}
+
+        self.assertIn('about', lawyer_keys)
+        self.assertIn('occupation', client_keys)
+        self.assertNotIn('about', client_keys)
+        for keys in (lawyer_keys, client_keys):
+            self.assertNotIn('password', keys)
+        self.assertNotIn('search_vector', lawyer_keys)
+        self.assertIs(get_plan(Lawyer), get_plan(Lawyer))
+
+    def test_03_serialize(self):
+        """
+            - Serialize a lawyer and check values & converted dates.
+        """
+
+        created = datetime(2024, 5, 1, 10, 30)
+        lawyer = Lawyer(id=7, email='lawyer@example.com', password='hash', first_name='A', last_name='B', created=created, about='Family law')
+        data = serialize(lawyer)
+
+        self.assertEqual(data['id'], 7)
+        self.assertEqual(data['about'], 'Family law')
+        self.assertEqual(data['created'], http_date(created))
+        self.assertIsNone(data['dob'])
+        self.assertNotIn('password', data)
+
+if __name__ == '__main__':
+    unittest.main()